@@ -1,16 +1,25 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
                             QHeaderView, QAbstractItemView, QFileDialog, QMessageBox)
 from PyQt6.QtCore import Qt
-from .workers import AnalyzerWorker, FileOperationWorker
-from .ui_effects import (ModernFrame, AnimatedButton, ModernTextEdit,
-                        ModernTable, ModernProgressBar, ModernSpinBox, ModernLabel)
+from .workers import AnalyzerWorker, RecheckScheduler, FileOperationWorker, LinkFeed
+from .job_state import JobStateStore
+from .result_db import get_result_db, FINAL_STATUSES
+from .results_model import ResultsTableModel, FILTER_CATEGORIES
+from .ui_effects import (ModernFrame, AnimatedButton, ModernTextEdit, ModernTableView,
+                        ModernProgressBar, ModernSpinBox, ModernLabel, ModernCheckBox)
 
 class AnalyzerTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.analyzer_worker = None
+        self.retired_workers = []
+        self.recheck_scheduler = None
         self.file_worker = None
-        self.current_results = []
+        self.history_dialog = None
+        self.results_model = ResultsTableModel(self)
+        self.job_state = JobStateStore()
+        self.progress_offset = 0
+        self.journal_results = True
         self.init_ui()
         self.setup_connections()
 
@@ -34,14 +43,40 @@ class AnalyzerTab(QWidget):
         self.thread_spinbox = ModernSpinBox()
         self.thread_spinbox.setRange(1, 20)
         self.thread_spinbox.setValue(5)
+        self.thread_spinbox.setToolTip("解析短链接跳转的线程数")
+
+        # 礼品接口和VIP有效期接口的限流与延迟不同，线程数分开设置
+        self.gift_workers_spinbox = ModernSpinBox()
+        self.gift_workers_spinbox.setRange(1, 20)
+        self.gift_workers_spinbox.setValue(5)
+        self.gift_workers_spinbox.setToolTip("调用礼品卡接口的线程数")
+
+        self.vip_workers_spinbox = ModernSpinBox()
+        self.vip_workers_spinbox.setRange(1, 20)
+        self.vip_workers_spinbox.setValue(5)
+        self.vip_workers_spinbox.setToolTip("检查VIP/音质有效期的线程数")
+
+        self.recheck_cb = ModernCheckBox("自动复查")
+        self.recheck_cb.setToolTip("定期复查仍可领取/有效的链接，临近过期时复查更频繁")
+
+        self.skip_analyzed_cb = ModernCheckBox("跳过已分析")
+        self.skip_analyzed_cb.setToolTip("历史数据库中已有确定结论的链接不再请求，直接显示上次的结果")
+        self.history_btn = AnimatedButton("📜 历史")
         
         toolbar_layout.addWidget(self.load_btn)
         toolbar_layout.addWidget(self.analyze_btn)
         toolbar_layout.addWidget(self.pause_btn)
         toolbar_layout.addWidget(self.stop_btn)
         toolbar_layout.addStretch()
-        toolbar_layout.addWidget(ModernLabel("线程数:"))
+        toolbar_layout.addWidget(ModernLabel("解析线程:"))
         toolbar_layout.addWidget(self.thread_spinbox)
+        toolbar_layout.addWidget(ModernLabel("礼品接口:"))
+        toolbar_layout.addWidget(self.gift_workers_spinbox)
+        toolbar_layout.addWidget(ModernLabel("VIP接口:"))
+        toolbar_layout.addWidget(self.vip_workers_spinbox)
+        toolbar_layout.addWidget(self.recheck_cb)
+        toolbar_layout.addWidget(self.skip_analyzed_cb)
+        toolbar_layout.addWidget(self.history_btn)
         toolbar_layout.addWidget(self.save_btn)
         toolbar_layout.addWidget(self.clear_btn)
         
@@ -139,7 +174,7 @@ class AnalyzerTab(QWidget):
         
         right_layout.addLayout(filter_layout)
         
-        self.results_table = ModernTable()
+        self.results_table = ModernTableView()
         self.setup_results_table()
         right_layout.addWidget(self.results_table)
         
@@ -149,17 +184,23 @@ class AnalyzerTab(QWidget):
         main_layout.addWidget(splitter)
 
     def setup_results_table(self):
-        headers = ['状态', '链接', '类型', '发送者', '数量', '过期时间', '价值', '详情']
-        self.results_table.setColumnCount(len(headers))
-        self.results_table.setHorizontalHeaderLabels(headers)
-        
+        self.results_table.setModel(self.results_model)
+
+        # 按内容自适应列宽需要遍历行，数据量大时改用固定初始宽度
         header = self.results_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        for i in range(2, len(headers)):
-            header.setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
-        
+        for i, width in enumerate([160, 0, 100, 100, 70, 150, 60, 200]):
+            if i == 1:
+                header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
+            else:
+                header.setSectionResizeMode(i, QHeaderView.ResizeMode.Interactive)
+                header.resizeSection(i, width)
+        self.results_table.verticalHeader().setDefaultSectionSize(32)
+
         self.results_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        # 初始不排序，新结果直接追加；点击表头后按预计算的键排序
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        header.setSortIndicatorClearable(True)
         self.results_table.setSortingEnabled(True)
 
     def setup_connections(self):
@@ -171,6 +212,8 @@ class AnalyzerTab(QWidget):
         self.clear_btn.clicked.connect(self.clear_data)
         self.copy_results_btn.clicked.connect(self.copy_results)
         self.export_btn.clicked.connect(self.export_results)
+        self.recheck_cb.toggled.connect(self.toggle_recheck)
+        self.history_btn.clicked.connect(self.show_history_dialog)
         
         for cb in [self.show_available_cb, self.show_expired_cb, self.show_claimed_cb,
                    self.show_error_cb, self.show_vip_valid_cb, self.show_vip_expired_cb,
@@ -220,34 +263,166 @@ class AnalyzerTab(QWidget):
             QMessageBox.warning(self, "警告", "没有找到有效的链接！")
             return
 
+        max_workers = self.thread_spinbox.value()
+        try:
+            self.job_state.clear('analyzer')
+            self.job_state.save('analyzer', {'links': links, 'max_workers': max_workers,
+                                             'stage_workers': self.stage_workers()})
+        except OSError:
+            pass
+        self.launch_analysis(links, max_workers)
+
+    def record_results(self, results):
+        import sqlite3
+
+        try:
+            get_result_db().record_results(results)
+        except sqlite3.Error:
+            pass
+
+    def show_history_dialog(self):
+        from .history_dialog import HistoryDialog
+
+        if self.history_dialog is None:
+            self.history_dialog = HistoryDialog(self)
+        else:
+            self.history_dialog.run_query()
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+
+    def resume_saved_job(self):
+        state = self.job_state.load('analyzer')
+        if not state or not state.get('links') or (self.analyzer_worker and self.analyzer_worker.isRunning()):
+            return False
+
+        links = state['links']
+        max_workers = state.get('max_workers', self.thread_spinbox.value())
+        previous_results = self.job_state.read_journal('analyzer')
+
+        self.links_text.blockSignals(True)
+        self.links_text.setPlainText('\n'.join(links))
+        self.links_text.blockSignals(False)
+        self.update_links_count()
+        self.thread_spinbox.setValue(max_workers)
+        stage_workers = state.get('stage_workers') or {}
+        self.gift_workers_spinbox.setValue(stage_workers.get('gift', self.gift_workers_spinbox.value()))
+        self.vip_workers_spinbox.setValue(stage_workers.get('vip', self.vip_workers_spinbox.value()))
+        self.launch_analysis(links, max_workers, previous_results)
+        return True
+
+    def launch_analysis(self, links, max_workers, previous_results=None):
+        previous_results = previous_results or []
+        done_links = {result.get('short_url') for result in previous_results}
+        remaining_links = [link for link in links if link not in done_links]
+
         self.analyze_btn.setEnabled(False)
         self.pause_btn.setEnabled(True)
         self.stop_btn.setEnabled(True)
 
-        self.current_results = []
-        self.results_table.setRowCount(0)
+        self.reset_results()
         self.stats_text.clear()
 
         self.progress_bar.setMaximum(len(links))
-        self.progress_bar.setValue(0)
+        self.progress_offset = len(links) - len(remaining_links)
+        self.progress_bar.setValue(self.progress_offset)
+        self.show_results(previous_results)
+        self.journal_results = True
+        self.start_worker(remaining_links, max_workers)
+
+    def start_streaming(self):
+        # 扫描器边扫边分析：返回供扫描线程写入的 LinkFeed；分析器正忙时返回 None
+        if self.analyzer_worker and self.analyzer_worker.isRunning():
+            return None
 
         max_workers = self.thread_spinbox.value()
-        self.analyzer_worker = AnalyzerWorker(links, max_workers)
+        feed = LinkFeed(maxsize=max_workers * 4)
+        self.job_state.clear('analyzer')
+
+        self.analyze_btn.setEnabled(False)
+        self.pause_btn.setEnabled(True)
+        self.stop_btn.setEnabled(True)
+
+        self.reset_results()
+        self.stats_text.clear()
+        self.progress_offset = 0
+        self.progress_bar.setMaximum(0)
+        self.progress_label.setText("等待扫描结果...")
+        # 边扫边分析没有固定的链接列表可供续跑，结果不写入续跑日志；崩溃后由扫描器从断点继续
+        self.journal_results = False
+        self.start_worker(feed, max_workers)
+        return feed
+
+    def stage_workers(self):
+        return {'resolve': self.thread_spinbox.value(),
+                'gift': self.gift_workers_spinbox.value(),
+                'vip': self.vip_workers_spinbox.value()}
+
+    def start_worker(self, links, max_workers):
+        # 勾选跳过已分析时，由工作线程查询历史结果库，查到的结果通过 known_results_ready 发回
+        skip_statuses = FINAL_STATUSES if self.skip_analyzed_cb.isChecked() else None
+        self.analyzer_worker = AnalyzerWorker(links, max_workers, self.stage_workers(), skip_statuses)
+        self.analyzer_worker.known_results_ready.connect(self.add_known_results)
         self.analyzer_worker.progress_updated.connect(self.update_progress)
-        self.analyzer_worker.single_result_ready.connect(self.add_single_result)
+        self.analyzer_worker.results_batch_ready.connect(self.add_results_batch)
         self.analyzer_worker.finished.connect(self.analysis_completed)
         self.analyzer_worker.start()
 
     def stop_analysis(self):
         if self.analyzer_worker and self.analyzer_worker.isRunning():
-            self.analyzer_worker.stop()
-            self.analyzer_worker.wait()
+            self.retire_worker(self.analyzer_worker)
+            self.analyzer_worker = None
+            self.progress_label.setText("分析已停止")
+        self.job_state.clear('analyzer')
 
         self.analyze_btn.setEnabled(True)
         self.pause_btn.setEnabled(False)
         self.stop_btn.setEnabled(False)
         self.pause_btn.setText("⏸️ 暂停")
 
+    def retire_worker(self, worker):
+        # 不在 GUI 线程等待线程退出：断开信号后保留引用，线程在连接中止后自行结束
+        worker.stop()
+        worker.progress_updated.disconnect()
+        worker.results_batch_ready.disconnect()
+        worker.finished.disconnect()
+        self.retired_workers = [w for w in self.retired_workers if w.isRunning()]
+        self.retired_workers.append(worker)
+
+    def running_workers(self):
+        workers = self.retired_workers + [worker for worker in (self.analyzer_worker, self.recheck_scheduler)
+                                          if worker]
+        return [worker for worker in workers if worker.isRunning()]
+
+    def toggle_recheck(self, enabled):
+        if not enabled:
+            self.stop_recheck()
+            return
+        if self.recheck_scheduler:
+            return
+
+        self.recheck_scheduler = RecheckScheduler()
+        self.recheck_scheduler.single_result_ready.connect(self.update_result)
+        # 复查在后台线程读取结果，交给调度器的是独立的字典副本
+        for result in self.results_model.results:
+            if self.recheck_scheduler.is_recheckable(result):
+                self.recheck_scheduler.schedule(dict(result))
+        self.recheck_scheduler.start()
+
+    def stop_recheck(self):
+        if not self.recheck_scheduler:
+            return
+        scheduler = self.recheck_scheduler
+        self.recheck_scheduler = None
+        scheduler.stop()
+        scheduler.single_result_ready.disconnect()
+        self.retired_workers = [w for w in self.retired_workers if w.isRunning()]
+        self.retired_workers.append(scheduler)
+
+    def reset_results(self):
+        self.results_model.clear()
+        if self.recheck_scheduler:
+            self.recheck_scheduler.clear()
+
     def toggle_pause_analysis(self):
         if not self.analyzer_worker or not self.analyzer_worker.isRunning():
             return
@@ -260,31 +435,46 @@ class AnalyzerTab(QWidget):
             self.pause_btn.setText("⏸️ 暂停")
 
     def update_progress(self, current, total, status):
+        current += self.progress_offset
+        total += self.progress_offset
+        if total != self.progress_bar.maximum():
+            self.progress_bar.setMaximum(total)
         self.progress_bar.setValue(current)
         self.progress_label.setText(f"进度: {current}/{total} - {status}")
 
-    def add_single_result(self, result):
-        from PyQt6.QtWidgets import QTableWidgetItem
-
-        self.current_results.append(result)
-
-        row = self.results_table.rowCount()
-        self.results_table.insertRow(row)
+    def add_known_results(self, results):
+        # 历史结果库中已有最终结果的链接不再分析，计入进度但不写入续跑日志
+        self.progress_offset += len(results)
+        self.progress_bar.setValue(self.progress_offset)
+        self.show_results(results)
+
+    def add_results_batch(self, results):
+        if self.journal_results:
+            try:
+                self.job_state.extend_journal('analyzer', results)
+            except (OSError, TypeError, ValueError):
+                pass
+        self.record_results(results)
+        self.show_results(results)
+
+    def show_results(self, results):
+        if not results:
+            return
 
-        status = result.get('status_text', result.get('message', '未知'))
-        link = result.get('short_url', '')
-        gift_type = result.get('gift_type', '')
-        sender = result.get('sender_name', result.get('sender', ''))
-        count = result.get('gift_count', f"{result.get('available_count', 0)}/{result.get('total_count', 0)}")
-        expire_date = result.get('expire_date', '')
-        price = str(result.get('gift_price', 0))
-        details = result.get('error_message', result.get('message', ''))
+        self.results_model.add_results(results)
+        if self.recheck_scheduler:
+            for result in results:
+                self.recheck_scheduler.schedule(result)
 
-        items = [status, link, gift_type, sender, count, expire_date, price, details]
-        for col, item in enumerate(items):
-            self.results_table.setItem(row, col, QTableWidgetItem(str(item)))
+        if self.results_model.sort_column < 0:
+            self.results_table.scrollToBottom()
+        self.update_statistics()
 
-        self.results_table.scrollToBottom()
+    def update_result(self, result):
+        if self.results_model.result_for(result.get('short_url', '')) is None:
+            return
+        self.results_model.replace_result(result)
+        self.record_results([result])
         self.update_statistics()
 
     def analysis_completed(self):
@@ -292,19 +482,24 @@ class AnalyzerTab(QWidget):
         self.pause_btn.setEnabled(False)
         self.stop_btn.setEnabled(False)
         self.progress_label.setText("分析完成")
+        self.job_state.clear('analyzer')
 
     def update_statistics(self):
-        if not self.current_results:
+        if not self.results_model.results:
             return
 
-        total = len(self.current_results)
-        available = len([r for r in self.current_results if r.get('gift_status') == 'available'])
-        expired = len([r for r in self.current_results if r.get('gift_status') == 'expired'])
-        claimed = len([r for r in self.current_results if r.get('gift_status') == 'claimed'])
-        vip_valid = len([r for r in self.current_results if r.get('vip_status') == 'valid'])
-        audio_valid = len([r for r in self.current_results if r.get('is_audio_link') and r.get('gift_status') == 'available'])
-        audio_expired = len([r for r in self.current_results if r.get('is_audio_link') and r.get('gift_status') == 'expired'])
-        errors = len([r for r in self.current_results if r.get('status') != 'success'])
+        # 统计直接在结果存储的编码列上计数，不逐条遍历结果
+        store = self.results_model.results
+        gift_counts = store.value_counts('gift_status')
+        audio_counts = store.value_counts('gift_status', where='is_audio_link')
+        total = len(store)
+        available = gift_counts.get('available', 0)
+        expired = gift_counts.get('expired', 0)
+        claimed = gift_counts.get('claimed', 0)
+        vip_valid = store.value_counts('vip_status').get('valid', 0)
+        audio_valid = audio_counts.get('available', 0)
+        audio_expired = audio_counts.get('expired', 0)
+        errors = total - store.value_counts('status').get('success', 0)
 
         stats = f"""总数: {total}
 可领取: {available}
@@ -318,10 +513,14 @@ VIP有效: {vip_valid}
         self.stats_text.setPlainText(stats)
 
     def update_table_filter(self):
-        pass
+        checkboxes = [self.show_available_cb, self.show_expired_cb, self.show_claimed_cb,
+                      self.show_error_cb, self.show_vip_valid_cb, self.show_vip_expired_cb,
+                      self.show_audio_valid_cb, self.show_audio_expired_cb]
+        self.results_model.set_allowed_categories(
+            [category for category, cb in zip(FILTER_CATEGORIES, checkboxes) if cb.isChecked()])
 
     def save_results(self):
-        if not self.current_results:
+        if not self.results_model.results:
             QMessageBox.information(self, "提示", "没有结果可保存")
             return
 
@@ -330,7 +529,7 @@ VIP有效: {vip_valid}
         )
 
         if file_path:
-            self.file_worker = FileOperationWorker('save', file_path, self.current_results)
+            self.file_worker = FileOperationWorker('save', file_path, self.results_model.results.to_dicts())
             self.file_worker.operation_completed.connect(
                 lambda s, m, d: QMessageBox.information(self, "成功" if s else "失败", m)
             )
@@ -339,11 +538,11 @@ VIP有效: {vip_valid}
     def copy_results(self):
         from PyQt6.QtWidgets import QApplication, QMessageBox
 
-        if not self.current_results:
+        if not self.results_model.results:
             QMessageBox.information(self, "提示", "没有结果可复制")
             return
 
-        links = [result.get('short_url', '') for result in self.current_results if result.get('short_url')]
+        links = [result.get('short_url', '') for result in self.results_model.results if result.get('short_url')]
 
         if links:
             clipboard_text = '\n'.join(links)
@@ -357,8 +556,7 @@ VIP有效: {vip_valid}
 
     def clear_data(self):
         self.links_text.clear()
-        self.results_table.setRowCount(0)
+        self.reset_results()
         self.stats_text.clear()
-        self.current_results = []
         self.progress_bar.setValue(0)
         self.progress_label.setText("就绪")
@@ -0,0 +1,210 @@
+import os
+import sys
+import glob
+import json
+import threading
+import traceback
+import faulthandler
+from collections import deque
+from datetime import datetime
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout
+from PyQt6.QtCore import QObject, pyqtSignal, QtMsgType, qInstallMessageHandler
+from .ui_effects import AnimatedButton, ModernTextEdit, ModernLabel
+
+ISSUE_URL = "https://github.com/Afly-dream/Free-wyy/issues/new"
+
+class CrashReportDialog(QDialog):
+    def __init__(self, log_file, parent=None):
+        super().__init__(parent)
+        self.log_file = log_file
+        self.setWindowTitle("程序异常退出")
+        self.resize(500, 400)
+        self.setStyleSheet("QDialog { background: #2d3748; }")
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        title_label = ModernLabel("⚠️ 程序异常")
+        title_label.setStyleSheet("QLabel { color: #ffffff; font-size: 16px; font-weight: bold; background: transparent; }")
+        message_label = ModernLabel("检测到程序发生异常，是否查看错误日志并提交问题报告？")
+        message_label.setWordWrap(True)
+
+        self.log_text = ModernTextEdit()
+        self.log_text.setReadOnly(True)
+        self.load_log_content()
+
+        button_layout = QHBoxLayout()
+        submit_btn = AnimatedButton("提交Issue")
+        close_btn = AnimatedButton("关闭")
+        submit_btn.clicked.connect(self.submit_issue)
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(submit_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(close_btn)
+
+        layout.addWidget(title_label)
+        layout.addWidget(message_label)
+        layout.addWidget(self.log_text)
+        layout.addLayout(button_layout)
+
+    def load_log_content(self):
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                self.log_text.setPlainText(f.read())
+        except Exception as e:
+            self.log_text.setPlainText(f"无法读取日志文件: {str(e)}")
+
+    def submit_issue(self):
+        import webbrowser
+        webbrowser.open(ISSUE_URL)
+        self.accept()
+
+def _lock_file(f):
+    # 非阻塞独占锁，已被其他进程持有时抛出 OSError；进程退出后由系统自动释放
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+class _DialogTrigger(QObject):
+    requested = pyqtSignal()
+
+class CrashHandler:
+    def __init__(self, crash_log_file="crash_log.txt", fault_log_file="fault_trace.log"):
+        self.crash_log_file = crash_log_file
+        # 每个进程使用自己的故障文件并持有文件锁，多开时不会把仍在运行的实例误判为崩溃
+        base, ext = os.path.splitext(fault_log_file)
+        self.fault_log_pattern = f"{base}*{ext}"
+        self.fault_log_file = f"{base}.{os.getpid()}{ext}"
+        self.qt_messages = deque(maxlen=200)
+        self.fault_file = None
+        self.dialog_trigger = None
+        self.dialog_open = False
+
+    def install(self, use_fault_file=True):
+        # 故障文件在正常退出时删除；启动时仍存在说明上次进程被信号杀死或发生致命错误
+        previous_crash = False
+        if use_fault_file:
+            previous_crash = self.collect_previous_crash()
+            try:
+                self.fault_file = open(self.fault_log_file, 'w', encoding='utf-8')
+                _lock_file(self.fault_file)
+                faulthandler.enable(self.fault_file, all_threads=True)
+            except OSError:
+                self.fault_file = None
+        else:
+            # 由外部监控程序托管时，致命错误输出到 stderr 由监控程序收集
+            faulthandler.enable(all_threads=True)
+
+        sys.excepthook = self.handle_exception
+        threading.excepthook = self.handle_thread_exception
+        qInstallMessageHandler(self.handle_qt_message)
+        return previous_crash
+
+    def collect_previous_crash(self):
+        fault_texts = []
+        for path in sorted(glob.glob(self.fault_log_pattern)):
+            try:
+                with open(path, 'r+', encoding='utf-8', errors='ignore') as f:
+                    # 能拿到锁说明写入该文件的进程已经结束；拿不到则是仍在运行的其他实例
+                    _lock_file(f)
+                    f.seek(0)
+                    fault_texts.append(f.read().strip())
+                os.remove(path)
+            except OSError:
+                continue
+        if not fault_texts:
+            return False
+        fault_text = '\n\n'.join(text for text in fault_texts if text)
+        self.write_crash_log(-1, fault_text or "Main process terminated unexpectedly",
+                             "Previous session did not exit normally")
+        return True
+
+    def write_crash_log(self, return_code, stderr_text, stdout_text=None):
+        crash_info = {
+            "timestamp": datetime.now().isoformat(),
+            "return_code": return_code,
+            "stdout": stdout_text if stdout_text is not None else '\n'.join(self.qt_messages),
+            "stderr": stderr_text
+        }
+        try:
+            with open(self.crash_log_file, 'w', encoding='utf-8') as f:
+                json.dump(crash_info, f, indent=2, ensure_ascii=False)
+        except OSError:
+            pass
+
+    def handle_exception(self, exc_type, exc_value, exc_tb):
+        if issubclass(exc_type, KeyboardInterrupt):
+            sys.__excepthook__(exc_type, exc_value, exc_tb)
+            return
+
+        text = ''.join(traceback.format_exception(exc_type, exc_value, exc_tb))
+        if sys.__stderr__:
+            sys.__stderr__.write(text)
+        self.write_crash_log(1, text)
+        if self.fault_file:
+            # 写入故障文件，下次启动时据此弹出崩溃报告
+            try:
+                self.fault_file.write(text)
+                self.fault_file.flush()
+            except (OSError, ValueError):
+                pass
+        # 与 PyQt 默认行为一致：槽函数中未处理的异常直接终止进程，避免带着损坏的状态继续运行，
+        # 同时让监控程序按非零退出码自动重启
+        os._exit(1)
+
+    def handle_thread_exception(self, args):
+        if issubclass(args.exc_type, SystemExit):
+            return
+
+        thread_name = args.thread.name if args.thread else 'unknown'
+        text = f"Exception in thread {thread_name}:\n" + ''.join(
+            traceback.format_exception(args.exc_type, args.exc_value, args.exc_traceback))
+        if sys.__stderr__:
+            sys.__stderr__.write(text)
+        self.write_crash_log(1, text)
+        self.request_dialog()
+
+    def handle_qt_message(self, mode, context, message):
+        self.qt_messages.append(f"{datetime.now().isoformat()} [{mode.name}] {message}")
+        if mode == QtMsgType.QtFatalMsg:
+            self.write_crash_log(-1, message)
+        if sys.__stderr__:
+            sys.__stderr__.write(message + '\n')
+
+    def attach_to_app(self):
+        # 需在 QApplication 创建后于 GUI 线程调用
+        self.dialog_trigger = _DialogTrigger()
+        self.dialog_trigger.requested.connect(self.show_crash_dialog)
+
+    def request_dialog(self):
+        if self.dialog_trigger is None:
+            return
+        # 信号跨线程时自动排队到 GUI 线程执行
+        self.dialog_trigger.requested.emit()
+
+    def show_crash_dialog(self):
+        if self.dialog_open:
+            return
+        self.dialog_open = True
+        try:
+            dialog = CrashReportDialog(self.crash_log_file)
+            dialog.exec()
+        finally:
+            self.dialog_open = False
+
+    def uninstall(self):
+        if self.fault_file:
+            faulthandler.disable()
+            self.fault_file.close()
+            self.fault_file = None
+            try:
+                os.remove(self.fault_log_file)
+            except OSError:
+                pass
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import time
+import threading
+from .workers import base62_to_int, int_to_base62, MISSING_STATUS_CODES
+
+FRONTIER_FILE = "frontier.json"
+
+MAX_ID = 62 ** 6
+
+# 每个检测点连续探测的ID数：已发放区域中零星的空缺不会被误判为前沿
+SEARCH_WINDOW = 16
+PROBE_RETRIES = 3
+RETRY_BACKOFF = 1.0
+
+def probe_issued(session, prefix, probe_id):
+    import requests
+
+    # 已发放的短码会跳转（无论目标是否为礼品链接），未发放的返回 MISSING_STATUS_CODES 中的状态码；
+    # 限流、5xx 等其他状态说明不了是否发放，重试后仍然如此则抛出异常，不能当作未发放，否则会把二分引向错误的前沿
+    url = f"http://163cn.tv/{prefix}{int_to_base62(probe_id)}"
+    for attempt in range(PROBE_RETRIES):
+        try:
+            resp = session.head(url, allow_redirects=False, timeout=5)
+        except requests.exceptions.RequestException:
+            if attempt == PROBE_RETRIES - 1:
+                raise
+            continue
+        if resp.status_code in (301, 302):
+            return True
+        if resp.status_code in MISSING_STATUS_CODES:
+            return False
+        if attempt == PROBE_RETRIES - 1:
+            raise requests.exceptions.HTTPError(f"{url} 返回状态码 {resp.status_code}", response=resp)
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+class FrontierFinder:
+    # 在“已发放 / 未发放”的分界附近，先指数步长找到包含分界的区间，再二分收窄，探测次数随距离对数增长
+    def __init__(self, probe, window=SEARCH_WINDOW, should_continue=None):
+        self.probe = probe
+        self.window = window
+        self.should_continue = should_continue
+        self.probes = 0
+        self.last_issued = None
+
+    def issued_near(self, probe_id):
+        for offset in range(self.window):
+            if probe_id + offset >= MAX_ID:
+                break
+            if self.should_continue is not None and not self.should_continue():
+                raise InterruptedError("前沿定位已取消")
+            self.probes += 1
+            if self.probe(probe_id + offset):
+                if self.last_issued is None or probe_id + offset > self.last_issued:
+                    self.last_issued = probe_id + offset
+                return True
+        return False
+
+    def find(self, hint):
+        # 返回已发放的最大ID；hint 附近及以下都没有已发放的短码时返回 None
+        hint = min(max(0, hint), MAX_ID - 1)
+        step = self.window
+        if self.issued_near(hint):
+            low = hint
+            high = min(low + step, MAX_ID)
+            while high < MAX_ID and self.issued_near(high):
+                low = high
+                step *= 2
+                high = min(low + step, MAX_ID)
+        else:
+            high = hint
+            low = max(0, high - step)
+            while not self.issued_near(low):
+                if low == 0:
+                    return None
+                high = low
+                step *= 2
+                low = max(0, high - step)
+
+        # low 处有已发放的短码，high 处连续 window 个都未发放
+        while high - low > self.window:
+            middle = (low + high) // 2
+            if self.issued_near(middle):
+                low = middle
+            else:
+                high = middle
+        # 从最后确认的已发放ID向上逐个探测，直到连续 window 个未发放
+        while self.last_issued + 1 < MAX_ID and self.issued_near(self.last_issued + 1):
+            pass
+        return self.last_issued
+
+class FrontierStore:
+    def __init__(self, path=FRONTIER_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, prefix):
+        entry = self.load().get(prefix)
+        if not isinstance(entry, dict) or not isinstance(entry.get('frontier'), int):
+            return None
+        return entry
+
+    def save(self, prefix, frontier):
+        with self.lock:
+            data = self.load()
+            previous = data.get(prefix) if isinstance(data.get(prefix), dict) else {}
+            entry = {'frontier': frontier, 'found_at': time.time()}
+            # 保留上一次的位置，用来估计前沿推进的速度
+            if previous.get('frontier') is not None and previous.get('frontier') != frontier:
+                entry['previous'] = previous.get('frontier')
+                entry['previous_at'] = previous.get('found_at')
+            elif previous.get('previous') is not None:
+                entry['previous'] = previous['previous']
+                entry['previous_at'] = previous.get('previous_at')
+            data[prefix] = entry
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        return entry
+
+def advance_rate(entry):
+    # 前沿每小时推进的ID数；没有足够的历史时返回 None
+    if not entry or entry.get('previous') is None or not entry.get('previous_at'):
+        return None
+    elapsed = entry['found_at'] - entry['previous_at']
+    if elapsed <= 0:
+        return None
+    return (entry['frontier'] - entry['previous']) / elapsed * 3600
+
+def locate_frontier(prefix, hint=None, window=SEARCH_WINDOW, session=None, should_continue=None, store=None):
+    # 以上次记录的前沿和 hint 中较大者为起点（前沿只会向上移动）；返回 (前沿ID或None, 探测次数)
+    from .http_client import create_session
+
+    store = store or FrontierStore()
+    saved = store.get(prefix)
+    candidates = [value for value in (hint, saved and saved['frontier']) if value is not None]
+    start = max(candidates) if candidates else MAX_ID // 2
+
+    own_session = session is None
+    session = session or create_session()
+    try:
+        finder = FrontierFinder(lambda probe_id: probe_issued(session, prefix, probe_id), window, should_continue)
+        frontier = finder.find(start)
+    finally:
+        if own_session:
+            session.close()
+    if frontier is not None:
+        try:
+            store.save(prefix, frontier)
+        except OSError:
+            pass
+    return frontier, finder.probes
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] in ('-h', '--help'):
+        print("用法: python -m app.frontier <前缀> [起点后缀] [--window N]")
+        print("  从起点（默认上次记录的前沿）出发定位已发放与未发放短码的分界")
+        sys.exit(0 if args else 1)
+    window = SEARCH_WINDOW
+    if '--window' in args:
+        index = args.index('--window')
+        try:
+            window = int(args[index + 1])
+        except (IndexError, ValueError):
+            print("--window 需要一个整数")
+            sys.exit(1)
+        del args[index:index + 2]
+    prefix = args[0]
+    hint = base62_to_int(args[1]) if len(args) > 1 else None
+
+    import requests
+
+    started = time.perf_counter()
+    try:
+        frontier, probes = locate_frontier(prefix, hint, window)
+    except requests.exceptions.RequestException as e:
+        print(f"{prefix}: 定位前沿失败: {e}")
+        sys.exit(3)
+    elapsed = time.perf_counter() - started
+    if frontier is None:
+        print(f"{prefix}: 起点及以下没有找到已发放的短码（探测 {probes} 次，{elapsed:.1f} 秒）")
+        sys.exit(2)
+    print(f"{prefix}: 前沿 {prefix}{int_to_base62(frontier)}（探测 {probes} 次，{elapsed:.1f} 秒）")
+    rate = advance_rate(FrontierStore().get(prefix))
+    if rate is not None:
+        print(f"前沿推进速度约 {rate:.0f} 个/小时")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QHeaderView,
+                            QAbstractItemView, QTableWidgetItem)
+from PyQt6.QtCore import QThread, pyqtSignal
+from .result_db import get_result_db, format_time, format_expire_time
+from .ui_effects import AnimatedButton, ModernTable, ModernLabel, ModernLineEdit, ModernComboBox
+
+TYPE_OPTIONS = [('全部类型', None), ('礼品', 'gift'), ('VIP', 'vip'), ('音质', 'audio')]
+STATUS_OPTIONS = [('全部状态', None), ('可领取', 'available'), ('已过期', 'expired'), ('已领取', 'claimed'),
+                  ('成功', 'success'), ('无效', 'invalid'), ('错误', 'error')]
+
+class HistoryQueryWorker(QThread):
+    query_completed = pyqtSignal(list, object, dict)
+
+    def __init__(self, code, link_type, status, limit=500, parent=None):
+        super().__init__(parent)
+        self.code = code
+        self.link_type = link_type
+        self.status = status
+        self.limit = limit
+
+    def run(self):
+        db = get_result_db()
+        records = db.history(self.code, self.link_type, self.status, self.limit)
+        hit = db.hit_info(self.code) if self.code else None
+        self.query_completed.emit(records, hit, db.stats())
+
+class HistoryDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("历史记录")
+        self.resize(1000, 600)
+        self.setStyleSheet("QDialog { background: rgb(25, 30, 40); }")
+        self.query_worker = None
+        self.query_pending = False
+        self.init_ui()
+        self.setup_connections()
+        self.run_query()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        toolbar_layout = QHBoxLayout()
+        self.code_input = ModernLineEdit()
+        self.code_input.setPlaceholderText("短码或链接（支持前缀）")
+        self.type_combo = ModernComboBox()
+        for text, _ in TYPE_OPTIONS:
+            self.type_combo.addItem(text)
+        self.status_combo = ModernComboBox()
+        for text, _ in STATUS_OPTIONS:
+            self.status_combo.addItem(text)
+        self.search_btn = AnimatedButton("🔍 查询")
+        toolbar_layout.addWidget(self.code_input, 1)
+        toolbar_layout.addWidget(self.type_combo)
+        toolbar_layout.addWidget(self.status_combo)
+        toolbar_layout.addWidget(self.search_btn)
+        layout.addLayout(toolbar_layout)
+
+        self.hit_label = ModernLabel("")
+        layout.addWidget(self.hit_label)
+
+        self.table = ModernTable()
+        headers = ['分析时间', '短码', '类型', '状态', '礼品状态', '过期时间', '详情']
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.stats_label = ModernLabel("")
+        layout.addWidget(self.stats_label)
+
+    def setup_connections(self):
+        self.search_btn.clicked.connect(self.run_query)
+        self.code_input.returnPressed.connect(self.run_query)
+        self.type_combo.currentIndexChanged.connect(self.run_query)
+        self.status_combo.currentIndexChanged.connect(self.run_query)
+
+    def run_query(self):
+        if self.query_worker and self.query_worker.isRunning():
+            # 查询进行中时只记下条件已变化，完成后再按最新条件查一次
+            self.query_pending = True
+            return
+        code = self.code_input.text().strip() or None
+        self.query_worker = HistoryQueryWorker(code, TYPE_OPTIONS[self.type_combo.currentIndex()][1],
+                                               STATUS_OPTIONS[self.status_combo.currentIndex()][1])
+        self.query_worker.query_completed.connect(self.show_records)
+        self.query_worker.finished.connect(self.query_finished)
+        self.search_btn.setEnabled(False)
+        self.query_worker.start()
+
+    def query_finished(self):
+        self.search_btn.setEnabled(True)
+        if self.query_pending:
+            self.query_pending = False
+            self.run_query()
+
+    def show_records(self, records, hit, stats):
+        self.table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            items = [format_time(record['analyzed_at']), record['code'], record['link_type'] or '',
+                     record['status'] or '', record['gift_status'] or '',
+                     format_expire_time(record['expire_time']), record['status_text'] or '']
+            for col, item in enumerate(items):
+                self.table.setItem(row, col, QTableWidgetItem(str(item)))
+
+        if hit:
+            self.hit_label.setText(f"扫描命中: {hit['code']} 共 {hit['seen_count']} 次，"
+                                   f"首次 {format_time(hit['first_seen'])}，最近 {format_time(hit['last_seen'])}")
+        elif self.code_input.text().strip():
+            self.hit_label.setText("扫描器未记录过该短码")
+        else:
+            self.hit_label.setText("")
+
+        hits = sum(stats['hits'].values())
+        self.stats_label.setText(f"共记录扫描命中 {hits} 个，已分析短码 {stats['analyzed_codes']} 个；"
+                                 f"显示最近 {len(records)} 条分析记录")
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import threading
+
+HIT_DENSITY_FILE = "hit_density.json"
+
+# 每个区块 62^3 个连续后缀ID，每个前缀共 62^3 个区块
+BUCKET_WIDTH = 62 ** 3
+
+# 估计命中率时的先验强度：探测数远小于该值的区块，估计值主要取决于相邻区块和整体命中率
+PRIOR_PROBES = 2000
+
+class HitDensityMap:
+    # 按前缀记录每个ID区块的探测数和命中数，跨会话保存
+    SAVE_INTERVAL = 10
+
+    def __init__(self, path=HIT_DENSITY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.buckets = {}
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('bucket_width') != BUCKET_WIDTH:
+            return
+        buckets = {}
+        for prefix, counts in (data.get('prefixes') or {}).items():
+            try:
+                buckets[prefix] = {int(bucket): [int(probes), int(hits)] for bucket, (probes, hits) in counts.items()}
+            except (TypeError, ValueError, AttributeError):
+                continue
+        self.buckets = buckets
+
+    def add(self, prefix, counts):
+        # counts: {区块序号: [探测数, 命中数]}
+        if not counts:
+            return
+        with self.lock:
+            buckets = self.buckets.setdefault(prefix, {})
+            for bucket, (probes, hits) in counts.items():
+                entry = buckets.get(bucket)
+                if entry is None:
+                    buckets[bucket] = [probes, hits]
+                else:
+                    entry[0] += probes
+                    entry[1] += hits
+            self.dirty = True
+
+    def counts(self, prefix):
+        with self.lock:
+            return {bucket: tuple(entry) for bucket, entry in self.buckets.get(prefix, {}).items()}
+
+    def totals(self, prefix):
+        probes = hits = 0
+        for bucket_probes, bucket_hits in self.counts(prefix).values():
+            probes += bucket_probes
+            hits += bucket_hits
+        return probes, hits
+
+    def estimated_rates(self, prefix, buckets):
+        # 两级收缩：相邻两个区块的计数向整体命中率收缩得到先验，区块自身计数再向该先验收缩。
+        # 探测充分的区块以自身为准，没探测过的区块取相邻区块的水平，热点附近会被优先探索
+        counts = self.counts(prefix)
+        total_probes = sum(probes for probes, _ in counts.values())
+        base_rate = sum(hits for _, hits in counts.values()) / total_probes if total_probes else 0.0
+        rates = {}
+        for bucket in buckets:
+            left_probes, left_hits = counts.get(bucket - 1, (0, 0))
+            right_probes, right_hits = counts.get(bucket + 1, (0, 0))
+            prior = ((left_hits + right_hits + PRIOR_PROBES * base_rate)
+                     / (left_probes + right_probes + PRIOR_PROBES))
+            probes, hits = counts.get(bucket, (0, 0))
+            rates[bucket] = (hits + PRIOR_PROBES * prior) / (probes + PRIOR_PROBES)
+        return rates
+
+    def order_ranges(self, prefix, ranges):
+        # 把待扫描区间按区块边界切开，按估计命中率从高到低排列；估计值相同的保持原来的先后顺序
+        pieces = []
+        for start, end in ranges:
+            while start < end:
+                piece_end = min(end, (start // BUCKET_WIDTH + 1) * BUCKET_WIDTH)
+                pieces.append((start, piece_end))
+                start = piece_end
+        rates = self.estimated_rates(prefix, {start // BUCKET_WIDTH for start, _ in pieces})
+        order = sorted(range(len(pieces)), key=lambda index: (-rates[pieces[index][0] // BUCKET_WIDTH], index))
+        return [pieces[index] for index in order], rates
+
+    def save_if_due(self):
+        if self.dirty and time.monotonic() - self.saved_at >= self.SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = {
+                    'bucket_width': BUCKET_WIDTH,
+                    'prefixes': {prefix: {str(bucket): list(entry) for bucket, entry in counts.items()}
+                                 for prefix, counts in self.buckets.items()}
+                }
+                self.dirty = False
+                self.saved_at = time.monotonic()
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(temp_path, self.path)
+            except OSError:
+                self.dirty = True
+                raise
+
+_hit_density = None
+_hit_density_lock = threading.Lock()
+
+def get_hit_density():
+    global _hit_density
+    with _hit_density_lock:
+        if _hit_density is None:
+            _hit_density = HitDensityMap()
+        return _hit_density
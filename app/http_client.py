@@ -0,0 +1,182 @@
+import time
+import socket
+import weakref
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from .latency import latency_stats
+
+_phase_local = threading.local()
+
+class RequestAborted(requests.exceptions.ConnectionError):
+    pass
+
+def _add_phase(name, seconds):
+    setattr(_phase_local, name, getattr(_phase_local, name, 0.0) + seconds)
+
+def _track_connection(conn, sock):
+    # 登记到当前线程正在发送请求的适配器，以便 abort() 时关闭底层连接
+    conn._raw_sock = sock
+    adapter = getattr(_phase_local, 'adapter', None)
+    if adapter is not None and not adapter.track(conn):
+        sock.close()
+        raise RequestAborted("请求已中止")
+    return sock
+
+class TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = _track_connection(self, super()._new_conn())
+        if latency_stats.enabled:
+            # requests/urllib3 不单独暴露 DNS 解析，connect 阶段包含 DNS + TCP 握手
+            _add_phase('connect', time.perf_counter() - start)
+        return sock
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = _track_connection(self, super()._new_conn())
+        if latency_stats.enabled:
+            elapsed = time.perf_counter() - start
+            self._tcp_elapsed = elapsed
+            _add_phase('connect', elapsed)
+        return sock
+
+    def connect(self):
+        if not latency_stats.enabled:
+            return super().connect()
+        self._tcp_elapsed = 0.0
+        start = time.perf_counter()
+        super().connect()
+        _add_phase('tls', time.perf_counter() - start - self._tcp_elapsed)
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def __init__(self, *args, **kwargs):
+        self.connections = weakref.WeakSet()
+        self.connections_lock = threading.Lock()
+        self.aborted = False
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+    def track(self, conn):
+        with self.connections_lock:
+            if self.aborted:
+                return False
+            self.connections.add(conn)
+            return True
+
+    def abort(self):
+        # 可在任意线程调用：关闭所有连接的套接字，阻塞在读写上的请求会立即出错返回
+        with self.connections_lock:
+            self.aborted = True
+            connections = list(self.connections)
+        for conn in connections:
+            for sock in (getattr(conn, 'sock', None), getattr(conn, '_raw_sock', None)):
+                if sock is None:
+                    continue
+                try:
+                    if sock.fileno() != -1:
+                        sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.aborted:
+            raise RequestAborted("请求已中止", request=request)
+        _phase_local.adapter = self
+        try:
+            return self._send(request, stream, timeout, verify, cert, proxies)
+        finally:
+            _phase_local.adapter = None
+
+    def _send(self, request, stream, timeout, verify, cert, proxies):
+        if not latency_stats.enabled:
+            return super().send(request, stream=stream, timeout=timeout,
+                                verify=verify, cert=cert, proxies=proxies)
+
+        _phase_local.connect = 0.0
+        _phase_local.tls = 0.0
+        start = time.perf_counter()
+        response = super().send(request, stream=stream, timeout=timeout,
+                                verify=verify, cert=cert, proxies=proxies)
+        headers_at = time.perf_counter()
+        if not stream:
+            # 提前读取响应体（requests 会缓存），以便单独统计传输耗时
+            response.content
+        body_at = time.perf_counter()
+
+        operation = latency_stats.current_operation()
+        connect = _phase_local.connect
+        tls = _phase_local.tls
+        if connect:
+            latency_stats.record(f"{operation}/connect", connect)
+        if tls:
+            latency_stats.record(f"{operation}/tls", tls)
+        latency_stats.record(f"{operation}/server", max(0.0, headers_at - start - connect - tls))
+        latency_stats.record(f"{operation}/transfer", body_at - headers_at)
+        return response
+
+def abort_session(session):
+    for adapter in set(session.adapters.values()):
+        if isinstance(adapter, TimedHTTPAdapter):
+            adapter.abort()
+
+def create_session(headers=None):
+    session = requests.Session()
+    adapter = TimedHTTPAdapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+class HttpClient:
+    # requests.Session 不是线程安全的：每个线程使用自己的 Session，
+    # 但共享同一个适配器（连接池），池大小与并发线程数一致，保证每个线程都能复用热连接
+    def __init__(self, pool_size=10, headers=None, adapter=None):
+        self.pool_size = pool_size
+        self.headers = dict(headers or {})
+        self.adapter = adapter or TimedHTTPAdapter(pool_connections=16, pool_maxsize=pool_size)
+        self.local = threading.local()
+
+    def with_headers(self, headers):
+        return HttpClient(self.pool_size, {**self.headers, **headers}, self.adapter)
+
+    def session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            session.headers.update(self.headers)
+            self.local.session = session
+        return session
+
+    def head(self, url, **kwargs):
+        return self.session().head(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.session().get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session().post(url, **kwargs)
+
+    def abort(self):
+        self.adapter.abort()
+
+    def close(self):
+        self.adapter.close()
@@ -0,0 +1,115 @@
+import os
+import json
+import threading
+
+class JobStateStore:
+    def __init__(self, directory="job_state"):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.journals = {}
+        # 后台写入：pending 只保留每个部分最新的状态；write_lock 保证 clear 之后不会再写回旧状态
+        self.write_lock = threading.Lock()
+        self.pending = {}
+        self.wakeup = threading.Event()
+        self.writer = None
+
+    def _state_path(self, section):
+        return os.path.join(self.directory, f"{section}.json")
+
+    def _journal_path(self, section):
+        return os.path.join(self.directory, f"{section}.jsonl")
+
+    def save(self, section, state):
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._state_path(section)
+            temp_path = path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+
+    def save_async(self, section, state):
+        # 序列化和写盘交给后台线程，调用方（GUI 线程）不等待；尚未写入的旧状态直接被替换
+        with self.lock:
+            self.pending[section] = state
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_pending, name="job-state-writer", daemon=True)
+                self.writer.start()
+        self.wakeup.set()
+
+    def write_pending(self):
+        while True:
+            self.wakeup.wait()
+            with self.write_lock:
+                with self.lock:
+                    self.wakeup.clear()
+                    pending, self.pending = self.pending, {}
+                for section, state in pending.items():
+                    try:
+                        self.save(section, state)
+                    except (OSError, TypeError, ValueError):
+                        pass
+
+    def load(self, section):
+        try:
+            with open(self._state_path(section), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else None
+        except (OSError, ValueError):
+            return None
+
+    def append_journal(self, section, record):
+        self.extend_journal(section, [record])
+
+    def extend_journal(self, section, records):
+        lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        with self.lock:
+            journal = self.journals.get(section)
+            if journal is None:
+                os.makedirs(self.directory, exist_ok=True)
+                # 行缓冲：每批记录写完即落盘，崩溃时最多丢失正在写的一批
+                journal = self.journals[section] = open(self._journal_path(section), 'a',
+                                                        encoding='utf-8', buffering=1)
+            journal.write(lines)
+
+    def read_journal(self, section):
+        records = []
+        try:
+            with open(self._journal_path(section), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return records
+
+    def clear(self, section):
+        with self.write_lock, self.lock:
+            self.pending.pop(section, None)
+            journal = self.journals.pop(section, None)
+            if journal:
+                journal.close()
+            for path in (self._state_path(section), self._journal_path(section)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear_journal(self, section):
+        with self.lock:
+            journal = self.journals.pop(section, None)
+            if journal:
+                journal.close()
+            try:
+                os.remove(self._journal_path(section))
+            except OSError:
+                pass
+
+    def has_state(self, section):
+        return os.path.exists(self._state_path(section))
+
+    def clear_all(self):
+        for section in ('scanner', 'analyzer'):
+            self.clear(section)
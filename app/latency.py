@@ -0,0 +1,140 @@
+import json
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 桶边界按 1.25 倍递增，覆盖 50 微秒 ~ 120 秒，内存固定
+BUCKET_BOUNDS = []
+_bound = 0.00005
+while _bound < 120:
+    BUCKET_BOUNDS.append(_bound)
+    _bound *= 1.25
+BUCKET_BOUNDS.append(120.0)
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        if self.count == 0:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                if index >= len(BUCKET_BOUNDS):
+                    return self.max
+                return min(BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': (self.total / self.count * 1000) if self.count else 0.0,
+            'min_ms': (self.min or 0.0) * 1000,
+            'p50_ms': self.percentile(50) * 1000,
+            'p90_ms': self.percentile(90) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+            'buckets': {f"{bound * 1000:.3f}": c
+                        for bound, c in zip(BUCKET_BOUNDS, self.counts) if c},
+            'overflow': self.counts[-1]
+        }
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class LatencyStats:
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._local = threading.local()
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = LatencyHistogram()
+            hist.add(seconds)
+
+    def measure(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def operation(self, name):
+        # 标记当前线程的请求类别，HTTP 适配器据此记录 connect/tls/server 等阶段
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._operation(name)
+
+    @contextmanager
+    def _operation(self, name):
+        previous = getattr(self._local, 'operation', None)
+        self._local.operation = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(f"{name}/total", time.perf_counter() - start)
+            self._local.operation = previous
+
+    def current_operation(self):
+        return getattr(self._local, 'operation', None) or 'http'
+
+    def histograms(self):
+        with self._lock:
+            return {name: hist for name, hist in self._histograms.items()}
+
+    def snapshot(self):
+        with self._lock:
+            phases = {name: hist.to_dict() for name, hist in sorted(self._histograms.items())}
+        return {
+            'enabled': self.enabled,
+            'since': self.started_at,
+            'phases': phases
+        }
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+        self.started_at = time.time()
+
+    def dump_json(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+latency_stats = LatencyStats()
@@ -0,0 +1,88 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QHeaderView,
+                            QAbstractItemView, QFileDialog, QMessageBox, QTableWidgetItem)
+from PyQt6.QtCore import QTimer
+from .latency import latency_stats
+from .workers import FileOperationWorker
+from .ui_effects import AnimatedButton, ModernTable, ModernLabel, ModernCheckBox
+
+class LatencyDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("延迟统计")
+        self.resize(900, 520)
+        self.setStyleSheet("QDialog { background: rgb(25, 30, 40); }")
+        self.file_worker = None
+        self.refresh_timer = QTimer(self)
+        self.init_ui()
+        self.setup_connections()
+        self.refresh()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        toolbar_layout = QHBoxLayout()
+        self.enable_cb = ModernCheckBox("启用分阶段计时")
+        self.enable_cb.setChecked(latency_stats.enabled)
+        self.reset_btn = AnimatedButton("🗑️ 重置")
+        self.export_btn = AnimatedButton("📤 导出JSON")
+        toolbar_layout.addWidget(self.enable_cb)
+        toolbar_layout.addStretch()
+        toolbar_layout.addWidget(self.reset_btn)
+        toolbar_layout.addWidget(self.export_btn)
+        layout.addLayout(toolbar_layout)
+
+        self.table = ModernTable()
+        headers = ['阶段', '次数', '平均(ms)', 'P50(ms)', 'P90(ms)', 'P99(ms)', '最大(ms)']
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.hint_label = ModernLabel("connect 包含 DNS 解析与 TCP 握手；server 为请求发出到收到响应头的等待时间")
+        layout.addWidget(self.hint_label)
+
+    def setup_connections(self):
+        self.enable_cb.toggled.connect(self.toggle_enabled)
+        self.reset_btn.clicked.connect(self.reset_stats)
+        self.export_btn.clicked.connect(self.export_json)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_timer.start(1000)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def toggle_enabled(self, checked):
+        latency_stats.enabled = checked
+
+    def reset_stats(self):
+        latency_stats.reset()
+        self.refresh()
+
+    def refresh(self):
+        phases = latency_stats.snapshot()['phases']
+        self.table.setRowCount(len(phases))
+        for row, (name, stats) in enumerate(phases.items()):
+            items = [name, str(stats['count']), f"{stats['mean_ms']:.2f}", f"{stats['p50_ms']:.2f}",
+                     f"{stats['p90_ms']:.2f}", f"{stats['p99_ms']:.2f}", f"{stats['max_ms']:.2f}"]
+            for col, item in enumerate(items):
+                self.table.setItem(row, col, QTableWidgetItem(item))
+
+    def export_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出延迟统计", "latency_stats.json", "JSON文件 (*.json)")
+        if not file_path:
+            return
+        if not file_path.endswith('.json'):
+            file_path += '.json'
+
+        self.file_worker = FileOperationWorker('save', file_path, latency_stats.snapshot())
+        self.file_worker.operation_completed.connect(
+            lambda s, m, d: QMessageBox.information(self, "成功" if s else "失败", m)
+        )
+        self.file_worker.start()
@@ -5,7 +5,6 @@ from PyQt6.QtWidgets import (QMainWindow, QTabWidget, QWidget, QVBoxLayout,
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, pyqtProperty
 from PyQt6.QtGui import QPainter, QPainterPath, QColor, QLinearGradient
 from .scanner_tab import ScannerTab
-from .analyzer_tab import AnalyzerTab
 from .ui_effects import ModernFrame, BlurredBackground
 
 class ModernTabWidget(QTabWidget):
@@ -41,6 +40,7 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1400, 900)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.latency_dialog = None
         
         self.init_ui()
         self.setup_animations()
@@ -83,22 +83,97 @@ class MainWindow(QMainWindow):
             }
         """)
         close_btn.clicked.connect(self.close)
+
+        latency_btn = QPushButton("⏱️")
+        latency_btn.setFixedSize(30, 30)
+        latency_btn.setToolTip("延迟统计")
+        latency_btn.setStyleSheet("""
+            QPushButton {
+                background: rgba(70, 80, 90, 200);
+                color: white;
+                border: none;
+                border-radius: 15px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background: rgba(90, 100, 110, 220);
+            }
+        """)
+        latency_btn.clicked.connect(self.show_latency_dialog)
         
         title_layout.addWidget(title_label)
         title_layout.addStretch()
+        title_layout.addWidget(latency_btn)
         title_layout.addWidget(close_btn)
         
         self.tabs = ModernTabWidget()
         
         self.scanner_tab = ScannerTab()
-        self.analyzer_tab = AnalyzerTab()
+        # 分析器标签页在首次切换时才构建
+        self.analyzer_tab = None
+        self.analyzer_container = QWidget()
+        analyzer_layout = QVBoxLayout(self.analyzer_container)
+        analyzer_layout.setContentsMargins(0, 0, 0, 0)
         
         self.tabs.addTab(self.scanner_tab, "🔍 链接扫描器")
-        self.tabs.addTab(self.analyzer_tab, "🔬 链接分析器")
+        self.tabs.addTab(self.analyzer_container, "🔬 链接分析器")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         
         main_layout.addWidget(title_frame)
         main_layout.addWidget(self.tabs)
         
+    def on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.analyzer_container:
+            self.ensure_analyzer_tab()
+
+    def ensure_analyzer_tab(self):
+        if self.analyzer_tab is None:
+            from .analyzer_tab import AnalyzerTab
+
+            self.analyzer_tab = AnalyzerTab()
+            self.analyzer_container.layout().addWidget(self.analyzer_tab)
+        return self.analyzer_tab
+
+    def resume_jobs(self):
+        from .job_state import JobStateStore
+
+        self.scanner_tab.resume_saved_job()
+        if JobStateStore().has_state('analyzer'):
+            self.ensure_analyzer_tab().resume_saved_job()
+
+    def show_latency_dialog(self):
+        from .latency_dialog import LatencyDialog
+
+        if self.latency_dialog is None:
+            self.latency_dialog = LatencyDialog(self)
+        self.latency_dialog.show()
+        self.latency_dialog.raise_()
+
+    def running_workers(self):
+        workers = self.scanner_tab.running_workers()
+        if self.analyzer_tab is not None:
+            workers += self.analyzer_tab.running_workers()
+        return workers
+
+    def closeEvent(self, event):
+        if self.scanner_tab.scanner_worker:
+            self.scanner_tab.stop_scan()
+        self.scanner_tab.stop_frontier_locator()
+        if self.analyzer_tab is not None:
+            if self.analyzer_tab.analyzer_worker:
+                self.analyzer_tab.stop_analysis()
+            self.analyzer_tab.stop_recheck()
+
+        if self.running_workers():
+            # 工作线程已被通知停止，先隐藏窗口，待其退出后再真正关闭
+            event.ignore()
+            self.hide()
+            from PyQt6.QtCore import QTimer
+            QTimer.singleShot(50, self.close)
+            return
+        self.scanner_tab.close_scan_log()
+        super().closeEvent(event)
+
     def setup_animations(self):
         self.fade_animation = QPropertyAnimation(self, b"windowOpacity")
         self.fade_animation.setDuration(300)
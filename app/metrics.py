@@ -0,0 +1,113 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .latency import latency_stats, BUCKET_BOUNDS
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_sample(name, labels, value):
+    if labels:
+        label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def set_source(self, name, source):
+        # 同一角色只保留最近一次的 worker，任务结束后仍可读取最终计数
+        with self._lock:
+            self._sources[name] = source
+
+    def remove_source(self, name, source=None):
+        with self._lock:
+            if source is None or self._sources.get(name) is source:
+                self._sources.pop(name, None)
+
+    def render(self):
+        with self._lock:
+            sources = list(self._sources.values())
+
+        families = {}
+        order = []
+        for source in sources:
+            try:
+                samples = list(source.collect_metrics())
+            except Exception:
+                continue
+            for name, metric_type, help_text, labels, value in samples:
+                if name not in families:
+                    families[name] = (metric_type, help_text, [])
+                    order.append(name)
+                families[name][2].append((labels, value))
+
+        lines = []
+        for name in order:
+            metric_type, help_text, samples = families[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(_format_sample(name, labels, value))
+
+        lines.extend(self.render_latency())
+        return '\n'.join(lines) + '\n'
+
+    def render_latency(self):
+        histograms = latency_stats.histograms()
+        if not histograms:
+            return []
+
+        name = 'wyy_phase_latency_seconds'
+        lines = [f"# HELP {name} Per-phase request and processing latency",
+                 f"# TYPE {name} histogram"]
+        for phase, hist in sorted(histograms.items()):
+            counts = list(hist.counts)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, counts):
+                cumulative += bucket_count
+                lines.append(_format_sample(f"{name}_bucket", {'phase': phase, 'le': f"{bound:.6g}"}, cumulative))
+            lines.append(_format_sample(f"{name}_bucket", {'phase': phase, 'le': '+Inf'}, hist.count))
+            lines.append(_format_sample(f"{name}_sum", {'phase': phase}, f"{hist.total:.6f}"))
+            lines.append(_format_sample(f"{name}_count", {'phase': phase}, hist.count))
+        return lines
+
+metrics_registry = MetricsRegistry()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+
+        body = metrics_registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class MetricsServer:
+    def __init__(self, port, host='127.0.0.1'):
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        return self.port
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
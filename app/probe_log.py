@@ -0,0 +1,326 @@
+import os
+import sys
+import glob
+import json
+import time
+import struct
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from .latency import BUCKET_BOUNDS
+
+PROBE_LOG_DIR = "probe_logs"
+
+# 每次探测一条定长记录：ID、时间(秒)、HTTP状态码、结果分类、错误类型、耗时(微秒)
+RECORD = struct.Struct('<QIHBBI')
+HEADER = struct.Struct('<4sBBHQ16s')
+FILE_MAGIC = b'WYPB'
+FILE_VERSION = 1
+
+OUTCOMES = ('invalid', 'gift', 'vip', 'audio', 'redirect_other', 'error')
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+HIT_CODES = (OUTCOME_CODES['gift'], OUTCOME_CODES['vip'], OUTCOME_CODES['audio'])
+
+ERROR_CLASSES = ('', 'ConnectTimeout', 'ReadTimeout', 'Timeout', 'ConnectionError', 'ProxyError', 'SSLError',
+                 'ChunkedEncodingError', 'ContentDecodingError', 'TooManyRedirects', 'RequestException', 'other')
+ERROR_CODES = {name: code for code, name in enumerate(ERROR_CLASSES)}
+
+LATENCY_BOUNDS_US = [int(bound * 1000000) for bound in BUCKET_BOUNDS]
+MAX_LATENCY_US = 0xFFFFFFFF
+
+# 安装了 numpy（requirements.txt）时用内存映射按块做向量化统计，缺少时退回逐条解析
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ProbeLogWriter:
+    def __init__(self, prefix, directory=PROBE_LOG_DIR, buffer_size=1024 * 1024):
+        encoded = prefix.encode('utf-8')
+        if len(encoded) > 16:
+            raise ValueError("前缀过长，探测明细最多支持16字节的前缀")
+        os.makedirs(directory, exist_ok=True)
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.count = 0
+        # 每次扫描单独一个文件；同一秒内启动多次扫描时加序号区分
+        name = f"probes-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        for attempt in range(100):
+            self.path = os.path.join(directory, f"{name}-{attempt}.bin" if attempt else f"{name}.bin")
+            try:
+                self.file = open(self.path, 'xb', buffering=buffer_size)
+                break
+            except FileExistsError:
+                continue
+        else:
+            raise OSError(f"无法创建探测明细文件: {self.path}")
+        self.file.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, len(encoded), 0, int(time.time()), encoded))
+
+    def write(self, probe_id, status, outcome, latency, error=None):
+        record = RECORD.pack(probe_id, int(time.time()), status, OUTCOME_CODES[outcome],
+                             ERROR_CODES.get(error, ERROR_CODES['other']) if error else 0,
+                             min(int(latency * 1000000), MAX_LATENCY_US))
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(record)
+            self.count += 1
+
+    def flush(self):
+        with self.lock:
+            if self.file:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: 文件不完整")
+    magic, version, prefix_size, _, created, prefix = HEADER.unpack(data)
+    if magic != FILE_MAGIC or version != FILE_VERSION:
+        raise ValueError(f"{path}: 不是探测明细文件")
+    return prefix[:prefix_size].decode('utf-8'), created
+
+def record_count(path):
+    # 崩溃时最后一条可能只写了一半，按完整记录数计算
+    return max(0, (os.path.getsize(path) - HEADER.size) // RECORD.size)
+
+if numpy is not None:
+    RECORD_DTYPE = numpy.dtype([('id', '<u8'), ('time', '<u4'), ('status', '<u2'),
+                                ('outcome', 'u1'), ('error', 'u1'), ('latency_us', '<u4')])
+    LATENCY_BOUNDS_ARRAY = numpy.array(LATENCY_BOUNDS_US, dtype=numpy.uint32)
+
+class ProbeLogSummary:
+    def __init__(self, density_width=62 ** 3):
+        self.density_width = density_width
+        self.count = 0
+        self.status_counts = {}
+        self.outcome_counts = [0] * len(OUTCOMES)
+        self.error_counts = [0] * len(ERROR_CLASSES)
+        self.latency_counts = [0] * (len(LATENCY_BOUNDS_US) + 1)
+        self.latency_total = 0
+        self.latency_max = 0
+        self.first_time = None
+        self.last_time = None
+        # {(前缀, 区块起点ID): [探测数, 命中数]}
+        self.density = {}
+
+    def add_file(self, path, chunk_records=1 << 22):
+        prefix, _ = read_header(path)
+        count = record_count(path)
+        if not count:
+            return
+        if numpy is not None:
+            records = numpy.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+            for start in range(0, count, chunk_records):
+                self.add_array(prefix, records[start:start + chunk_records])
+            del records
+        else:
+            with open(path, 'rb') as f:
+                f.seek(HEADER.size)
+                for _ in range(0, count, chunk_records):
+                    data = f.read(chunk_records * RECORD.size)
+                    self.add_bytes(prefix, data[:len(data) - len(data) % RECORD.size])
+
+    def add_array(self, prefix, records):
+        self.count += len(records)
+        statuses = numpy.bincount(records['status'])
+        for status in numpy.flatnonzero(statuses):
+            self.status_counts[int(status)] = self.status_counts.get(int(status), 0) + int(statuses[status])
+        outcomes = records['outcome']
+        for code, count in enumerate(numpy.bincount(outcomes, minlength=len(OUTCOMES))[:len(OUTCOMES)]):
+            self.outcome_counts[code] += int(count)
+        errors = numpy.bincount(records['error'], minlength=len(ERROR_CLASSES))[:len(ERROR_CLASSES)]
+        for code, count in enumerate(errors):
+            self.error_counts[code] += int(count)
+
+        latency = records['latency_us']
+        buckets = numpy.bincount(numpy.searchsorted(LATENCY_BOUNDS_ARRAY, latency, side='left'),
+                                 minlength=len(self.latency_counts))
+        for index, count in enumerate(buckets):
+            self.latency_counts[index] += int(count)
+        self.latency_total += int(latency.sum(dtype=numpy.uint64))
+        self.latency_max = max(self.latency_max, int(latency.max()))
+
+        times = records['time']
+        self.update_time_range(int(times.min()), int(times.max()))
+
+        blocks = records['id'] // self.density_width
+        block_ids, probes = numpy.unique(blocks, return_counts=True)
+        hit_blocks, hits = numpy.unique(blocks[numpy.isin(outcomes, HIT_CODES)], return_counts=True)
+        hits_by_block = dict(zip(hit_blocks.tolist(), hits.tolist()))
+        for block, probe_count in zip(block_ids.tolist(), probes.tolist()):
+            entry = self.density.setdefault((prefix, block * self.density_width), [0, 0])
+            entry[0] += probe_count
+            entry[1] += hits_by_block.get(block, 0)
+
+    def add_bytes(self, prefix, data):
+        status_counts = self.status_counts
+        outcome_counts = self.outcome_counts
+        error_counts = self.error_counts
+        latency_counts = self.latency_counts
+        density = self.density
+        width = self.density_width
+        first_time = last_time = None
+        count = 0
+        for probe_id, timestamp, status, outcome, error, latency in RECORD.iter_unpack(data):
+            count += 1
+            status_counts[status] = status_counts.get(status, 0) + 1
+            outcome_counts[outcome] += 1
+            error_counts[error] += 1
+            latency_counts[bisect_left(LATENCY_BOUNDS_US, latency)] += 1
+            self.latency_total += latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+            if first_time is None or timestamp < first_time:
+                first_time = timestamp
+            if last_time is None or timestamp > last_time:
+                last_time = timestamp
+            key = (prefix, probe_id // width * width)
+            entry = density.get(key)
+            if entry is None:
+                entry = density[key] = [0, 0]
+            entry[0] += 1
+            if outcome in HIT_CODES:
+                entry[1] += 1
+        self.count += count
+        if count:
+            self.update_time_range(first_time, last_time)
+
+    def update_time_range(self, first_time, last_time):
+        if self.first_time is None or first_time < self.first_time:
+            self.first_time = first_time
+        if self.last_time is None or last_time > self.last_time:
+            self.last_time = last_time
+
+    def latency_percentile(self, p):
+        # 与 latency.py 相同的分桶，返回桶上界（毫秒）
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.latency_counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                if index >= len(LATENCY_BOUNDS_US):
+                    return self.latency_max / 1000
+                return min(LATENCY_BOUNDS_US[index], self.latency_max) / 1000
+        return self.latency_max / 1000
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'first_time': self.first_time,
+            'last_time': self.last_time,
+            'status': {str(status): count for status, count in sorted(self.status_counts.items())},
+            'outcome': {outcome: count for outcome, count in zip(OUTCOMES, self.outcome_counts) if count},
+            'errors': {name: count for name, count in zip(ERROR_CLASSES, self.error_counts) if name and count},
+            'latency_ms': {
+                'mean': self.latency_total / self.count / 1000 if self.count else 0.0,
+                'p50': self.latency_percentile(50),
+                'p90': self.latency_percentile(90),
+                'p99': self.latency_percentile(99),
+                'max': self.latency_max / 1000
+            },
+            'density_width': self.density_width,
+            'density': [{'prefix': prefix, 'start': start, 'probes': probes, 'hits': hits}
+                        for (prefix, start), (probes, hits) in sorted(self.density.items())]
+        }
+
+def log_files(directory=PROBE_LOG_DIR):
+    return sorted(glob.glob(os.path.join(directory, "probes-*.bin")))
+
+def analyze(paths=None, density_width=62 ** 3, prefix=None):
+    summary = ProbeLogSummary(density_width)
+    for path in paths if paths is not None else log_files():
+        if prefix is not None and read_header(path)[0] != prefix:
+            continue
+        summary.add_file(path)
+    return summary
+
+def print_usage():
+    print("用法: python -m app.probe_log [--width N] [--prefix 前缀] [--top N] [--json] [文件...]")
+    print(f"  默认分析 {PROBE_LOG_DIR} 目录下的全部探测明细；--width 为命中密度的区块大小（ID个数）")
+
+def main():
+    from .workers import int_to_base62
+
+    args = sys.argv[1:]
+    if '-h' in args or '--help' in args:
+        print_usage()
+        return
+
+    def option(name, default=None):
+        if name in args:
+            index = args.index(name)
+            if index + 1 < len(args):
+                value = args[index + 1]
+                del args[index:index + 2]
+                return value
+        return default
+
+    try:
+        width = int(option("--width", str(62 ** 3)))
+        top = int(option("--top", "20"))
+    except ValueError:
+        print_usage()
+        sys.exit(1)
+    prefix = option("--prefix")
+    as_json = '--json' in args
+    if as_json:
+        args.remove('--json')
+    paths = args or log_files()
+    if not paths:
+        print(f"没有找到探测明细文件（{PROBE_LOG_DIR}）")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        summary = analyze(paths, width, prefix)
+    except (OSError, ValueError) as e:
+        print(e)
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    result = summary.to_dict()
+    if as_json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{len(paths)} 个文件，{summary.count} 条探测记录，分析耗时 {elapsed:.2f} 秒"
+          f"（{'numpy 内存映射' if numpy is not None else '逐条解析，安装 numpy 可大幅加速'}）")
+    if not summary.count:
+        return
+    print(f"时间范围: {datetime.fromtimestamp(summary.first_time):%Y-%m-%d %H:%M:%S} ~ "
+          f"{datetime.fromtimestamp(summary.last_time):%Y-%m-%d %H:%M:%S}")
+    print("\n结果分类:")
+    for outcome, count in result['outcome'].items():
+        print(f"  {outcome:<16}{count:>14}  {count / summary.count:7.2%}")
+    print("\nHTTP 状态码（0 表示请求出错）:")
+    for status, count in result['status'].items():
+        print(f"  {status:<16}{count:>14}  {count / summary.count:7.2%}")
+    if result['errors']:
+        print("\n错误类型:")
+        for name, count in result['errors'].items():
+            print(f"  {name:<24}{count:>10}")
+    latency = result['latency_ms']
+    print(f"\n耗时(ms): 平均 {latency['mean']:.1f}  p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  "
+          f"p99 {latency['p99']:.1f}  最大 {latency['max']:.1f}")
+
+    blocks = sorted(result['density'], key=lambda block: (block['hits'] / block['probes'], block['hits']),
+                    reverse=True)
+    print(f"\n命中密度最高的区块（每块 {width} 个ID，共 {len(blocks)} 块）:")
+    for block in blocks[:top]:
+        start = block['prefix'] + int_to_base62(block['start'])
+        end = block['prefix'] + int_to_base62(min(block['start'] + width, 62 ** 6) - 1)
+        print(f"  {start} ~ {end}  探测 {block['probes']:>10}  命中 {block['hits']:>8}  "
+              f"{block['hits'] / block['probes']:7.3%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import os
+import sys
+import time
+import bisect
+import struct
+import threading
+from array import array
+
+PROBED_RANGES_FILE = "probed_ranges.bin"
+
+FILE_MAGIC = b'WYPR\x01'
+PREFIX_HEADER = struct.Struct('<HQ')
+
+# 批量合并时，另一方区间数不超过本集合的 1/BULK_RATIO 就逐段二分插入，否则整体归并
+BULK_RATIO = 64
+
+class IntervalSet:
+    # 有序、互不重叠且互不相邻的半开区间 [start, end)，起点和终点分别存在两个 64 位数组中
+    def __init__(self, intervals=()):
+        self.starts = array('Q')
+        self.ends = array('Q')
+        for start, end in intervals:
+            self.add(start, end)
+
+    @classmethod
+    def from_arrays(cls, starts, ends):
+        interval_set = cls()
+        interval_set.starts = starts
+        interval_set.ends = ends
+        return interval_set
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __bool__(self):
+        return len(self.starts) > 0
+
+    def __eq__(self, other):
+        return isinstance(other, IntervalSet) and self.starts == other.starts and self.ends == other.ends
+
+    def __contains__(self, value):
+        index = bisect.bisect_right(self.starts, value) - 1
+        return index >= 0 and value < self.ends[index]
+
+    def __repr__(self):
+        return f"IntervalSet({list(self)[:8]}{'...' if len(self) > 8 else ''})"
+
+    def copy(self):
+        return IntervalSet.from_arrays(array('Q', self.starts), array('Q', self.ends))
+
+    def total(self):
+        return sum(self.ends) - sum(self.starts)
+
+    def add(self, start, end):
+        if start >= end:
+            return
+        starts, ends = self.starts, self.ends
+        # 与 [start, end) 重叠或首尾相接的区间是 starts[low:high]
+        low = bisect.bisect_left(ends, start)
+        high = bisect.bisect_right(starts, end)
+        if low < high:
+            start = min(start, starts[low])
+            end = max(end, ends[high - 1])
+        starts[low:high] = array('Q', (start,))
+        ends[low:high] = array('Q', (end,))
+
+    def remove(self, start, end):
+        if start >= end:
+            return
+        starts, ends = self.starts, self.ends
+        low = bisect.bisect_right(ends, start)
+        high = bisect.bisect_left(starts, end)
+        if low >= high:
+            return
+        new_starts = array('Q')
+        new_ends = array('Q')
+        if starts[low] < start:
+            new_starts.append(starts[low])
+            new_ends.append(start)
+        if ends[high - 1] > end:
+            new_starts.append(end)
+            new_ends.append(ends[high - 1])
+        starts[low:high] = new_starts
+        ends[low:high] = new_ends
+
+    def update(self, other):
+        if len(other) * BULK_RATIO <= len(self):
+            for start, end in other:
+                self.add(start, end)
+            return
+        # 两组区间拼接后排序（各自已有序，Timsort 近似线性），再一遍合并
+        pairs = sorted(zip(self.starts + other.starts, self.ends + other.ends))
+        starts = array('Q')
+        ends = array('Q')
+        current_start = current_end = None
+        for start, end in pairs:
+            if current_end is not None and start <= current_end:
+                if end > current_end:
+                    current_end = end
+                continue
+            if current_end is not None:
+                starts.append(current_start)
+                ends.append(current_end)
+            current_start, current_end = start, end
+        if current_end is not None:
+            starts.append(current_start)
+            ends.append(current_end)
+        self.starts, self.ends = starts, ends
+
+    def difference_update(self, other):
+        if len(other) * BULK_RATIO <= len(self):
+            for start, end in other:
+                self.remove(start, end)
+            return
+        starts = array('Q')
+        ends = array('Q')
+        other_starts, other_ends = other.starts, other.ends
+        count = len(other_starts)
+        index = 0
+        for start, end in zip(self.starts, self.ends):
+            # 跳过完全在当前区间之前的被减区间；它们对后面的区间也不再有影响
+            while index < count and other_ends[index] <= start:
+                index += 1
+            cursor = index
+            while start < end and cursor < count and other_starts[cursor] < end:
+                if other_starts[cursor] > start:
+                    starts.append(start)
+                    ends.append(other_starts[cursor])
+                start = max(start, other_ends[cursor])
+                cursor += 1
+            if start < end:
+                starts.append(start)
+                ends.append(end)
+        self.starts, self.ends = starts, ends
+
+    def union(self, other):
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def difference(self, other):
+        result = self.copy()
+        result.difference_update(other)
+        return result
+
+    def gaps(self, start, end):
+        # [start, end) 中尚未被覆盖的子区间
+        starts, ends = self.starts, self.ends
+        index = bisect.bisect_right(ends, start)
+        gaps = []
+        while start < end and index < len(starts) and starts[index] < end:
+            if starts[index] > start:
+                gaps.append((start, starts[index]))
+            start = max(start, ends[index])
+            index += 1
+        if start < end:
+            gaps.append((start, end))
+        return gaps
+
+    def covered(self, start, end):
+        return (end - start) - sum(gap_end - gap_start for gap_start, gap_end in self.gaps(start, end))
+
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values = array('Q', values)
+        values.byteswap()
+    return values
+
+class ProbedRanges:
+    # 按前缀记录历次扫描已探测过的后缀ID区间，跨会话保存在一个二进制文件中
+    SAVE_INTERVAL = 10
+
+    def __init__(self, path=PROBED_RANGES_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.ranges = {}
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        if not data.startswith(FILE_MAGIC):
+            return
+        ranges = {}
+        offset = len(FILE_MAGIC)
+        try:
+            while offset < len(data):
+                prefix_size, count = PREFIX_HEADER.unpack_from(data, offset)
+                offset += PREFIX_HEADER.size
+                prefix = data[offset:offset + prefix_size].decode('utf-8')
+                offset += prefix_size
+                column_size = count * array('Q').itemsize
+                if len(data) - offset < 2 * column_size:
+                    # 该前缀的数据不完整，丢弃它，起点和终点两列才不会长度不一致
+                    break
+                columns = []
+                for _ in range(2):
+                    column = array('Q')
+                    column.frombytes(data[offset:offset + column_size])
+                    offset += column_size
+                    if sys.byteorder == 'big':
+                        column.byteswap()
+                    columns.append(column)
+                ranges[prefix] = IntervalSet.from_arrays(*columns)
+        except (struct.error, ValueError, UnicodeDecodeError):
+            # 文件尾部损坏时保留已完整读出的前缀
+            pass
+        self.ranges = ranges
+
+    def get(self, prefix):
+        with self.lock:
+            interval_set = self.ranges.get(prefix)
+            return interval_set.copy() if interval_set else IntervalSet()
+
+    def gaps(self, prefix, start, end):
+        with self.lock:
+            interval_set = self.ranges.get(prefix)
+            return interval_set.gaps(start, end) if interval_set else [(start, end)] if start < end else []
+
+    def mark(self, prefix, start, end):
+        self.update(prefix, IntervalSet([(start, end)]))
+
+    def update(self, prefix, interval_set):
+        if not interval_set:
+            return
+        with self.lock:
+            self.ranges.setdefault(prefix, IntervalSet()).update(interval_set)
+            self.dirty = True
+
+    def forget(self, prefix, start=None, end=None):
+        with self.lock:
+            if start is None:
+                self.ranges.pop(prefix, None)
+            elif prefix in self.ranges:
+                self.ranges[prefix].remove(start, end)
+            self.dirty = True
+
+    def summary(self, prefix):
+        with self.lock:
+            interval_set = self.ranges.get(prefix)
+            return (interval_set.total(), len(interval_set)) if interval_set else (0, 0)
+
+    def save_if_due(self):
+        if self.dirty and time.monotonic() - self.saved_at >= self.SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                chunks = [FILE_MAGIC]
+                for prefix, interval_set in self.ranges.items():
+                    encoded = prefix.encode('utf-8')
+                    chunks.append(PREFIX_HEADER.pack(len(encoded), len(interval_set)))
+                    chunks.append(encoded)
+                    chunks.append(_little_endian(interval_set.starts).tobytes())
+                    chunks.append(_little_endian(interval_set.ends).tobytes())
+                self.dirty = False
+                self.saved_at = time.monotonic()
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, 'wb') as f:
+                    f.write(b''.join(chunks))
+                os.replace(temp_path, self.path)
+            except OSError:
+                self.dirty = True
+                raise
+
+_probed_ranges = None
+_probed_ranges_lock = threading.Lock()
+
+def get_probed_ranges():
+    global _probed_ranges
+    with _probed_ranges_lock:
+        if _probed_ranges is None:
+            _probed_ranges = ProbedRanges()
+        return _probed_ranges
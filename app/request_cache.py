@@ -0,0 +1,73 @@
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+class _InFlightCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlightCache:
+    # 相同 key 的并发查询只执行一次，其余线程等待并共享结果；成功结果再缓存 ttl 秒
+    def __init__(self, ttl=30.0, max_entries=1024, should_cache=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.should_cache = should_cache or (lambda result: True)
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.calls = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.copy(result)
+                del self.entries[key]
+
+            call = self.calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.calls[key] = _InFlightCall()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.copy(call.result)
+
+        try:
+            call.result = loader()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(key, None)
+                if call.error is None and self.should_cache(call.result):
+                    self.entries[key] = (time.monotonic() + self.ttl, call.result)
+                    self.entries.move_to_end(key)
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+            call.event.set()
+        # 调用方会修改返回的字典，缓存中保留的是独立的一份
+        return copy.copy(call.result)
+
+    def stats(self):
+        with self.lock:
+            return {'hit': self.hits, 'coalesced': self.coalesced, 'miss': self.misses}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,339 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+DB_FILE = "wyy_results.db"
+
+# 这些状态是确定的分析结论，勾选“跳过已分析”时不再重复请求；错误类结果仍会重试
+FINAL_STATUSES = ('success', 'invalid', 'not_gift')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hits (
+    code TEXT PRIMARY KEY,
+    short_url TEXT NOT NULL,
+    link_type TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_hits_type ON hits(link_type);
+
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    code TEXT NOT NULL,
+    short_url TEXT NOT NULL,
+    link_type TEXT,
+    status TEXT,
+    gift_status TEXT,
+    expire_time INTEGER,
+    analyzed_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_code ON results(code, id);
+CREATE INDEX IF NOT EXISTS idx_results_type ON results(link_type);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results(status, gift_status);
+CREATE INDEX IF NOT EXISTS idx_results_expire ON results(expire_time);
+"""
+
+HIT_UPSERT = """
+INSERT INTO hits (code, short_url, link_type, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(code) DO UPDATE SET
+    last_seen = excluded.last_seen,
+    seen_count = seen_count + 1,
+    link_type = COALESCE(excluded.link_type, hits.link_type)
+"""
+
+RESULT_INSERT = """
+INSERT INTO results (code, short_url, link_type, status, gift_status, expire_time, analyzed_at, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def short_code(url):
+    # http://163cn.tv/GKBEP6B -> GKBEP6B；无法解析时原样作为短码
+    url = (url or '').strip()
+    path = urlparse(url).path.strip('/')
+    return path or url
+
+def result_link_type(result):
+    if result.get('is_audio_link'):
+        return 'audio'
+    if result.get('is_vip_link'):
+        return 'vip'
+    if result.get('status') == 'success' or 'gift-receive' in (result.get('redirect_url') or ''):
+        return 'gift'
+    return None
+
+def _chunks(items, size=500):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class ResultDatabase:
+    # 写入由后台线程攒批提交，调用方只是入队；读取在调用线程各自的连接上进行（WAL 下读写互不阻塞）
+    BATCH_SIZE = 500
+    FLUSH_INTERVAL = 0.5
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.queue = queue.Queue()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.writer_thread = None
+        self.closed = False
+        self.written = 0
+        self.write_errors = 0
+        self.connect().executescript(SCHEMA)
+
+    def connect(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def record_hit(self, link_type, url, seen_at=None):
+        seen_at = seen_at or time.time()
+        self.enqueue(('hit', (short_code(url), url, link_type, seen_at, seen_at)))
+
+    def record_results(self, results, analyzed_at=None):
+        analyzed_at = analyzed_at or time.time()
+        for result in results:
+            url = result.get('short_url')
+            if not url:
+                continue
+            expire_time = result.get('expire_time')
+            self.enqueue(('result', (
+                short_code(url), url, result_link_type(result), result.get('status'), result.get('gift_status'),
+                expire_time if isinstance(expire_time, int) else None, analyzed_at,
+                json.dumps(dict(result), ensure_ascii=False, default=str)
+            )))
+
+    def enqueue(self, item):
+        with self.lock:
+            if self.closed:
+                return
+            if self.writer_thread is None:
+                self.writer_thread = threading.Thread(target=self.write_loop, name="result-db-writer", daemon=True)
+                self.writer_thread.start()
+        self.queue.put(item)
+
+    def write_loop(self):
+        connection = self.connect()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE and batch[-1] is not None:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            running = batch[-1] is not None
+            try:
+                self.write_batch(connection, [item for item in batch if item is not None])
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        connection.close()
+        self.local.connection = None
+
+    def write_batch(self, connection, batch):
+        hits = [params for kind, params in batch if kind == 'hit']
+        results = [params for kind, params in batch if kind == 'result']
+        try:
+            with connection:
+                if hits:
+                    connection.executemany(HIT_UPSERT, hits)
+                if results:
+                    connection.executemany(RESULT_INSERT, results)
+            self.written += len(batch)
+        except sqlite3.Error:
+            self.write_errors += len(batch)
+
+    def flush(self):
+        if self.writer_thread is not None:
+            self.queue.join()
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            writer = self.writer_thread
+        if writer is not None:
+            self.queue.put(None)
+            writer.join()
+
+    def seen_codes(self, codes):
+        connection = self.connect()
+        seen = set()
+        for chunk in _chunks(set(codes)):
+            marks = ','.join('?' * len(chunk))
+            for table in ('hits', 'results'):
+                seen.update(row[0] for row in connection.execute(
+                    f"SELECT DISTINCT code FROM {table} WHERE code IN ({marks})", chunk))
+        return seen
+
+    def latest_results(self, urls, statuses=None):
+        # 按短码取最近一次分析结果，返回 {调用方给出的链接: 结果字典}
+        urls_by_code = {}
+        for url in urls:
+            urls_by_code.setdefault(short_code(url), []).append(url)
+
+        connection = self.connect()
+        found = {}
+        for chunk in _chunks(urls_by_code):
+            marks = ','.join('?' * len(chunk))
+            rows = connection.execute(
+                f"SELECT code, status, data FROM results WHERE id IN "
+                f"(SELECT MAX(id) FROM results WHERE code IN ({marks}) GROUP BY code)", chunk)
+            for code, status, data in rows:
+                if statuses is not None and status not in statuses:
+                    continue
+                for url in urls_by_code[code]:
+                    result = json.loads(data)
+                    result['short_url'] = url
+                    found[url] = result
+        return found
+
+    def history(self, code=None, link_type=None, status=None, limit=200):
+        clauses = []
+        params = []
+        if code:
+            clauses.append("code GLOB ?")
+            params.append(short_code(code).replace('[', '[[]').replace('*', '[*]').replace('?', '[?]') + '*')
+        if link_type:
+            clauses.append("link_type = ?")
+            params.append(link_type)
+        if status:
+            if status in ('available', 'expired', 'claimed'):
+                clauses.append("status = 'success' AND gift_status = ?")
+            else:
+                clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.connect().execute(
+            f"SELECT code, short_url, link_type, status, gift_status, expire_time, analyzed_at, data "
+            f"FROM results {where} ORDER BY id DESC LIMIT ?", params + [limit])
+        records = []
+        for code_value, url, type_value, status_value, gift_status, expire_time, analyzed_at, data in rows:
+            result = json.loads(data)
+            records.append({
+                'code': code_value,
+                'short_url': url,
+                'link_type': type_value,
+                'status': status_value,
+                'gift_status': gift_status,
+                'expire_time': expire_time,
+                'analyzed_at': analyzed_at,
+                'status_text': result.get('status_text', result.get('message', ''))
+            })
+        return records
+
+    def hit_info(self, code):
+        row = self.connect().execute(
+            "SELECT code, short_url, link_type, first_seen, last_seen, seen_count FROM hits WHERE code = ?",
+            (short_code(code),)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('code', 'short_url', 'link_type', 'first_seen', 'last_seen', 'seen_count'), row))
+
+    def stats(self):
+        connection = self.connect()
+        return {
+            'hits': dict(connection.execute(
+                "SELECT COALESCE(link_type, 'unknown'), COUNT(*) FROM hits GROUP BY link_type").fetchall()),
+            'results': dict(connection.execute(
+                "SELECT COALESCE(status, 'unknown'), COUNT(*) FROM results GROUP BY status").fetchall()),
+            'analyzed_codes': connection.execute("SELECT COUNT(DISTINCT code) FROM results").fetchone()[0]
+        }
+
+_result_db = None
+_result_db_lock = threading.Lock()
+
+def get_result_db():
+    # 扫描器与分析器共用一个实例，首次使用时才创建数据库文件
+    global _result_db
+    with _result_db_lock:
+        if _result_db is None:
+            _result_db = ResultDatabase()
+            atexit.register(_result_db.close)
+        return _result_db
+
+def format_time(timestamp):
+    if not timestamp:
+        return ''
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+def format_expire_time(expire_time):
+    return format_time(expire_time / 1000) if expire_time else ''
+
+def print_usage():
+    print("用法: python -m app.result_db [--db 文件] <命令>")
+    print("  seen <短码或链接>...                        是否出现过（扫描命中或分析过）")
+    print("  history [--code 短码前缀] [--type gift|vip|audio] [--status 状态] [--limit N]")
+    print("  stats                                       数据库汇总")
+
+def main():
+    args = sys.argv[1:]
+
+    def option(name, default=None):
+        if name in args:
+            index = args.index(name)
+            if index + 1 < len(args):
+                value = args[index + 1]
+                del args[index:index + 2]
+                return value
+        return default
+
+    db = ResultDatabase(option("--db", DB_FILE))
+    if not args or args[0] not in ('seen', 'history', 'stats'):
+        print_usage()
+        sys.exit(1)
+    command = args.pop(0)
+
+    if command == 'seen':
+        if not args:
+            print_usage()
+            sys.exit(1)
+        seen = db.seen_codes(short_code(arg) for arg in args)
+        for arg in args:
+            code = short_code(arg)
+            if code not in seen:
+                print(f"{code}\t未出现过")
+                continue
+            hit = db.hit_info(code)
+            latest = db.latest_results([arg]).get(arg)
+            parts = [code]
+            if hit:
+                parts.append(f"扫描命中 {hit['seen_count']} 次，首次 {format_time(hit['first_seen'])}")
+            if latest:
+                parts.append(f"最近分析: {latest.get('status')} {latest.get('status_text', latest.get('message', ''))}")
+            print('\t'.join(parts))
+        sys.exit(0 if seen else 2)
+
+    if command == 'history':
+        try:
+            limit = int(option("--limit", "50"))
+        except ValueError:
+            limit = 50
+        records = db.history(option("--code"), option("--type"), option("--status"), limit)
+        for record in records:
+            print('\t'.join([format_time(record['analyzed_at']), record['code'], record['link_type'] or '-',
+                             record['status'] or '-', record['gift_status'] or '-',
+                             format_expire_time(record['expire_time']), record['status_text'] or '']))
+        print(f"共 {len(records)} 条")
+        return
+
+    print(json.dumps(db.stats(), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+from array import array
+from itertools import compress
+from collections.abc import Mapping
+
+# 分析结果按字段分列保存：状态类字段存为单字节编码，重复出现的文本存为字符串池下标，
+# 数值存为定长数组；不符合列类型的值和未知字段放到每行的 extras 中原样保留
+CATEGORICAL_FIELDS = ('status', 'gift_status', 'vip_status', 'audio_status')
+NUMERIC_FIELDS = (('expire_time', 'q'), ('total_count', 'q'), ('used_count', 'q'),
+                  ('available_count', 'q'), ('gift_price', 'd'))
+FLAG_FIELDS = ('is_vip_link', 'is_audio_link', 'is_expired')
+POOLED_FIELDS = ('status_text', 'gift_type', 'sender_name', 'sender_id', 'expire_date',
+                 'gift_count', 'message', 'error_message')
+UNIQUE_FIELDS = ('short_url', 'redirect_url', 'gift_data')
+
+FIELDS = (UNIQUE_FIELDS[:1] + CATEGORICAL_FIELDS + POOLED_FIELDS + FLAG_FIELDS
+          + tuple(name for name, _ in NUMERIC_FIELDS) + UNIQUE_FIELDS[1:])
+FIELD_BITS = {name: 1 << bit for bit, name in enumerate(FIELDS)}
+FIELD_KINDS = dict([(name, 'code') for name in CATEGORICAL_FIELDS] + [(name, 'number') for name, _ in NUMERIC_FIELDS]
+                   + [(name, 'flag') for name in FLAG_FIELDS] + [(name, 'string') for name in POOLED_FIELDS]
+                   + [(name, 'unique') for name in UNIQUE_FIELDS])
+
+class ResultView(Mapping):
+    __slots__ = ('store', 'position')
+
+    def __init__(self, store, position):
+        self.store = store
+        self.position = position
+
+    def __getitem__(self, key):
+        return self.store.value(self.position, key)
+
+    def __iter__(self):
+        return self.store.keys_of(self.position)
+
+    def __len__(self):
+        return sum(1 for _ in self.store.keys_of(self.position))
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class ResultStore:
+    def __init__(self):
+        self.presence = array('I')
+        self.integral = array('I')
+        self.codes = {name: array('B') for name in CATEGORICAL_FIELDS}
+        self.vocabularies = {name: [None] for name in CATEGORICAL_FIELDS}
+        self.vocabulary_index = {name: {} for name in CATEGORICAL_FIELDS}
+        self.flags = {name: array('B') for name in FLAG_FIELDS}
+        self.numbers = {name: array(typecode) for name, typecode in NUMERIC_FIELDS}
+        self.strings = {name: array('I') for name in POOLED_FIELDS}
+        self.pool = ['']
+        self.pool_index = {'': 0}
+        self.unique = {name: [] for name in UNIQUE_FIELDS}
+        self.extras = {}
+        self.array_columns = ([self.presence, self.integral] + list(self.codes.values()) + list(self.flags.values())
+                              + list(self.numbers.values()) + list(self.strings.values()))
+
+    def __len__(self):
+        return len(self.presence)
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self.presence)
+        if not 0 <= position < len(self.presence):
+            raise IndexError(position)
+        return ResultView(self, position)
+
+    def __iter__(self):
+        for position in range(len(self.presence)):
+            yield ResultView(self, position)
+
+    def __bool__(self):
+        return len(self.presence) > 0
+
+    def append(self, result):
+        for column in self.array_columns:
+            column.append(0)
+        for column in self.unique.values():
+            column.append(None)
+        self.write(len(self.presence) - 1, result)
+        return len(self.presence) - 1
+
+    def __setitem__(self, position, result):
+        self.write(position, result)
+
+    def write(self, position, result):
+        if self.presence[position]:
+            # 覆盖已有行时先清零，避免旧值残留在新结果没有的字段上
+            for column in self.array_columns:
+                column[position] = 0
+            for column in self.unique.values():
+                column[position] = None
+        presence = 0
+        integral = 0
+        extras = {}
+        for key, value in result.items():
+            bit = FIELD_BITS.get(key)
+            if bit is None or not self.encode(position, key, value):
+                extras[key] = value
+                continue
+            presence |= bit
+            if type(value) is int:
+                integral |= bit
+        self.presence[position] = presence
+        self.integral[position] = integral
+        if extras:
+            self.extras[position] = extras
+        else:
+            self.extras.pop(position, None)
+
+    def encode(self, position, key, value):
+        # 返回 False 表示该值不适合放入列中，由调用方存进 extras
+        kind = FIELD_KINDS[key]
+        if kind == 'code':
+            if not isinstance(value, str):
+                return False
+            index = self.vocabulary_index[key]
+            code = index.get(value)
+            if code is None:
+                vocabulary = self.vocabularies[key]
+                if len(vocabulary) >= 256:
+                    return False
+                code = index[value] = len(vocabulary)
+                vocabulary.append(value)
+            self.codes[key][position] = code
+        elif kind == 'string':
+            if not isinstance(value, str):
+                return False
+            code = self.pool_index.get(value)
+            if code is None:
+                code = self.pool_index[value] = len(self.pool)
+                self.pool.append(value)
+            self.strings[key][position] = code
+        elif kind == 'flag':
+            if not isinstance(value, bool):
+                return False
+            self.flags[key][position] = value
+        elif kind == 'number':
+            column = self.numbers[key]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return False
+            if column.typecode == 'q' and not isinstance(value, int):
+                return False
+            try:
+                column[position] = value
+            except OverflowError:
+                return False
+        else:
+            self.unique[key][position] = value
+        return True
+
+    def value(self, position, key):
+        extras = self.extras.get(position)
+        if extras and key in extras:
+            return extras[key]
+        bit = FIELD_BITS.get(key)
+        if bit is None or not self.presence[position] & bit:
+            raise KeyError(key)
+        kind = FIELD_KINDS[key]
+        if kind == 'code':
+            return self.vocabularies[key][self.codes[key][position]]
+        if kind == 'string':
+            return self.pool[self.strings[key][position]]
+        if kind == 'flag':
+            return bool(self.flags[key][position])
+        if kind == 'number':
+            number = self.numbers[key][position]
+            return int(number) if self.integral[position] & bit else number
+        return self.unique[key][position]
+
+    def keys_of(self, position):
+        presence = self.presence[position]
+        for key in FIELDS:
+            if presence & FIELD_BITS[key]:
+                yield key
+        extras = self.extras.get(position)
+        if extras:
+            yield from extras
+
+    def to_dicts(self):
+        return [dict(view) for view in self]
+
+    def clear(self):
+        self.__init__()
+
+    def column(self, field):
+        # 返回底层数组本身（只读使用），可直接交给 numpy.frombuffer 等做向量化计算
+        for columns in (self.numbers, self.flags, self.codes, self.strings):
+            if field in columns:
+                return columns[field]
+        raise KeyError(field)
+
+    def values(self, field, default=''):
+        # 整列解码为列表，供排序等需要逐行比较的场景
+        if field in self.codes:
+            values = list(map(self.vocabularies[field].__getitem__, self.codes[field]))
+        elif field in self.strings:
+            values = list(map(self.pool.__getitem__, self.strings[field]))
+        elif field in self.unique:
+            values = list(self.unique[field])
+        elif field in FIELD_BITS:
+            values = list(self.column(field))
+        else:
+            values = [default] * len(self.presence)
+        bit = FIELD_BITS.get(field, 0)
+        if bit:
+            for position, presence in enumerate(self.presence):
+                if not presence & bit:
+                    values[position] = default
+        for position, extras in self.extras.items():
+            if field in extras:
+                values[position] = extras[field]
+        return values
+
+    def value_counts(self, field, where=None):
+        # 单字节编码列按字节计数，where 为布尔列名，只统计该列为真的行
+        codes = self.codes[field]
+        if where is not None:
+            codes = array('B', compress(codes, self.flags[where]))
+        data = codes.tobytes()
+        counts = {}
+        for code, label in enumerate(self.vocabularies[field]):
+            if code:
+                count = data.count(code)
+                if count:
+                    counts[label] = count
+        return counts
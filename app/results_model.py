@@ -0,0 +1,301 @@
+import bisect
+from array import array
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from .result_store import ResultStore
+
+RESULT_HEADERS = ['状态', '链接', '类型', '发送者', '数量', '过期时间', '价值', '详情']
+
+# 状态列按“可用程度”排序而不是按文字
+STATUS_RANK = {'available': 0, 'unknown': 1, 'claimed': 2, 'expired': 3}
+
+FILTER_CATEGORIES = ['available', 'expired', 'claimed', 'error',
+                     'vip_valid', 'vip_expired', 'audio_valid', 'audio_expired']
+CATEGORY_CODES = {category: code for code, category in enumerate(FILTER_CATEGORIES)}
+
+# 该列的排序键直接使用结果存储中的数值列
+STORE_SORT_COLUMNS = {5: 'expire_time'}
+
+def result_category(result):
+    if result.get('status') != 'success':
+        return 'error'
+    gift_status = result.get('gift_status')
+    if result.get('is_audio_link'):
+        return {'available': 'audio_valid', 'expired': 'audio_expired'}.get(gift_status, 'error')
+    if result.get('is_vip_link'):
+        return {'valid': 'vip_valid', 'expired': 'vip_expired'}.get(result.get('vip_status'), 'error')
+    if gift_status in ('available', 'expired', 'claimed'):
+        return gift_status
+    return 'error'
+
+def result_row_values(result):
+    status = result.get('status_text', result.get('message', '未知'))
+    link = result.get('short_url', '')
+    gift_type = result.get('gift_type', '')
+    sender = result.get('sender_name', result.get('sender', ''))
+    count = result.get('gift_count', f"{result.get('available_count', 0)}/{result.get('total_count', 0)}")
+    expire_date = result.get('expire_date', '')
+    price = str(result.get('gift_price', 0))
+    details = result.get('error_message', result.get('message', ''))
+    return [status, link, gift_type, sender, count, expire_date, price, details]
+
+def _price(result):
+    try:
+        return float(result.get('gift_price') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+class ResultsTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.results = ResultStore()
+        self.index_by_url = {}
+        self.categories = array('B')
+        # 非数值列的排序键在第一次按该列排序时生成，之后随结果增量维护
+        self.sort_keys = {}
+        self.sorted_cache = {}
+        self.visible = array('I')
+        self.allowed_categories = set(CATEGORY_CODES.values())
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(RESULT_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return RESULT_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        # 只有可见行会被视图请求，显示文本按需生成
+        result = self.results[self.visible[index.row()]]
+        return str(result_row_values(result)[index.column()])
+
+    def result_for(self, url):
+        position = self.index_by_url.get(url)
+        return None if position is None else self.results[position]
+
+    def sort_key(self, column, result):
+        if column == 0:
+            rank = STATUS_RANK.get(result.get('gift_status'), 1) if result.get('status') == 'success' else 4
+            return (rank, result.get('status_text', ''))
+        if column == 2:
+            return result.get('gift_type', '')
+        if column == 6:
+            return _price(result)
+        return str(result_row_values(result)[column])
+
+    def build_sort_keys(self, column):
+        store = self.results
+        if column == 0:
+            ranks = [STATUS_RANK.get(gift_status, 1) if status == 'success' else 4
+                     for status, gift_status in zip(store.values('status', None), store.values('gift_status', None))]
+            return list(zip(ranks, store.values('status_text', '')))
+        if column == 1:
+            return store.values('short_url', '')
+        if column == 2:
+            return store.values('gift_type', '')
+        if column == 3:
+            return [str(sender if name is None else name)
+                    for name, sender in zip(store.values('sender_name', None), store.values('sender', ''))]
+        if column == 4:
+            available = store.column('available_count')
+            total = store.column('total_count')
+            return [f"{available[position]}/{total[position]}" if count is None else str(count)
+                    for position, count in enumerate(store.values('gift_count', None))]
+        if column == 6:
+            # 数值价格直接复制数值列；非数值价格存放在 extras 中，按与 sort_key 相同的规则换算
+            prices = array('d', store.column('gift_price'))
+            for position, extras in store.extras.items():
+                if 'gift_price' in extras:
+                    prices[position] = _price(extras)
+            return prices
+        return ['' if message is None and error is None else str(message if error is None else error)
+                for error, message in zip(store.values('error_message', None), store.values('message', None))]
+
+    def store_keys(self, position, result):
+        for column, column_keys in self.sort_keys.items():
+            key = self.sort_key(column, result)
+            if position == len(column_keys):
+                column_keys.append(key)
+            else:
+                column_keys[position] = key
+        self.sorted_cache = {}
+
+    def add_results(self, results):
+        # 本批新增的行在循环结束后才进入可见列表；同一批中重复的链接直接覆盖尚未显示的那一行
+        first_new = len(self.results)
+        for result in results:
+            url = result.get('short_url', '')
+            position = self.index_by_url.get(url)
+            if position is None:
+                position = self.results.append(result)
+                self.index_by_url[url] = position
+                self.categories.append(CATEGORY_CODES[result_category(result)])
+                self.store_keys(position, result)
+            elif position >= first_new:
+                self.results[position] = result
+                self.categories[position] = CATEGORY_CODES[result_category(result)]
+                self.store_keys(position, result)
+            else:
+                self.replace_result(result)
+
+        allowed = self.allowed_categories
+        appended = [position for position in range(first_new, len(self.results))
+                    if self.categories[position] in allowed]
+        if not appended:
+            return
+        if self.sort_column < 0:
+            first = len(self.visible)
+            self.beginInsertRows(QModelIndex(), first, first + len(appended) - 1)
+            self.visible.extend(appended)
+            self.endInsertRows()
+        else:
+            self.relayout(self.merge_sorted(appended))
+
+    def merge_sorted(self, positions):
+        # 新行逐个二分查找插入点，再一次性拼接，避免每批都对全部可见行重新排序
+        key = self.sort_keys_for(self.sort_column).__getitem__
+        reverse = self.sort_order == Qt.SortOrder.DescendingOrder
+        positions = sorted(positions, key=lambda position: (key(position), position), reverse=reverse)
+        visible = self.visible
+        merged = array('I')
+        start = 0
+        for position in positions:
+            row = self.insertion_row(key(position), position, start)
+            merged.extend(visible[start:row])
+            merged.append(position)
+            start = row
+        merged.extend(visible[start:])
+        return merged
+
+    def insertion_row(self, key_value, position, low=0):
+        # 可见行按 (排序键, 结果位置) 排列，键相同的行也有确定的先后，二分可以定位到具体某一行
+        if self.sort_column < 0:
+            return bisect.bisect_right(self.visible, position, low)
+        key = self.sort_keys_for(self.sort_column).__getitem__
+        descending = self.sort_order == Qt.SortOrder.DescendingOrder
+        target = (key_value, position)
+        visible = self.visible
+        high = len(visible)
+        while low < high:
+            middle = (low + high) // 2
+            current = visible[middle]
+            current_key = (key(current), current)
+            if (target > current_key) if descending else (target < current_key):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def visible_row(self, position, key_value):
+        # key_value 为该行当前在可见列表中所依据的排序键
+        row = self.insertion_row(key_value, position) - 1
+        if 0 <= row < len(self.visible) and self.visible[row] == position:
+            return row
+        return self.visible.index(position)
+
+    def replace_result(self, result):
+        position = self.index_by_url.get(result.get('short_url', ''))
+        if position is None:
+            return
+        allowed = self.allowed_categories
+        visible_before = self.categories[position] in allowed
+        old_key = self.sort_keys_for(self.sort_column)[position] if self.sort_column >= 0 else None
+        # 在更新排序键之前定位所在行，二分时该行还按旧键比较
+        row = self.visible_row(position, old_key) if visible_before else None
+
+        self.results[position] = result
+        self.categories[position] = CATEGORY_CODES[result_category(result)]
+        self.store_keys(position, result)
+        visible_after = self.categories[position] in allowed
+        key_changed = self.sort_column >= 0 and self.sort_keys_for(self.sort_column)[position] != old_key
+
+        # 只移动受影响的一行，不触发整体重排
+        if visible_before:
+            if visible_after and not key_changed:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(RESULT_HEADERS) - 1))
+                return
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.visible[row]
+            self.endRemoveRows()
+        if visible_after:
+            new_key = self.sort_keys_for(self.sort_column)[position] if self.sort_column >= 0 else None
+            row = self.insertion_row(new_key, position)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.visible.insert(row, position)
+            self.endInsertRows()
+
+    def sort_keys_for(self, column):
+        if column in STORE_SORT_COLUMNS:
+            return self.results.column(STORE_SORT_COLUMNS[column])
+        keys = self.sort_keys.get(column)
+        if keys is None:
+            keys = self.sort_keys[column] = self.build_sort_keys(column)
+        return keys
+
+    def set_allowed_categories(self, categories):
+        self.allowed_categories = {CATEGORY_CODES[category] for category in categories}
+        self.relayout()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.relayout()
+
+    def ordered_positions(self):
+        allowed = self.allowed_categories
+        categories = self.categories
+        if self.sort_column < 0:
+            order = range(len(self.results))
+        else:
+            # 缓存每列的全量升序结果，切换升降序或过滤条件时无需重新排序
+            order = self.sorted_cache.get(self.sort_column)
+            if order is None:
+                order = array('I', sorted(range(len(self.results)),
+                                          key=self.sort_keys_for(self.sort_column).__getitem__))
+                self.sorted_cache[self.sort_column] = order
+            if self.sort_order == Qt.SortOrder.DescendingOrder:
+                order = reversed(order)
+        if len(allowed) == len(FILTER_CATEGORIES):
+            return array('I', order)
+        return array('I', (p for p in order if categories[p] in allowed))
+
+    def relayout(self, positions=None):
+        self.layoutAboutToBeChanged.emit()
+        old_visible = self.visible
+        self.visible = self.ordered_positions() if positions is None else positions
+        old_indexes = self.persistentIndexList()
+        if old_indexes:
+            # 保持选中行等持久索引指向同一条结果
+            wanted = {old_visible[index.row()] for index in old_indexes if index.row() < len(old_visible)}
+            if len(wanted) > 64:
+                row_of = {position: row for row, position in enumerate(self.visible)}
+            else:
+                row_of = {}
+                for position in wanted:
+                    try:
+                        row_of[position] = self.visible.index(position)
+                    except ValueError:
+                        pass
+            new_indexes = []
+            for index in old_indexes:
+                row = row_of.get(old_visible[index.row()]) if index.row() < len(old_visible) else None
+                new_indexes.append(QModelIndex() if row is None else self.index(row, index.column()))
+            self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def clear(self):
+        self.beginResetModel()
+        self.results = ResultStore()
+        self.index_by_url = {}
+        self.categories = array('B')
+        self.sort_keys = {column: [] for column in self.sort_keys}
+        self.sorted_cache = {}
+        self.visible = array('I')
+        self.endResetModel()
@@ -0,0 +1,135 @@
+import os
+import queue
+import threading
+from collections import deque
+
+class RotatingLogFile:
+    def __init__(self, file_path, max_bytes=1024 * 1024, backup_count=3):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock = threading.Lock()
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(file_path, 'ab')
+        self.size = self.file.tell()
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='replace')
+        with self.lock:
+            if self.file is None:
+                return
+            if self.size + len(data) > self.max_bytes and self.size > 0:
+                self._rotate()
+            self.file.write(data)
+            self.size += len(data)
+
+    def _rotate(self):
+        self.file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.file_path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.file_path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.file_path, f"{self.file_path}.1")
+        else:
+            os.remove(self.file_path)
+        self.file = open(self.file_path, 'ab')
+        self.size = 0
+
+    def files(self):
+        return self.existing_files(self.file_path, self.backup_count)
+
+    @staticmethod
+    def existing_files(file_path, backup_count):
+        # 从最旧到最新
+        paths = [f"{file_path}.{index}" for index in range(backup_count, 0, -1)]
+        paths.append(file_path)
+        return [path for path in paths if os.path.exists(path)]
+
+    def flush(self):
+        with self.lock:
+            if self.file:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+class QueuedLogWriter:
+    # 调用方只把文本放入队列，由后台线程攒批写入 RotatingLogFile，磁盘 I/O 不占用调用线程
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, text):
+        self.queue.put(text)
+
+    def files(self):
+        return self.log_file.files()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            chunks = []
+            events = []
+            closing = False
+            while True:
+                if item is None:
+                    closing = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    chunks.append(item)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if chunks:
+                    self.log_file.write(''.join(chunks))
+                if events or closing:
+                    self.log_file.flush()
+            except OSError:
+                pass
+            for event in events:
+                event.set()
+            if closing:
+                self.log_file.close()
+                return
+
+    def flush(self, timeout=None):
+        # timeout 为 0 时只提交刷新请求，不等待写完
+        event = threading.Event()
+        self.queue.put(event)
+        if timeout != 0:
+            event.wait(timeout)
+
+    def close(self, timeout=None):
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+class TailBuffer:
+    def __init__(self, max_bytes=64 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.chunks = deque()
+        self.size = 0
+
+    def append(self, data):
+        with self.lock:
+            self.chunks.append(data)
+            self.size += len(data)
+            while self.size - len(self.chunks[0]) >= self.max_bytes:
+                self.size -= len(self.chunks.popleft())
+
+    def getvalue(self):
+        with self.lock:
+            data = b''.join(self.chunks)
+        return data[-self.max_bytes:]
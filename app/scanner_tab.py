@@ -1,37 +1,188 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                             QGroupBox, QHeaderView, QAbstractItemView)
 from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
-import requests
-from .workers import ScannerWorker
-from .ui_effects import (ModernFrame, AnimatedButton, ModernLineEdit, ModernTextEdit,
-                        ModernTable, ModernProgressBar, ModernSpinBox, ModernLabel, ResetButton)
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from .workers import ScannerWorker, int_to_base62
+from .job_state import JobStateStore
+from .rotating_log import RotatingLogFile, QueuedLogWriter
+from .ui_effects import (ModernFrame, AnimatedButton, ModernLineEdit, ModernPlainTextEdit,
+                        ModernTable, ModernProgressBar, ModernSpinBox, ModernLabel, ModernCheckBox,
+                        ResetButton, ModernComboBox)
+
+DEFAULTS_URLS = {
+    'prefix': 'https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newfirst',
+    'start_suffix': 'https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newnext'
+}
+
+class DefaultsCache:
+    def __init__(self, file_path="defaults_cache.json"):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.entries = self.load()
+
+    def load(self):
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, field):
+        with self.lock:
+            return dict(self.entries.get(field) or {})
+
+    def put(self, field, content, etag=None, last_modified=None):
+        with self.lock:
+            self.entries[field] = {
+                'content': content,
+                'etag': etag,
+                'last_modified': last_modified
+            }
+            temp_path = self.file_path + ".tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.entries, f, indent=2, ensure_ascii=False)
+                os.replace(temp_path, self.file_path)
+            except OSError:
+                pass
+
+SCAN_LOG_FILE = os.path.join("scan_logs", "scan.log")
+
+# 扫描中断点续跑状态最多每隔这么多秒保存一次，且只在断点或已发现的链接变化时保存
+JOB_STATE_INTERVAL = 10
+
+SCAN_ORDERS = [('顺序扫描', 'linear'), ('命中率优先', 'yield'), ('追踪前沿', 'frontier')]
+
+class LogSearchWorker(QThread):
+    search_completed = pyqtSignal(list, bool)
+
+    def __init__(self, files, keyword, max_results=500):
+        super().__init__()
+        self.files = files
+        self.keyword = keyword.lower()
+        self.max_results = max_results
+
+    def run(self):
+        matches = []
+        truncated = False
+        for path in self.files:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    for line in f:
+                        if self.keyword in line.lower():
+                            matches.append(line.rstrip('\n'))
+                            if len(matches) > self.max_results:
+                                # 只保留最新的匹配
+                                matches.pop(0)
+                                truncated = True
+            except OSError:
+                continue
+        self.search_completed.emit(matches, truncated)
 
 class GitHubFetcher(QThread):
     content_fetched = pyqtSignal(str, str)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, field_type, url):
+    def __init__(self, field_type, url, cache=None, cache_key=None):
         super().__init__()
         self.field_type = field_type
         self.url = url
+        self.cache = cache
+        self.cache_key = cache_key
 
     def run(self):
+        import requests
+
         try:
-            response = requests.get(self.url, timeout=10)
-            if response.status_code == 200:
+            headers = {}
+            cached = self.cache.get(self.cache_key) if self.cache else {}
+            if cached.get('content'):
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+
+            response = requests.get(self.url, headers=headers, timeout=10)
+            if response.status_code == 304 and cached.get('content'):
+                self.content_fetched.emit(self.field_type, cached['content'])
+            elif response.status_code == 200:
                 content = response.text.strip()
+                if self.cache and content:
+                    self.cache.put(self.cache_key, content,
+                                   response.headers.get('ETag'),
+                                   response.headers.get('Last-Modified'))
                 self.content_fetched.emit(self.field_type, content)
             else:
                 self.error_occurred.emit(f"获取失败: HTTP {response.status_code}")
         except Exception as e:
             self.error_occurred.emit(f"网络错误: {str(e)}")
 
+class FrontierLocator(QThread):
+    frontier_found = pyqtSignal(str, int)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, prefix, hint):
+        super().__init__()
+        self.prefix = prefix
+        self.hint = hint
+        self._is_running = True
+        self.session = None
+
+    def run(self):
+        import requests
+        from .frontier import locate_frontier
+        from .http_client import create_session
+
+        self.session = create_session()
+        try:
+            frontier, probes = locate_frontier(self.prefix, self.hint, session=self.session,
+                                               should_continue=lambda: self._is_running)
+        except (requests.exceptions.RequestException, InterruptedError) as e:
+            if self._is_running:
+                self.error_occurred.emit(f"定位前沿失败: {e}")
+            return
+        finally:
+            self.session.close()
+        if not self._is_running:
+            return
+        if frontier is None:
+            self.error_occurred.emit(f"起始后缀及以下没有找到已发放的短码（探测 {probes} 次）")
+            return
+        self.frontier_found.emit(int_to_base62(frontier), probes)
+
+    def stop(self):
+        from .http_client import abort_session
+
+        # 中止进行中的请求，定位在下一次探测前退出
+        self._is_running = False
+        if self.session is not None:
+            abort_session(self.session)
+
 class ScannerTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scanner_worker = None
+        self.retired_workers = []
+        self.link_feed = None
         self.progress_timer = QTimer(self)
         self.github_fetcher = None
+        self.frontier_locator = None
+        self.defaults_cache = DefaultsCache()
+        self.auto_fetchers = []
+        self.auto_values = {}
+        self.job_state = JobStateStore()
+        self.found_links = {'vip': [], 'gift': [], 'audio': []}
+        self.job_state_saved = (None, 0.0)
+        self.scan_log = None
+        self.log_search_worker = None
+        self.pending_log_lines = []
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.setSingleShot(True)
         self.init_ui()
         self.setup_connections()
         self.set_controls_state(is_running=False)
@@ -63,6 +214,7 @@ class ScannerTab(QWidget):
 
         self.prefix_reset_btn = ResetButton()
         self.start_suffix_reset_btn = ResetButton()
+        self.start_suffix_reset_btn.setToolTip("探测定位已发放短码的前沿，作为起始后缀")
         
         self.threads_spinbox = ModernSpinBox()
         self.threads_spinbox.setRange(1, 1000)
@@ -75,6 +227,29 @@ class ScannerTab(QWidget):
         self.sleep_for_spinbox = ModernSpinBox()
         self.sleep_for_spinbox.setRange(0, 60)
         self.sleep_for_spinbox.setValue(2)
+
+        self.scan_order_combo = ModernComboBox()
+        for text, _ in SCAN_ORDERS:
+            self.scan_order_combo.addItem(text)
+        self.scan_order_combo.setToolTip("命中率优先：按历次扫描统计的各区块命中率，从高到低扫描（记录在 hit_density.json）\n"
+                                         "追踪前沿：先定位已发放与未发放短码的分界，从分界附近扫描并跟随其推进")
+
+        self.miss_limit_spinbox = ModernSpinBox()
+        self.miss_limit_spinbox.setRange(10, 100000)
+        self.miss_limit_spinbox.setValue(500)
+        self.miss_limit_spinbox.setToolTip("追踪前沿时，越过已发放的最大ID后连续这么多个未发放即视为追上前沿")
+
+        self.stream_cb = ModernCheckBox("边扫边分析")
+        self.stream_cb.setToolTip("扫描发现的链接立即送入分析器验证，分析跟不上时扫描会自动放慢")
+
+        self.skip_probed_cb = ModernCheckBox("跳过已探测")
+        self.skip_probed_cb.setChecked(True)
+        self.skip_probed_cb.setToolTip("自动跳过以前扫描中已经探测过的后缀区间（记录在 probed_ranges.bin）")
+
+        self.record_probes_cb = ModernCheckBox("记录探测明细")
+        self.record_probes_cb.setChecked(False)
+        self.record_probes_cb.setToolTip("每次探测的状态码、结果和耗时以二进制写入 probe_logs（每次探测 20 字节，"
+                                         "不会自动清理），可用 python -m app.probe_log 离线统计")
         
         config_layout.addWidget(ModernLabel("前缀:"), 0, 0)
         config_layout.addWidget(self.prefix_input, 0, 1)
@@ -90,6 +265,13 @@ class ScannerTab(QWidget):
         config_layout.addWidget(self.sleep_every_spinbox, 4, 1)
         config_layout.addWidget(ModernLabel("暂停M秒:"), 5, 0)
         config_layout.addWidget(self.sleep_for_spinbox, 5, 1)
+        config_layout.addWidget(ModernLabel("扫描顺序:"), 6, 0)
+        config_layout.addWidget(self.scan_order_combo, 6, 1)
+        config_layout.addWidget(ModernLabel("连续未命中上限:"), 7, 0)
+        config_layout.addWidget(self.miss_limit_spinbox, 7, 1)
+        config_layout.addWidget(self.stream_cb, 8, 1)
+        config_layout.addWidget(self.skip_probed_cb, 9, 1)
+        config_layout.addWidget(self.record_probes_cb, 10, 1)
         
         control_frame = ModernFrame()
         control_layout = QVBoxLayout(control_frame)
@@ -165,11 +347,26 @@ class ScannerTab(QWidget):
         log_frame = ModernFrame()
         log_layout = QVBoxLayout(log_frame)
         log_layout.setContentsMargins(20, 20, 20, 20)
-        log_layout.addWidget(ModernLabel("📋 日志输出"))
+        log_header_layout = QHBoxLayout()
+        log_header_layout.addWidget(ModernLabel("📋 日志输出"))
+        log_header_layout.addStretch()
+        log_header_layout.addWidget(ModernLabel("保留行数:"))
+        self.log_lines_spinbox = ModernSpinBox()
+        self.log_lines_spinbox.setRange(100, 100000)
+        self.log_lines_spinbox.setValue(2000)
+        log_header_layout.addWidget(self.log_lines_spinbox)
+        self.log_search_input = ModernLineEdit()
+        self.log_search_input.setPlaceholderText("搜索完整日志...")
+        self.log_search_btn = AnimatedButton("🔍 搜索")
+        log_header_layout.addWidget(self.log_search_input)
+        log_header_layout.addWidget(self.log_search_btn)
+        log_layout.addLayout(log_header_layout)
         
-        self.log_output = ModernTextEdit()
+        self.log_output = ModernPlainTextEdit()
         self.log_output.setReadOnly(True)
         self.log_output.setMaximumHeight(150)
+        # 界面只保留最近的日志，完整日志写入 scan_logs 下的滚动文件
+        self.log_output.setMaximumBlockCount(self.log_lines_spinbox.value())
         log_layout.addWidget(self.log_output)
         
         main_layout.addLayout(top_layout)
@@ -186,7 +383,7 @@ class ScannerTab(QWidget):
         return table
 
     def setup_connections(self):
-        self.start_button.clicked.connect(self.start_scan)
+        self.start_button.clicked.connect(lambda: self.start_scan())
         self.stop_button.clicked.connect(self.stop_scan)
         self.pause_button.clicked.connect(self.toggle_pause_scan)
         self.progress_timer.timeout.connect(self.update_progress)
@@ -199,10 +396,15 @@ class ScannerTab(QWidget):
         self.analyze_gift_btn.clicked.connect(lambda: self.send_to_analyzer('gift'))
         self.analyze_audio_btn.clicked.connect(lambda: self.send_to_analyzer('audio'))
 
+        self.log_lines_spinbox.valueChanged.connect(self.log_output.setMaximumBlockCount)
+        self.log_flush_timer.timeout.connect(self.flush_log_view)
+        self.log_search_btn.clicked.connect(self.search_log)
+        self.log_search_input.returnPressed.connect(self.search_log)
+
         self.prefix_reset_btn.clicked.connect(self.reset_prefix)
         self.start_suffix_reset_btn.clicked.connect(self.reset_start_suffix)
 
-    def start_scan(self):
+    def start_scan(self, restored_links=None):
         from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem
 
         prefix = self.prefix_input.text()
@@ -217,26 +419,112 @@ class ScannerTab(QWidget):
             return
 
         self.set_controls_state(is_running=True)
+        self.pending_log_lines = []
         self.log_output.clear()
         self.vip_table.setRowCount(0)
         self.gift_table.setRowCount(0)
         self.audio_table.setRowCount(0)
+        self.found_links = {'vip': [], 'gift': [], 'audio': []}
+        # 续跑时先放回上次已发现的链接，下面保存任务状态时才不会把它们覆盖掉
+        for link_type, links in (restored_links or {}).items():
+            for url in links:
+                self.add_result_to_table(link_type, url)
 
         self.scanner_worker = ScannerWorker(
             prefix, start_suffix, end_suffix, max_workers,
-            sleep_every, sleep_for
+            sleep_every, sleep_for, self.skip_probed_cb.isChecked(), self.record_probes_cb.isChecked(),
+            SCAN_ORDERS[self.scan_order_combo.currentIndex()][1], self.miss_limit_spinbox.value()
         )
 
-        self.scanner_worker.log_message.connect(self.log_output.append)
+        self.append_log(f"===== 新扫描 {prefix}{start_suffix} → {prefix}{end_suffix} =====", show=False)
+        self.scanner_worker.log_message.connect(self.append_log)
         self.scanner_worker.result_found.connect(self.add_result_to_table)
+        self.scanner_worker.result_found.connect(self.record_hit)
         self.scanner_worker.finished.connect(self.scan_finished)
+        if self.stream_cb.isChecked():
+            self.start_streaming()
 
         self.scanner_worker.start()
         self.progress_timer.start(1000)
+        self.save_job_state(force=True)
+
+    def start_streaming(self):
+        main_window = self.find_main_window()
+        if main_window is None:
+            return
+        feed = main_window.ensure_analyzer_tab().start_streaming()
+        if feed is None:
+            self.append_log("[边扫边分析] 分析器正在运行，本次扫描发现的链接不会自动送入分析器")
+            return
+        self.link_feed = feed
+        self.scanner_worker.link_feed = feed
+        self.append_log("[边扫边分析] 发现的链接将直接送入分析器")
+
+    def close_link_feed(self):
+        # 关闭后分析器处理完已排队的链接即结束
+        if self.link_feed is not None:
+            self.link_feed.close()
+            self.link_feed = None
+
+    def save_job_state(self, force=False):
+        if not self.scanner_worker:
+            return
+        worker = self.scanner_worker
+        resume_point = worker.resume_point()
+        signature = (resume_point, sum(len(links) for links in self.found_links.values()))
+        last_signature, saved_at = self.job_state_saved
+        now = time.monotonic()
+        if not force and (signature == last_signature or now - saved_at < JOB_STATE_INTERVAL):
+            return
+        self.job_state_saved = (signature, now)
+        # 链接列表复制一份交给后台线程序列化，GUI 线程之后继续追加不受影响
+        self.job_state.save_async('scanner', {
+            'prefix': worker.prefix,
+            'start_suffix': int_to_base62(resume_point),
+            'end_suffix': int_to_base62(worker.end_id),
+            'max_workers': worker.max_workers,
+            'sleep_every': worker.sleep_every,
+            'sleep_for': worker.sleep_for,
+            'skip_probed': worker.skip_probed,
+            'record_probes': worker.record_probes,
+            'scan_order': worker.scan_order,
+            'miss_limit': worker.miss_limit,
+            'found_links': {link_type: list(links) for link_type, links in self.found_links.items()}
+        })
+
+    def resume_saved_job(self):
+        state = self.job_state.load('scanner')
+        if not state or (self.scanner_worker and self.scanner_worker.isRunning()):
+            return False
+
+        self.prefix_input.setText(state.get('prefix', self.prefix_input.text()))
+        self.start_suffix_input.setText(state.get('start_suffix', self.start_suffix_input.text()))
+        self.end_suffix_input.setText(state.get('end_suffix', self.end_suffix_input.text()))
+        self.threads_spinbox.setValue(state.get('max_workers', self.threads_spinbox.value()))
+        self.sleep_every_spinbox.setValue(state.get('sleep_every', self.sleep_every_spinbox.value()))
+        self.sleep_for_spinbox.setValue(state.get('sleep_for', self.sleep_for_spinbox.value()))
+        self.skip_probed_cb.setChecked(state.get('skip_probed', self.skip_probed_cb.isChecked()))
+        self.record_probes_cb.setChecked(state.get('record_probes', self.record_probes_cb.isChecked()))
+        self.miss_limit_spinbox.setValue(state.get('miss_limit', self.miss_limit_spinbox.value()))
+        orders = [order for _, order in SCAN_ORDERS]
+        if state.get('scan_order') in orders:
+            self.scan_order_combo.setCurrentIndex(orders.index(state['scan_order']))
+
+        self.start_scan(state.get('found_links'))
+        if not self.scanner_worker:
+            return False
+        self.append_log(f"[恢复] 从 {self.prefix_input.text()}{self.start_suffix_input.text()} 继续上次中断的扫描")
+        return True
 
     def stop_scan(self):
         if self.scanner_worker:
-            self.scanner_worker.stop()
+            self.update_progress()
+            self.retire_worker(self.scanner_worker)
+            self.scanner_worker = None
+            self.append_log("扫描已停止")
+            self.flush_log()
+        self.close_link_feed()
+        self.job_state.clear('scanner')
         self.progress_timer.stop()
         self.set_controls_state(is_running=False)
         self.status_label.setText("状态: 手动停止")
@@ -256,12 +544,98 @@ class ScannerTab(QWidget):
             self.pause_button.setText("⏸️ 暂停")
             self.status_label.setText("状态: 正在扫描...")
 
+    def append_log(self, message, show=True):
+        if show:
+            # 攒批后每 100ms 写入一次界面，避免高频日志逐行刷新
+            self.pending_log_lines.append(message)
+            if not self.log_flush_timer.isActive():
+                self.log_flush_timer.start(100)
+        if self.scan_log is None:
+            try:
+                self.scan_log = QueuedLogWriter(
+                    RotatingLogFile(SCAN_LOG_FILE, max_bytes=5 * 1024 * 1024, backup_count=5))
+            except OSError:
+                return
+        self.scan_log.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {message}\n")
+
+    def flush_log_view(self):
+        lines = self.pending_log_lines[-self.log_output.maximumBlockCount():]
+        self.pending_log_lines = []
+        if lines:
+            self.log_output.appendPlainText('\n'.join(lines))
+
+    def flush_log(self, timeout=0):
+        if self.scan_log:
+            self.scan_log.flush(timeout)
+
+    def close_scan_log(self):
+        # 等后台线程写完剩余日志后关闭文件；之后再有日志会重新打开
+        if self.scan_log:
+            self.scan_log.close(timeout=2)
+            self.scan_log = None
+
+    def search_log(self):
+        from PyQt6.QtWidgets import QMessageBox
+
+        keyword = self.log_search_input.text().strip()
+        if not keyword:
+            return
+        if self.log_search_worker and self.log_search_worker.isRunning():
+            QMessageBox.information(self, "提示", "正在搜索中，请稍候...")
+            return
+
+        # 搜索前等已排队的日志落盘，才能搜到最新的内容
+        self.flush_log(timeout=1)
+        files = self.scan_log.files() if self.scan_log else RotatingLogFile.existing_files(SCAN_LOG_FILE, 5)
+        self.log_search_worker = LogSearchWorker(files, keyword)
+        self.log_search_worker.search_completed.connect(
+            lambda matches, truncated: self.show_search_results(keyword, matches, truncated))
+        self.log_search_btn.setEnabled(False)
+        self.log_search_worker.start()
+
+    def show_search_results(self, keyword, matches, truncated):
+        from PyQt6.QtWidgets import QDialog
+
+        self.log_search_btn.setEnabled(True)
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"日志搜索: {keyword}")
+        dialog.resize(800, 500)
+        dialog.setStyleSheet("QDialog { background: #2d3748; }")
+        layout = QVBoxLayout(dialog)
+        summary = f"找到 {len(matches)} 条匹配"
+        if truncated:
+            summary += "（仅显示最新的结果）"
+        layout.addWidget(ModernLabel(summary))
+        result_text = ModernPlainTextEdit()
+        result_text.setReadOnly(True)
+        result_text.setPlainText('\n'.join(matches))
+        layout.addWidget(result_text)
+        dialog.show()
+
+    def retire_worker(self, worker):
+        # 不在 GUI 线程等待线程退出：断开信号后保留引用，线程在连接中止后自行结束
+        worker.stop()
+        worker.log_message.disconnect()
+        worker.result_found.disconnect()
+        worker.finished.disconnect()
+        self.retired_workers = [w for w in self.retired_workers if w.isRunning()]
+        self.retired_workers.append(worker)
+
+    def running_workers(self):
+        workers = self.retired_workers + ([self.scanner_worker] if self.scanner_worker else [])
+        if self.frontier_locator:
+            workers.append(self.frontier_locator)
+        return [worker for worker in workers if worker.isRunning()]
+
     def scan_finished(self):
+        self.close_link_feed()
+        self.flush_log()
         self.progress_timer.stop()
         self.update_progress()
         self.set_controls_state(is_running=False)
         self.status_label.setText("状态: 扫描完成")
         self.scanner_worker = None
+        self.job_state.clear('scanner')
 
     def add_result_to_table(self, link_type, url):
         from PyQt6.QtWidgets import QTableWidgetItem
@@ -273,11 +647,23 @@ class ScannerTab(QWidget):
         else:
             table = self.gift_table
 
+        if link_type in self.found_links:
+            self.found_links[link_type].append(url)
+
         row_position = table.rowCount()
         table.insertRow(row_position)
         table.setItem(row_position, 0, QTableWidgetItem(url))
         table.scrollToBottom()
 
+    def record_hit(self, link_type, url):
+        import sqlite3
+        from .result_db import get_result_db
+
+        try:
+            get_result_db().record_hit(link_type, url)
+        except sqlite3.Error:
+            pass
+
     def update_progress(self):
         if not self.scanner_worker or not self.scanner_worker.isRunning():
             return
@@ -285,13 +671,18 @@ class ScannerTab(QWidget):
         checked = self.scanner_worker.checked_count
         found = self.scanner_worker.found_count
         speed = self.scanner_worker.get_speed()
-        self.status_label.setText(f"状态: 已检查 {checked} / 已找到 {found} / 速度: {speed:.2f} 个/秒")
+        status = f"状态: 已检查 {checked} / 已找到 {found} / 速度: {speed:.2f} 个/秒"
+        if self.scanner_worker.scan_order == 'frontier' and self.scanner_worker.frontier_id is not None:
+            status += f" / 前沿: {self.scanner_worker.prefix}{int_to_base62(self.scanner_worker.frontier_id)}"
+        self.status_label.setText(status)
 
-        total_range = self.scanner_worker.end_id - self.scanner_worker.start_id
+        total_range = self.scanner_worker.total_ids
         if total_range > 0:
             progress_value = int(((checked) / total_range) * 100)
             self.progress_bar.setValue(progress_value)
 
+        self.save_job_state()
+
     def set_controls_state(self, is_running):
         self.start_button.setEnabled(not is_running)
         self.pause_button.setEnabled(is_running)
@@ -303,6 +694,11 @@ class ScannerTab(QWidget):
         self.threads_spinbox.setDisabled(is_running)
         self.sleep_every_spinbox.setDisabled(is_running)
         self.sleep_for_spinbox.setDisabled(is_running)
+        self.stream_cb.setDisabled(is_running)
+        self.skip_probed_cb.setDisabled(is_running)
+        self.record_probes_cb.setDisabled(is_running)
+        self.scan_order_combo.setDisabled(is_running)
+        self.miss_limit_spinbox.setDisabled(is_running)
 
         self.prefix_reset_btn.setDisabled(is_running)
         self.start_suffix_reset_btn.setDisabled(is_running)
@@ -353,16 +749,9 @@ class ScannerTab(QWidget):
                 links.append(item.text())
 
         if links:
-            main_window = None
-            widget = self
-            while widget is not None:
-                if hasattr(widget, 'tabs') and hasattr(widget, 'analyzer_tab'):
-                    main_window = widget
-                    break
-                widget = widget.parent()
-
+            main_window = self.find_main_window()
             if main_window:
-                analyzer_tab = main_window.analyzer_tab
+                analyzer_tab = main_window.ensure_analyzer_tab()
                 current_text = analyzer_tab.links_text.toPlainText()
                 if current_text:
                     new_text = current_text + '\n' + '\n'.join(links)
@@ -370,7 +759,7 @@ class ScannerTab(QWidget):
                     new_text = '\n'.join(links)
                 analyzer_tab.links_text.setPlainText(new_text)
                 analyzer_tab.update_links_count()
-                main_window.tabs.setCurrentWidget(analyzer_tab)
+                main_window.tabs.setCurrentWidget(main_window.analyzer_container)
 
                 type_names = {'vip': 'VIP', 'audio': '音质', 'gift': '礼品'}
                 QMessageBox.information(self, "转移成功", f"已将 {len(links)} 个{type_names[link_type]}链接发送到分析器")
@@ -380,6 +769,14 @@ class ScannerTab(QWidget):
             type_names = {'vip': 'VIP', 'audio': '音质', 'gift': '礼品'}
             QMessageBox.information(self, "提示", f"没有{type_names[link_type]}链接可发送")
 
+    def find_main_window(self):
+        widget = self
+        while widget is not None:
+            if hasattr(widget, 'tabs') and hasattr(widget, 'ensure_analyzer_tab'):
+                return widget
+            widget = widget.parent()
+        return None
+
     def reset_prefix(self):
         from PyQt6.QtWidgets import QMessageBox
 
@@ -389,10 +786,8 @@ class ScannerTab(QWidget):
         self.prefix_reset_btn.setEnabled(False)
         self.prefix_reset_btn.setText("⏳")
 
-        self.github_fetcher = GitHubFetcher(
-            'prefix',
-            'https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newfirst'
-        )
+        self.github_fetcher = GitHubFetcher('prefix', DEFAULTS_URLS['prefix'],
+                                            self.defaults_cache, 'prefix')
         self.github_fetcher.content_fetched.connect(self.on_content_fetched, Qt.ConnectionType.QueuedConnection)
         self.github_fetcher.error_occurred.connect(self.on_fetch_error, Qt.ConnectionType.QueuedConnection)
         self.github_fetcher.finished.connect(self.on_fetcher_finished, Qt.ConnectionType.QueuedConnection)
@@ -400,21 +795,45 @@ class ScannerTab(QWidget):
 
     def reset_start_suffix(self):
         from PyQt6.QtWidgets import QMessageBox
+        from .workers import base62_to_int
 
-        if self.github_fetcher and self.github_fetcher.isRunning():
+        if self.frontier_locator and self.frontier_locator.isRunning():
+            return
+        prefix = self.prefix_input.text()
+        if not prefix:
+            QMessageBox.warning(self, "输入错误", "请先填写前缀。")
+            return
+
+        # 直接探测定位已发放短码的前沿，当前起始后缀（及上次定位的结果）作为搜索起点
+        hint = self.start_suffix_input.text()
+        if hint and len(hint) != 6:
+            QMessageBox.warning(self, "输入错误", "起始后缀需为6位字符；留空则从上次定位的前沿开始搜索。")
             return
 
         self.start_suffix_reset_btn.setEnabled(False)
         self.start_suffix_reset_btn.setText("⏳")
+        self.frontier_locator = FrontierLocator(prefix, base62_to_int(hint) if hint else None)
+        self.frontier_locator.frontier_found.connect(self.on_frontier_found, Qt.ConnectionType.QueuedConnection)
+        self.frontier_locator.error_occurred.connect(self.on_fetch_error, Qt.ConnectionType.QueuedConnection)
+        self.frontier_locator.finished.connect(self.on_frontier_locator_finished, Qt.ConnectionType.QueuedConnection)
+        self.frontier_locator.start()
 
-        self.github_fetcher = GitHubFetcher(
-            'start_suffix',
-            'https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newnext'
-        )
-        self.github_fetcher.content_fetched.connect(self.on_content_fetched, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.error_occurred.connect(self.on_fetch_error, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.finished.connect(self.on_fetcher_finished, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.start()
+    def on_frontier_found(self, suffix, probes):
+        from PyQt6.QtWidgets import QMessageBox
+
+        self.start_suffix_input.setText(suffix)
+        self.start_suffix_reset_btn.setEnabled(True)
+        self.start_suffix_reset_btn.setText("🔄")
+        QMessageBox.information(self, "成功", f"已定位前沿，起始后缀更新为: {suffix}（探测 {probes} 次）")
+
+    def on_frontier_locator_finished(self):
+        self.frontier_locator = None
+        self.start_suffix_reset_btn.setEnabled(True)
+        self.start_suffix_reset_btn.setText("🔄")
+
+    def stop_frontier_locator(self):
+        if self.frontier_locator and self.frontier_locator.isRunning():
+            self.frontier_locator.stop()
 
     def on_content_fetched(self, field_type, content):
         from PyQt6.QtWidgets import QMessageBox
@@ -447,74 +866,47 @@ class ScannerTab(QWidget):
         self.github_fetcher = None
 
     def auto_update_on_startup(self):
-        QTimer.singleShot(500, self.update_prefix_directly)
-
-    def update_prefix_directly(self):
-        try:
-            import requests
-            response = requests.get('https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newfirst', timeout=5)
-            if response.status_code == 200:
-                content = response.text.strip()
-                self.prefix_input.setText(content)
-                self.update_suffix_directly()
-        except Exception:
-            pass
+        # 先用磁盘缓存立即填充，首帧显示后再在后台线程校验远端是否有新值
+        for field, line_edit in (('prefix', self.prefix_input), ('start_suffix', self.start_suffix_input)):
+            cached = self.defaults_cache.get(field).get('content')
+            if cached:
+                line_edit.setText(cached)
+            self.auto_values[field] = line_edit.text()
+
+        QTimer.singleShot(500, self.refresh_defaults)
+
+    def refresh_defaults(self):
+        for field in ('prefix', 'start_suffix'):
+            fetcher = GitHubFetcher('auto_' + field, DEFAULTS_URLS[field], self.defaults_cache, field)
+            fetcher.content_fetched.connect(self.on_auto_content_fetched, Qt.ConnectionType.QueuedConnection)
+            fetcher.error_occurred.connect(self.on_auto_fetch_error, Qt.ConnectionType.QueuedConnection)
+            fetcher.finished.connect(lambda f=fetcher: self.on_auto_fetcher_finished(f),
+                                     Qt.ConnectionType.QueuedConnection)
+            self.auto_fetchers.append(fetcher)
+            fetcher.start()
 
-    def update_suffix_directly(self):
-        try:
-            import requests
-            response = requests.get('https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newnext', timeout=5)
-            if response.status_code == 200:
-                content = response.text.strip()
-                self.start_suffix_input.setText(content)
-        except Exception:
-            pass
-
-    def auto_update_prefix(self):
-        if self.github_fetcher and self.github_fetcher.isRunning():
+    def on_auto_content_fetched(self, field_type, content):
+        field = field_type[len('auto_'):]
+        line_edit = self.prefix_input if field == 'prefix' else self.start_suffix_input
+        if not content or not line_edit.isEnabled():
             return
-
-        self.github_fetcher = GitHubFetcher(
-            'auto_prefix',
-            'https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newfirst'
-        )
-        self.github_fetcher.content_fetched.connect(self.on_auto_content_fetched, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.error_occurred.connect(self.on_auto_fetch_error, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.finished.connect(self.on_auto_fetcher_finished, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.start()
-
-    def auto_update_start_suffix(self):
-        if self.github_fetcher and self.github_fetcher.isRunning():
+        # 用户已手动修改过的输入框不覆盖
+        if line_edit.text() != self.auto_values.get(field):
             return
-
-        self.github_fetcher = GitHubFetcher(
-            'auto_start_suffix',
-            'https://raw.githubusercontent.com/Afly-dream/Free-wyy/main/checknewidforfree/newnext'
-        )
-        self.github_fetcher.content_fetched.connect(self.on_auto_content_fetched, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.error_occurred.connect(self.on_auto_fetch_error, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.finished.connect(self.on_auto_fetcher_finished, Qt.ConnectionType.QueuedConnection)
-        self.github_fetcher.start()
-
-    def on_auto_content_fetched(self, field_type, content):
-        try:
-            if field_type == 'auto_prefix':
-                self.prefix_input.setText(content)
-                self.auto_update_start_suffix()
-            elif field_type == 'auto_start_suffix':
-                self.start_suffix_input.setText(content)
-        except Exception as e:
-            pass
+        line_edit.setText(content)
+        self.auto_values[field] = content
 
     def on_auto_fetch_error(self, error_message):
         pass
 
-    def on_auto_fetcher_finished(self):
-        self.github_fetcher = None
+    def on_auto_fetcher_finished(self, fetcher):
+        if fetcher in self.auto_fetchers:
+            self.auto_fetchers.remove(fetcher)
 
     def closeEvent(self, event):
         self.progress_timer.stop()
         if self.scanner_worker and self.scanner_worker.isRunning():
             self.stop_scan()
-            self.scanner_worker.wait()
+        self.stop_frontier_locator()
+        self.close_scan_log()
         event.accept()
@@ -0,0 +1,116 @@
+import sys
+import time
+import threading
+import traceback
+from datetime import datetime
+from PyQt6.QtCore import QTimer
+
+class StallWatchdog:
+    def __init__(self, threshold=1.0, interval=0.1, log_file="stall_log.txt"):
+        self.threshold = threshold
+        self.interval = interval
+        self.log_file = log_file
+        self.gui_thread_id = None
+        self.last_beat = time.monotonic()
+        self.stop_event = threading.Event()
+        self.heartbeat_timer = None
+        self.monitor_thread = None
+        self.lock = threading.Lock()
+
+        self.stall_count = 0
+        self.total_stall = 0.0
+        self.max_stall = 0.0
+        self.session_started = datetime.now()
+
+    def start(self):
+        # 需在 GUI 线程调用：心跳定时器由 Qt 事件循环驱动，事件循环卡住时心跳停止
+        self.gui_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.heartbeat_timer = QTimer()
+        self.heartbeat_timer.timeout.connect(self.beat)
+        self.heartbeat_timer.start(int(self.interval * 1000))
+
+        self.monitor_thread = threading.Thread(target=self.monitor, name="stall-watchdog", daemon=True)
+        self.monitor_thread.start()
+
+    def beat(self):
+        self.last_beat = time.monotonic()
+
+    def monitor(self):
+        in_stall = False
+        stall_started = 0.0
+        next_capture = 0.0
+        captures = 0
+
+        while not self.stop_event.wait(self.interval):
+            now = time.monotonic()
+            last_beat = self.last_beat
+            lag = now - last_beat
+
+            if lag > self.threshold:
+                if not in_stall:
+                    in_stall = True
+                    stall_started = last_beat
+                    captures = 0
+                    next_capture = now
+                if captures < 3 and now >= next_capture:
+                    # 首次超时立即抓取堆栈，卡顿持续时再补抓两次，便于观察卡在何处
+                    self.write_stacks(lag, captures)
+                    captures += 1
+                    next_capture = now + self.threshold * 5
+            elif in_stall:
+                in_stall = False
+                self.record_stall(last_beat - stall_started)
+
+    def record_stall(self, duration):
+        with self.lock:
+            self.stall_count += 1
+            self.total_stall += duration
+            self.max_stall = max(self.max_stall, duration)
+        self.write_log(f"[{datetime.now().isoformat()}] 界面卡顿结束，持续 {duration:.3f} 秒\n\n")
+
+    def write_stacks(self, lag, capture_index):
+        frames = sys._current_frames()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        lines = [f"[{datetime.now().isoformat()}] 界面线程已 {lag:.3f} 秒无响应 (第 {capture_index + 1} 次采样)\n"]
+
+        gui_frame = frames.get(self.gui_thread_id)
+        lines.append("--- GUI 线程 ---\n")
+        if gui_frame is not None:
+            lines.extend(traceback.format_stack(gui_frame))
+
+        for thread_id, frame in frames.items():
+            if thread_id in (self.gui_thread_id, threading.get_ident()):
+                continue
+            lines.append(f"--- 线程 {names.get(thread_id, thread_id)} ---\n")
+            lines.extend(traceback.format_stack(frame))
+        lines.append("\n")
+        self.write_log(''.join(lines))
+
+    def write_log(self, text):
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(text)
+        except OSError:
+            pass
+
+    def summary(self):
+        with self.lock:
+            return {
+                'session_started': self.session_started.isoformat(),
+                'stall_count': self.stall_count,
+                'total_stall_seconds': round(self.total_stall, 3),
+                'max_stall_seconds': round(self.max_stall, 3)
+            }
+
+    def stop(self):
+        if self.stop_event.is_set():
+            return
+        self.stop_event.set()
+        if self.heartbeat_timer:
+            self.heartbeat_timer.stop()
+        summary = self.summary()
+        if summary['stall_count']:
+            self.write_log(f"[{datetime.now().isoformat()}] 会话汇总: 自 {summary['session_started']} 起"
+                           f"卡顿 {summary['stall_count']} 次，累计 {summary['total_stall_seconds']} 秒，"
+                           f"最长 {summary['max_stall_seconds']} 秒\n\n")
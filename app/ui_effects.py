@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import (QWidget, QFrame, QGraphicsDropShadowEffect, 
                             QGraphicsBlurEffect, QLabel, QPushButton, QLineEdit,
-                            QTextEdit, QTableWidget, QProgressBar, QSpinBox)
+                            QTextEdit, QPlainTextEdit, QTableWidget, QTableView, QProgressBar, QSpinBox, QCheckBox,
+                            QComboBox)
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtProperty, QRect, QTimer
 from PyQt6.QtGui import QPainter, QPainterPath, QColor, QLinearGradient, QBrush
 
@@ -166,6 +167,23 @@ class ModernTextEdit(QTextEdit):
             }
         """)
 
+class ModernPlainTextEdit(QPlainTextEdit):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QPlainTextEdit {
+                background: rgba(50, 60, 70, 200);
+                color: #ffffff;
+                border: none;
+                border-radius: 8px;
+                padding: 8px;
+                font-size: 12px;
+            }
+            QPlainTextEdit:focus {
+                background: rgba(60, 70, 80, 220);
+            }
+        """)
+
 class ModernTable(QTableWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -193,6 +211,33 @@ class ModernTable(QTableWidget):
             }
         """)
 
+class ModernTableView(QTableView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QTableView {
+                background: rgba(45, 55, 65, 220);
+                color: #ffffff;
+                border: none;
+                border-radius: 8px;
+                gridline-color: rgba(80, 90, 100, 120);
+            }
+            QTableView::item {
+                padding: 8px;
+                border-bottom: 1px solid rgba(80, 90, 100, 120);
+            }
+            QTableView::item:selected {
+                background: rgba(0, 120, 200, 150);
+            }
+            QHeaderView::section {
+                background: rgba(60, 70, 80, 200);
+                color: #ffffff;
+                padding: 8px;
+                border: none;
+                font-weight: bold;
+            }
+        """)
+
 class ModernProgressBar(QProgressBar):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -248,6 +293,33 @@ class ModernSpinBox(QSpinBox):
         super().focusOutEvent(event)
         # 简化实现，不使用图形效果
 
+class ModernComboBox(QComboBox):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setStyleSheet("""
+            QComboBox {
+                background: rgba(50, 60, 70, 200);
+                color: #ffffff;
+                border: none;
+                border-radius: 8px;
+                padding: 8px;
+                font-size: 12px;
+            }
+            QComboBox:focus {
+                background: rgba(60, 70, 80, 220);
+            }
+            QComboBox::drop-down {
+                border: none;
+                width: 20px;
+            }
+            QComboBox QAbstractItemView {
+                background: rgb(40, 50, 60);
+                color: #ffffff;
+                selection-background-color: rgba(0, 150, 255, 200);
+            }
+        """)
+
 class ModernLabel(QLabel):
     def __init__(self, text="", parent=None):
         super().__init__(text, parent)
@@ -259,6 +331,27 @@ class ModernLabel(QLabel):
             }
         """)
 
+class ModernCheckBox(QCheckBox):
+    def __init__(self, text="", parent=None):
+        super().__init__(text, parent)
+        self.setStyleSheet("""
+            QCheckBox {
+                color: #ffffff;
+                font-weight: bold;
+            }
+            QCheckBox::indicator {
+                width: 18px;
+                height: 18px;
+                border: 2px solid rgba(100, 120, 140, 180);
+                border-radius: 4px;
+                background: rgba(50, 60, 70, 200);
+            }
+            QCheckBox::indicator:checked {
+                background: rgba(0, 150, 255, 200);
+                border: 2px solid rgba(0, 150, 255, 255);
+            }
+        """)
+
 class ResetButton(QPushButton):
     def __init__(self, parent=None):
         super().__init__("🔄", parent)
@@ -1,20 +1,26 @@
 import time
-import requests
+import heapq
+import queue
 import threading
 import json
 import random
 import base64
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime, timezone, timedelta
 from PyQt6.QtCore import QThread, pyqtSignal
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad
-from requests.exceptions import RequestException, ConnectionError, Timeout, HTTPError, TooManyRedirects, SSLError
+from .latency import latency_stats
+from .metrics import metrics_registry
+from .probed_ranges import IntervalSet
+from .hit_density import BUCKET_WIDTH
 
 BASE62_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
 BASE = 62
 
+# 只有这些状态码明确表示短码不存在；限流(429)、5xx 等其他状态说明不了短码是否存在，按出错处理
+MISSING_STATUS_CODES = (404, 410)
+
 def base62_to_int(s):
     num = 0
     for char in s:
@@ -56,6 +62,9 @@ class NetEaseEncryption:
         return ''.join(random.sample(self.character, length))
     
     def aes_encrypt(self, text, key):
+        from Crypto.Cipher import AES
+        from Crypto.Util.Padding import pad
+
         text = pad(text.encode(), AES.block_size)
         key = key.encode()
         iv = self.iv.encode()
@@ -78,27 +87,116 @@ class NetEaseEncryption:
             'encSecKey': rsa_encrypted
         }
 
+class LinkFeed:
+    # 扫描线程与分析线程之间的有界队列：队列满时扫描线程阻塞等待，扫描速度随分析速度回落
+    def __init__(self, maxsize=200):
+        self.queue = queue.Queue(maxsize)
+        self.closed = threading.Event()
+        self.lock = threading.Lock()
+        self.received = 0
+        self.blocked_seconds = 0.0
+
+    def put(self, link, should_continue=None):
+        if self.closed.is_set():
+            return False
+        try:
+            self.queue.put_nowait(link)
+        except queue.Full:
+            pass
+        else:
+            with self.lock:
+                self.received += 1
+            return True
+
+        # 队列已满：从这里开始计入阻塞时间，包括最终在某次等待中途放入成功的那一段
+        started = time.monotonic()
+        try:
+            while not self.closed.is_set():
+                try:
+                    self.queue.put(link, timeout=0.2)
+                    with self.lock:
+                        self.received += 1
+                    return True
+                except queue.Full:
+                    if should_continue is not None and not should_continue():
+                        return False
+            return False
+        finally:
+            with self.lock:
+                self.blocked_seconds += time.monotonic() - started
+
+    def get_nowait(self):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        # 扫描结束或分析停止时关闭：不再接收新链接，已排队的链接仍会被分析
+        self.closed.set()
+
+    def is_drained(self):
+        return self.closed.is_set() and self.queue.empty()
+
+    def depth(self):
+        return self.queue.qsize()
+
 class ScannerWorker(QThread):
     log_message = pyqtSignal(str)
     result_found = pyqtSignal(str, str)
     finished = pyqtSignal()
 
+    RECORD_INTERVAL = 2
+    FRONTIER_LOOKBACK = 62 ** 2
+    FOLLOW_WAIT = 30
+
     def __init__(self, prefix, start_suffix, end_suffix, max_workers, 
-                 sleep_every, sleep_for, parent=None):
+                 sleep_every, sleep_for, skip_probed=True, record_probes=False,
+                 scan_order='linear', miss_limit=500, parent=None):
         super().__init__(parent)
         self.prefix = prefix
         self.start_id = base62_to_int(start_suffix)
         self.end_id = base62_to_int(end_suffix)
+        self.skip_probed = skip_probed
+        self.record_probes = record_probes
+        self.scan_order = scan_order
+        self.miss_limit = miss_limit
+        self.probe_log = None
         self.max_workers = max_workers
         self.sleep_every = sleep_every
         self.sleep_for = sleep_for
+        self.link_feed = None
 
         self._is_running = True
         self._is_paused = False
         self.pause_lock = threading.Lock()
+        self.stop_future = Future()
+        self.sessions = []
+        self.sessions_lock = threading.Lock()
         
         self.id_lock = threading.Lock()
         self.current_id = self.start_id
+        self.range_end = self.end_id
+        # next_range_mins[i] 是 next_ranges[i:] 中最小的起点，queued_ids 是 next_ranges 的ID总数，
+        # 随区间出队增量维护，进度和断点查询不必在 id_lock 内遍历全部区间
+        self.next_ranges = deque()
+        self.next_range_mins = deque()
+        self.queued_ids = 0
+        self.pending_ids = set()
+        self.total_ids = max(0, self.end_id - self.start_id)
+        self.skipped_ids = 0
+
+        # 新完成的ID及各区块的探测/命中数定期并入历史记录；请求出错的ID不算已探测，留给以后的扫描
+        self.probed_ranges = None
+        self.hit_density = None
+        self.completed = IntervalSet()
+        self.unconfirmed = IntervalSet()
+        self.bucket_counts = {}
+
+        # 已发放的最大ID（本次扫描见到的与上次定位的前沿中较大者）；在它之上未发放的ID以后可能被发放，不记为已探测
+        self.frontier_id = None
+        self.follow_resume_at = None
+        self.follow_rounds = 0
         
         self.checked_count = 0
         self.found_count = 0
@@ -106,19 +204,41 @@ class ScannerWorker(QThread):
         
         self.throttle_lock = threading.Lock()
         self.requests_since_sleep = 0
+        self.throttle_sleeping = False
+
+        self.stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.found_by_type = {'vip': 0, 'audio': 0, 'gift': 0}
+        self.probe_results = {'hit': 0, 'redirect_other': 0, 'invalid': 0, 'error': 0}
+        self.error_counts = {}
 
     def run(self):
         self.start_time = time.time()
+        metrics_registry.set_source('scanner', self)
         
         self.log_message.emit(f"扫描任务启动: 从 {self.prefix}{int_to_base62(self.start_id)} "
                               f"到 {self.prefix}{int_to_base62(self.end_id)}")
+        self.plan_ranges()
+        if self.record_probes:
+            self.open_probe_log()
         self.log_message.emit(f"使用 {self.max_workers} 个线程进行扫描。")
         if self.sleep_every > 0 and self.sleep_for > 0:
             self.log_message.emit(f"节流策略: 每 {self.sleep_every} 次请求暂停 {self.sleep_for} 秒。")
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            for _ in range(self.max_workers):
-                executor.submit(self.check_link_worker)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        workers = {executor.submit(self.check_link_worker) for _ in range(self.max_workers)}
+        # 停止时不等待仍阻塞在网络上的线程，其连接已被中止，结果会被丢弃
+        while workers and not self.stop_future.done():
+            done, _ = wait(workers | {self.stop_future}, timeout=self.RECORD_INTERVAL,
+                           return_when=FIRST_COMPLETED)
+            workers -= done
+            self.record_probed()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.record_probed(save=True)
+        if self.scan_order == 'frontier':
+            self.save_frontier()
+        if self.probe_log is not None:
+            self.probe_log.close()
         
         if self._is_running:
             self.log_message.emit("扫描完成")
@@ -128,7 +248,23 @@ class ScannerWorker(QThread):
         self.finished.emit()
 
     def check_link_worker(self):
-        while self._is_running and self.get_next_id() < self.end_id:
+        from .http_client import create_session
+
+        session = create_session()
+        with self.sessions_lock:
+            self.sessions.append(session)
+        try:
+            if self._is_running:
+                self._check_links(session)
+        finally:
+            with self.sessions_lock:
+                self.sessions.remove(session)
+            session.close()
+
+    def _check_links(self, session):
+        import requests
+
+        while self._is_running:
             with self.pause_lock:
                 if not self._is_running: return
 
@@ -143,41 +279,325 @@ class ScannerWorker(QThread):
             code = self.prefix + suffix
             url = f"http://163cn.tv/{code}"
             
+            with self.stats_lock:
+                self.in_flight += 1
+            started = time.perf_counter()
+            outcome = None
             try:
-                resp = requests.head(url, allow_redirects=False, timeout=5)
-                if resp.status_code in [301, 302] and 'Location' in resp.headers:
-                    location = resp.headers['Location']
-                    link_type = None
-                    if 'vip-invite-cashier' in location:
-                        link_type = 'vip'
-                    elif 'vip-trialcard' in location:
-                        link_type = 'audio'
-                    elif 'gift-receive' in location:
-                        link_type = 'gift'
-
-                    if link_type:
-                        type_names = {'vip': 'VIP', 'audio': '音质', 'gift': '礼品'}
-                        self.log_message.emit(f"[✅ {type_names[link_type]} 链接] {url}")
-                        self.result_found.emit(link_type, url)
-                        self.found_count += 1
-                    else:
-                        self.log_message.emit(f"[⚠️ 跳转但不符] {url} → {location[:100]}...")
-
-                else:
-                    self.log_message.emit(f"[❌ 无效] {url} → 状态码: {resp.status_code}")
-
-            except requests.exceptions.RequestException:
-                pass
+                with latency_stats.operation('probe'):
+                    resp = session.head(url, allow_redirects=False, timeout=5)
+                    latency = time.perf_counter() - started
+                    with latency_stats.measure('probe/emit'):
+                        outcome = self.report_probe(url, resp)
+                if self.probe_log is not None:
+                    self.probe_log.write(current_id, resp.status_code, outcome, latency)
+
+            except requests.exceptions.RequestException as e:
+                if self._is_running:
+                    self.count_error(e)
+                    self.log_probe_error(current_id, started, e)
             except Exception as e:
+                self.count_error(e)
+                self.log_probe_error(current_id, started, e)
                 self.log_message.emit(f"[⚠️ 错误] {url} -> {e}")
+            finally:
+                with self.stats_lock:
+                    self.in_flight -= 1
+                self.mark_done(current_id, outcome)
+
+    def report_probe(self, url, resp):
+        if resp.status_code in [301, 302] and 'Location' in resp.headers:
+            location = resp.headers['Location']
+            link_type = None
+            if 'vip-invite-cashier' in location:
+                link_type = 'vip'
+            elif 'vip-trialcard' in location:
+                link_type = 'audio'
+            elif 'gift-receive' in location:
+                link_type = 'gift'
+
+            if link_type:
+                type_names = {'vip': 'VIP', 'audio': '音质', 'gift': '礼品'}
+                self.log_message.emit(f"[✅ {type_names[link_type]} 链接] {url}")
+                self.result_found.emit(link_type, url)
+                self.found_count += 1
+                with self.stats_lock:
+                    self.found_by_type[link_type] += 1
+                    self.probe_results['hit'] += 1
+                if self.link_feed is not None:
+                    self.link_feed.put(url, lambda: self._is_running)
+                return link_type
+            self.log_message.emit(f"[⚠️ 跳转但不符] {url} → {location[:100]}...")
+            with self.stats_lock:
+                self.probe_results['redirect_other'] += 1
+            return 'redirect_other'
+
+        if resp.status_code not in MISSING_STATUS_CODES:
+            self.log_message.emit(f"[⚠️ 状态异常] {url} → 状态码: {resp.status_code}")
+            with self.stats_lock:
+                name = f"HTTP {resp.status_code}"
+                self.error_counts[name] = self.error_counts.get(name, 0) + 1
+                self.probe_results['error'] += 1
+            return 'error'
+
+        self.log_message.emit(f"[❌ 无效] {url} → 状态码: {resp.status_code}")
+        with self.stats_lock:
+            self.probe_results['invalid'] += 1
+        return 'invalid'
+
+    def count_error(self, error):
+        with self.stats_lock:
+            name = type(error).__name__
+            self.error_counts[name] = self.error_counts.get(name, 0) + 1
+            self.probe_results['error'] += 1
+
+    def open_probe_log(self):
+        from .probe_log import ProbeLogWriter
+
+        try:
+            self.probe_log = ProbeLogWriter(self.prefix)
+        except (OSError, ValueError) as e:
+            self.log_message.emit(f"[⚠️ 探测明细] 无法记录: {e}")
+            return
+        self.log_message.emit(f"[探测明细] 每次探测的结果写入 {self.probe_log.path}")
+
+    def log_probe_error(self, check_id, started, error):
+        if self.probe_log is not None:
+            self.probe_log.write(check_id, 0, 'error', time.perf_counter() - started, type(error).__name__)
+
+    def collect_metrics(self):
+        with self.stats_lock:
+            found_by_type = dict(self.found_by_type)
+            probe_results = dict(self.probe_results)
+            error_counts = dict(self.error_counts)
+            in_flight = self.in_flight
+
+        yield ('wyy_scanner_probes_total', 'counter', 'Short links probed', {}, self.checked_count)
+        for link_type, count in found_by_type.items():
+            yield ('wyy_scanner_hits_total', 'counter', 'Links found by type', {'type': link_type}, count)
+        for result, count in probe_results.items():
+            yield ('wyy_scanner_probe_results_total', 'counter', 'Probe outcomes', {'result': result}, count)
+        for error_class, count in error_counts.items():
+            yield ('wyy_scanner_errors_total', 'counter', 'Probe errors by exception class',
+                   {'class': error_class}, count)
+        yield ('wyy_scanner_in_flight', 'gauge', 'Probe requests in flight', {}, in_flight)
+        yield ('wyy_scanner_queue_depth', 'gauge', 'IDs not yet handed to a worker', {},
+               self.remaining_count())
+        yield ('wyy_scanner_skipped_ids', 'gauge', 'IDs skipped because earlier scans probed them', {},
+               self.skipped_ids)
+        if self.frontier_id is not None:
+            yield ('wyy_scanner_frontier_id', 'gauge', 'Highest issued ID known for the prefix', {},
+                   self.frontier_id)
+        yield ('wyy_scanner_follow_rounds_total', 'counter', 'Times the scan caught up with the frontier', {},
+               self.follow_rounds)
+        yield ('wyy_scanner_running', 'gauge', 'Whether the scan is running', {}, int(self.isRunning()))
+        yield ('wyy_scanner_paused', 'gauge', 'Whether the scan is paused', {}, int(self._is_paused))
+        yield ('wyy_scanner_probe_rate', 'gauge', 'Average probes per second', {}, f"{self.get_speed():.3f}")
+        yield ('wyy_scanner_throttle_sleep_every', 'gauge', 'Throttle: requests between pauses', {}, self.sleep_every)
+        yield ('wyy_scanner_throttle_sleep_seconds', 'gauge', 'Throttle: pause length', {}, self.sleep_for)
+        yield ('wyy_scanner_throttle_requests_total', 'counter', 'Throttle: requests counted', {},
+               self.requests_since_sleep)
+        yield ('wyy_scanner_throttle_sleeping', 'gauge', 'Throttle: currently pausing', {},
+               int(self.throttle_sleeping))
+        if self.link_feed is not None:
+            yield ('wyy_scanner_feed_blocked_seconds_total', 'counter',
+                   'Time probe threads waited for the analyzer to accept hits', {},
+                   f"{self.link_feed.blocked_seconds:.3f}")
+
+    def plan_ranges(self):
+        from .probed_ranges import get_probed_ranges
+        from .hit_density import get_hit_density
+        from .frontier import FrontierStore
+
+        saved = FrontierStore().get(self.prefix)
+        self.frontier_id = saved['frontier'] if saved else None
+        start_id = self.start_id
+        if self.scan_order == 'frontier':
+            frontier = self.locate_frontier()
+            if frontier is not None:
+                self.frontier_id = frontier
+                # 从前沿之下不远处开始，起始后缀只作为定位的起点
+                start_id = max(0, frontier - self.FRONTIER_LOOKBACK)
+                self.total_ids = max(0, self.end_id - start_id)
+
+        ranges = [(start_id, self.end_id)] if start_id < self.end_id else []
+        try:
+            self.probed_ranges = get_probed_ranges()
+        except OSError as e:
+            self.log_message.emit(f"[⚠️ 探测记录] 无法读取历史探测记录: {e}")
+        else:
+            if self.skip_probed:
+                ranges = self.probed_ranges.gaps(self.prefix, start_id, self.end_id)
+                total = sum(end - start for start, end in ranges)
+                self.skipped_ids = self.total_ids - total
+                if self.skipped_ids:
+                    self.log_message.emit(f"[探测记录] 跳过此前已探测的 {self.skipped_ids} 个ID，"
+                                          f"剩余 {total} 个ID分布在 {len(ranges)} 段中")
+
+        self.hit_density = get_hit_density()
+        if self.scan_order == 'yield' and ranges:
+            ranges, rates = self.hit_density.order_ranges(self.prefix, ranges)
+            probes, hits = self.hit_density.totals(self.prefix)
+            best = rates[ranges[0][0] // BUCKET_WIDTH]
+            self.log_message.emit(f"[命中密度] 按估计命中率从高到低扫描 {len(rates)} 个区块，"
+                                  f"最高 {best:.3%}；历史共探测 {probes} 次，命中 {hits} 个")
+
+        with self.id_lock:
+            # 追踪前沿时扫描没有确定的终点，不显示进度
+            self.total_ids = 0 if self.scan_order == 'frontier' else sum(end - start for start, end in ranges)
+            self.set_next_ranges(ranges)
+            self.current_id = self.range_end = start_id
+
+    def locate_frontier(self):
+        import requests
+        from .frontier import locate_frontier
+        from .http_client import create_session
+
+        session = create_session()
+        with self.sessions_lock:
+            self.sessions.append(session)
+        try:
+            frontier, probes = locate_frontier(self.prefix, self.start_id, session=session,
+                                               should_continue=lambda: self._is_running)
+        except (requests.exceptions.RequestException, InterruptedError) as e:
+            if self._is_running:
+                self.log_message.emit(f"[⚠️ 追踪前沿] 定位前沿失败，改为从起始后缀顺序扫描: {e}")
+            return None
+        finally:
+            with self.sessions_lock:
+                self.sessions.remove(session)
+            session.close()
+        if frontier is None:
+            self.log_message.emit("[⚠️ 追踪前沿] 起始后缀及以下没有找到已发放的短码，改为从起始后缀顺序扫描")
+            return None
+        self.log_message.emit(f"[追踪前沿] 前沿位于 {self.prefix}{int_to_base62(frontier)}（探测 {probes} 次），"
+                              f"从其下 {self.FRONTIER_LOOKBACK} 个ID处开始，连续 {self.miss_limit} 个未发放即视为追上前沿")
+        return frontier
+
+    def save_frontier(self):
+        from .frontier import FrontierStore
+
+        if self.frontier_id is None:
+            return
+        try:
+            store = FrontierStore()
+            saved = store.get(self.prefix)
+            if saved is None or self.frontier_id > saved['frontier']:
+                store.save(self.prefix, self.frontier_id)
+        except OSError:
+            pass
+
+    def follow_wait(self):
+        # 追踪前沿：越过已发放的最大ID后连续 miss_limit 个都未发放，说明已追上前沿；
+        # 等待一段时间让新短码发放出来，再从前沿之上重新扫描。调用方持有 id_lock，返回需要等待的秒数
+        if self.scan_order != 'frontier' or self.frontier_id is None:
+            return None
+        if self.current_id <= self.frontier_id + self.miss_limit or self.current_id >= self.end_id:
+            self.follow_resume_at = None
+            return None
+        now = time.monotonic()
+        if self.follow_resume_at is None:
+            self.follow_resume_at = now + self.FOLLOW_WAIT
+            self.follow_rounds += 1
+            self.log_message.emit(f"[追踪前沿] 已追上前沿 {self.prefix}{int_to_base62(self.frontier_id)}，"
+                                  f"{self.FOLLOW_WAIT} 秒后从前沿处继续扫描")
+        if now < self.follow_resume_at:
+            return self.follow_resume_at - now
+        self.follow_resume_at = None
+        self.current_id = self.frontier_id + 1
+        self.range_end = self.end_id
+        self.set_next_ranges([])
+        return None
+
+    def set_next_ranges(self, ranges):
+        # 调用方持有 id_lock（或线程尚未启动）
+        mins = []
+        lowest = None
+        for start, _ in reversed(ranges):
+            lowest = start if lowest is None else min(lowest, start)
+            mins.append(lowest)
+        mins.reverse()
+        self.next_ranges = deque(ranges)
+        self.next_range_mins = deque(mins)
+        self.queued_ids = sum(end - start for start, end in ranges)
 
     def get_next_id(self):
+        while self._is_running:
+            with self.id_lock:
+                wait_for = self.follow_wait()
+                if wait_for is None:
+                    while self.current_id >= self.range_end:
+                        if not self.next_ranges:
+                            self.current_id = self.range_end = self.end_id
+                            return None
+                        self.current_id, self.range_end = self.next_ranges.popleft()
+                        self.next_range_mins.popleft()
+                        self.queued_ids -= self.range_end - self.current_id
+                    check_id = self.current_id
+                    self.current_id += 1
+                    self.pending_ids.add(check_id)
+                    return check_id
+            wait([self.stop_future], timeout=min(wait_for, 1))
+        return None
+
+    def mark_done(self, check_id, outcome=None):
+        # outcome 为空或为 error 表示请求出错、被中止或状态码不能确定短码是否存在，该ID不记为已探测
+        with self.id_lock:
+            self.pending_ids.discard(check_id)
+            if outcome is None or outcome == 'error':
+                return
+            if outcome != 'invalid':
+                if self.frontier_id is None or check_id > self.frontier_id:
+                    self.frontier_id = check_id
+                self.completed.add(check_id, check_id + 1)
+            elif self.frontier_id is not None and check_id < self.frontier_id:
+                self.completed.add(check_id, check_id + 1)
+            elif self.scan_order != 'frontier':
+                # 暂不确定是永久空缺还是尚未发放，等其上出现已发放的短码后再记为已探测
+                self.unconfirmed.add(check_id, check_id + 1)
+            counts = self.bucket_counts.get(check_id // BUCKET_WIDTH)
+            if counts is None:
+                counts = self.bucket_counts[check_id // BUCKET_WIDTH] = [0, 0]
+            counts[0] += 1
+            if outcome in self.found_by_type:
+                counts[1] += 1
+
+    def remaining_count(self):
+        with self.id_lock:
+            return max(0, self.range_end - self.current_id) + self.queued_ids
+
+    def record_probed(self, save=False):
+        with self.id_lock:
+            if self.unconfirmed and self.frontier_id is not None:
+                confirmed = self.unconfirmed.copy()
+                confirmed.remove(self.frontier_id, self.end_id)
+                self.unconfirmed.remove(0, self.frontier_id)
+                self.completed.update(confirmed)
+            completed, self.completed = self.completed, IntervalSet()
+            bucket_counts, self.bucket_counts = self.bucket_counts, {}
+        stores = [self.hit_density]
+        self.hit_density.add(self.prefix, bucket_counts)
+        if self.probed_ranges is not None:
+            self.probed_ranges.update(self.prefix, completed)
+            stores.append(self.probed_ranges)
+        try:
+            for store in stores:
+                if save:
+                    store.save()
+                else:
+                    store.save_if_due()
+        except OSError as e:
+            self.log_message.emit(f"[⚠️ 探测记录] 保存失败: {e}")
+
+    def resume_point(self):
+        # 最小的未完成ID，作为断点续扫的起点；按命中率顺序扫描时其后的已完成区间由探测记录跳过
         with self.id_lock:
-            if self.current_id >= self.end_id:
-                return None
-            check_id = self.current_id
-            self.current_id += 1
-            return check_id
+            candidates = list(self.pending_ids)
+            if self.current_id < self.range_end:
+                candidates.append(self.current_id)
+            if self.next_range_mins:
+                candidates.append(self.next_range_mins[0])
+            return min(candidates) if candidates else self.end_id
 
     def handle_throttling(self):
         if self.sleep_every <= 0 or self.sleep_for <= 0:
@@ -187,14 +607,27 @@ class ScannerWorker(QThread):
             self.requests_since_sleep += 1
             if self.requests_since_sleep % self.sleep_every == 0:
                 self.log_message.emit(f"[节流] 已达 {self.requests_since_sleep} 次请求，暂停 {self.sleep_for} 秒...")
-                time.sleep(self.sleep_for)
+                self.throttle_sleeping = True
+                wait([self.stop_future], timeout=self.sleep_for)
+                self.throttle_sleeping = False
                 
     def get_speed(self):
         elapsed_time = time.time() - self.start_time
         return self.checked_count / elapsed_time if elapsed_time > 0 else 0
 
     def stop(self):
+        from .http_client import abort_session
+
         self._is_running = False
+        if not self.stop_future.done():
+            self.stop_future.set_result(None)
+        if self._is_paused:
+            self._is_paused = False
+            self.pause_lock.release()
+        with self.sessions_lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            abort_session(session)
 
     def pause(self):
         if not self._is_paused:
@@ -208,18 +641,29 @@ class ScannerWorker(QThread):
             self._is_paused = False
             self.log_message.emit("扫描已恢复。")
 
+GIFT_API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Referer': 'https://music.163.com/',
+    'Accept': 'application/json, text/plain, */*',
+    'Content-Type': 'application/x-www-form-urlencoded',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
+}
+
 class OptimalGiftAnalyzer:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': 'https://music.163.com/',
-            'Accept': 'application/json, text/plain, */*',
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
-        })
+    def __init__(self, client=None):
+        from .http_client import HttpClient
+        from .request_cache import SingleFlightCache
+
+        # 传入共享客户端时复用其连接池，只覆盖请求头
+        if client is None:
+            self.session = HttpClient(headers=GIFT_API_HEADERS)
+        else:
+            self.session = client.with_headers(GIFT_API_HEADERS)
         self.encryption = NetEaseEncryption()
         self.api_url = 'https://music.163.com/weapi/vipgift/app/gift/index'
+        # 不同短链接常指向同一礼品参数，只缓存成功结果，失败的查询下次重新请求
+        self.gift_cache = SingleFlightCache(ttl=30.0, max_entries=1024,
+                                            should_cache=lambda result: result.get('status') == 'success')
 
     def extract_gift_params(self, redirect_url):
         try:
@@ -237,6 +681,11 @@ class OptimalGiftAnalyzer:
             return None
 
     def call_gift_api(self, gift_params):
+        key = (gift_params['d'], gift_params['p'], gift_params['userid'],
+               gift_params['app_version'], gift_params['dlt'])
+        return self.gift_cache.get_or_load(key, lambda: self.request_gift_api(gift_params))
+
+    def request_gift_api(self, gift_params):
         try:
             api_data = {
                 'd': gift_params['d'],
@@ -247,18 +696,21 @@ class OptimalGiftAnalyzer:
                 'csrf_token': ''
             }
 
-            encrypted_data = self.encryption.encrypt_params(json.dumps(api_data))
+            with latency_stats.operation('gift_api'):
+                with latency_stats.measure('gift_api/encrypt'):
+                    encrypted_data = self.encryption.encrypt_params(json.dumps(api_data))
 
-            response = self.session.post(
-                self.api_url,
-                data=encrypted_data,
-                timeout=10
-            )
+                response = self.session.post(
+                    self.api_url,
+                    data=encrypted_data,
+                    timeout=10
+                )
 
             if response.status_code == 200:
                 try:
-                    result = response.json()
-                    return self.parse_api_response(result, gift_params)
+                    with latency_stats.measure('gift_api/parse'):
+                        result = response.json()
+                        return self.parse_api_response(result, gift_params)
                 except json.JSONDecodeError:
                     return {
                         'status': 'api_exception',
@@ -351,10 +803,21 @@ class OptimalGiftAnalyzer:
 
     def analyze_gift_link(self, short_url):
         try:
-            resp = self.session.head(short_url, allow_redirects=False, timeout=10)
+            with latency_stats.operation('resolve'):
+                resp = self.session.head(short_url, allow_redirects=False, timeout=10)
+        except Exception as e:
+            return {
+                "status": "system_exception",
+                "short_url": short_url,
+                "message": f"系统异常: {str(e)}"
+            }
+        return self.analyze_gift_response(short_url, resp.status_code, resp.headers)
 
-            if resp.status_code not in [301, 302]:
-                if resp.status_code == 404:
+    def analyze_gift_response(self, short_url, status_code, headers):
+        # 根据短链接 HEAD 的结果继续分析，分级流水线中解析阶段已发过请求，无需再次解析
+        try:
+            if status_code not in [301, 302]:
+                if status_code == 404:
                     return {
                         "status": "invalid",
                         "message": "链接不存在(404)",
@@ -363,18 +826,18 @@ class OptimalGiftAnalyzer:
                 else:
                     return {
                         "status": "invalid",
-                        "message": f"无效的短链接(HTTP {resp.status_code})",
+                        "message": f"无效的短链接(HTTP {status_code})",
                         "short_url": short_url
                     }
 
-            if 'Location' not in resp.headers:
+            if 'Location' not in headers:
                 return {
                     "status": "invalid",
                     "message": "短链接缺少重定向信息",
                     "short_url": short_url
                 }
 
-            redirect_url = resp.headers['Location']
+            redirect_url = headers['Location']
 
             if 'gift-receive' not in redirect_url:
                 return {
@@ -406,20 +869,84 @@ class OptimalGiftAnalyzer:
                 "message": f"系统异常: {str(e)}"
             }
 
+class AnalyzerStage:
+    # 分析流水线中的一级：独立的线程池和并发上限，queued/active 用于观测该级的排队深度
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"analyzer-{name}")
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+
+    def submit(self, function, *args):
+        with self.lock:
+            self.queued += 1
+
+        def call():
+            with self.lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return function(*args)
+            finally:
+                with self.lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        return self.executor.submit(call)
+
+    def snapshot(self):
+        with self.lock:
+            return self.queued, self.active, self.completed
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 class AnalyzerWorker(QThread):
     progress_updated = pyqtSignal(int, int, str)
     single_result_ready = pyqtSignal(dict)
+    results_batch_ready = pyqtSignal(list)
+    known_results_ready = pyqtSignal(list)
     finished = pyqtSignal()
 
-    def __init__(self, links, max_workers=5, parent=None):
+    # 结果攒批后再发给界面：满 BATCH_SIZE 条立即发送，否则每 FLUSH_INTERVAL 秒发送一次并更新进度
+    BATCH_SIZE = 200
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self, links, max_workers=5, stage_workers=None, skip_statuses=None, parent=None):
         super().__init__(parent)
         self.links = links
+        # 历史结果库中最近一次结果为这些状态的链接直接复用，不再分析
+        self.skip_statuses = skip_statuses
+        # 流式模式下链接来自扫描器的 LinkFeed，总数随扫描进行不断增长
+        self.link_feed = links if isinstance(links, LinkFeed) else None
         self.max_workers = max_workers
-        self.analyzer = OptimalGiftAnalyzer()
+        # 解析、礼品接口、VIP/音质有效期接口三个阶段各自的线程数，未指定时均为 max_workers
+        self.stage_workers = {'resolve': max_workers, 'gift': max_workers, 'vip': max_workers}
+        self.stage_workers.update(stage_workers or {})
+        self.stages = {}
+        # 网络相关对象在 run() 中创建，避免在 GUI 线程导入 requests
+        self.analyzer = None
+        self.session = None
         self.is_running = True
         self.is_paused = False
         self.pause_event = threading.Event()
         self.pause_event.set()
+        self.stop_future = Future()
+
+        self.stats_lock = threading.Lock()
+        self.total_links = 0 if self.link_feed is not None else len(links)
+        self.completed_count = 0
+        self.in_flight = 0
+        self.result_counts = {}
+        self.error_counts = {}
+
+        self.batch_lock = threading.Lock()
+        self.pending_results = []
+        self.last_status = "分析中..."
+        self.last_flush = 0.0
 
     def check_vip_expiry(self, redirect_url):
         try:
@@ -450,10 +977,12 @@ class AnalyzerWorker(QThread):
                     if record_id:
                         params['recordId'] = record_id
 
-                    response = requests.get(api_url, params=params, timeout=10)
+                    with latency_stats.operation('vip_api'):
+                        response = self.session.get(api_url, params=params, timeout=10)
 
                     if response.status_code == 200:
-                        data = response.json()
+                        with latency_stats.measure('vip_api/parse'):
+                            data = response.json()
                         if 'data' in data and data['data']:
                             detail_data = data['data']
                             expire_time = (detail_data.get('expireTime') or
@@ -489,169 +1018,326 @@ class AnalyzerWorker(QThread):
                 'error': f'检查失败: {str(e)}'
             }
 
-    def analyze_single_link(self, link):
+    def resolve_link(self, link):
+        # 解析阶段：取得短链接的跳转目标并判断链接类型，HEAD 的响应留给礼品阶段复用。
+        # HEAD 使用与 analyze_gift_link 相同的请求头和超时，复用与否不影响礼品阶段的结果
+        resolution = {'redirect_url': None, 'is_vip_link': False, 'is_audio_link': False,
+                      'status_code': None, 'headers': None}
         try:
-            is_vip_link = False
-            redirect_url = None
+            with latency_stats.operation('resolve'):
+                response = self.analyzer.session.head(link, allow_redirects=False, timeout=10)
+            resolution['status_code'] = response.status_code
+            resolution['headers'] = response.headers
+            if response.status_code in [301, 302] and 'Location' in response.headers:
+                redirect_url = response.headers['Location']
+            else:
+                with latency_stats.operation('resolve_follow'):
+                    response = self.session.get(link, allow_redirects=True, timeout=10)
+                redirect_url = response.url
+            resolution['redirect_url'] = redirect_url
+            resolution['is_vip_link'] = 'vip-invite-cashier' in redirect_url
+            resolution['is_audio_link'] = 'vip-trialcard' in redirect_url
+        except Exception:
+            pass
+        return resolution
 
-            try:
-                response = requests.head(link, allow_redirects=False, timeout=5)
-                if response.status_code in [301, 302] and 'Location' in response.headers:
-                    redirect_url = response.headers['Location']
-                    is_vip_link = 'vip-invite-cashier' in redirect_url
-                    is_audio_link = 'vip-trialcard' in redirect_url
-                else:
-                    response = requests.get(link, allow_redirects=True, timeout=10)
-                    redirect_url = response.url
-                    is_vip_link = 'vip-invite-cashier' in redirect_url
-                    is_audio_link = 'vip-trialcard' in redirect_url
-            except:
-                pass
-
-            if (is_vip_link or is_audio_link) and redirect_url:
-                expiry_result = self.check_vip_expiry(redirect_url)
-
-                if is_audio_link:
-                    link_type = 'audio'
-                    gift_type = '音质试用卡'
-                else:
-                    link_type = 'vip'
-                    gift_type = 'VIP邀请'
-
-                result = {
-                    'status': 'success',
-                    'short_url': link,
-                    'redirect_url': redirect_url,
-                    'is_vip_link': is_vip_link,
-                    'is_audio_link': is_audio_link,
-                    'gift_type': gift_type,
-                    'gift_price': 0,
-                    'sender_name': '',
-                    'gift_count': '',
-                }
+    def is_expiry_link(self, resolution):
+        return bool(resolution['redirect_url']) and (resolution['is_vip_link'] or resolution['is_audio_link'])
 
-                if expiry_result.get('error'):
-                    if is_audio_link:
-                        result['audio_status'] = 'expiry_check_failed'
-                        result['status_text'] = f"音质有效期检查失败: {expiry_result['error']}"
-                    else:
-                        result['vip_status'] = 'expiry_check_failed'
-                        result['status_text'] = f"VIP有效期检查失败: {expiry_result['error']}"
-                    result['gift_status'] = 'unknown'
-                elif expiry_result.get('is_valid') is False:
-                    expire_date = expiry_result.get('expire_date', 'Unknown')
-                    if is_audio_link:
-                        result['audio_status'] = 'expired'
-                        result['status_text'] = '音质已过期'
-                    else:
-                        result['vip_status'] = 'expired'
-                        result['status_text'] = 'VIP已过期'
-                    result['gift_status'] = 'expired'
-                    result['expire_date'] = expire_date
-                else:
-                    expire_date = expiry_result.get('expire_date', 'Unknown')
-                    remaining_days = expiry_result.get('remaining_days', 0)
-                    if is_audio_link:
-                        result['audio_status'] = 'valid'
-                        result['status_text'] = f'音质有效 - 剩余{remaining_days:.1f}天'
-                    else:
-                        result['vip_status'] = 'valid'
-                        result['status_text'] = f'VIP有效 - 剩余{remaining_days:.1f}天'
-                    result['gift_status'] = 'available'
-                    result['expire_date'] = expire_date
+    def analyze_expiry_link(self, link, resolution):
+        redirect_url = resolution['redirect_url']
+        is_vip_link = resolution['is_vip_link']
+        is_audio_link = resolution['is_audio_link']
 
-                return result
-            else:
-                result = self.analyzer.analyze_gift_link(link)
-                result['is_vip_link'] = False
+        expiry_result = self.check_vip_expiry(redirect_url)
 
-                if result.get('status') != 'success' and redirect_url:
-                    result['redirect_url'] = redirect_url
-                    if 'gift-receive' in redirect_url:
-                        result['message'] = '检测到礼品卡链接，但分析失败'
-                    else:
-                        result['message'] = '未知类型的链接'
+        if is_audio_link:
+            link_type = 'audio'
+            gift_type = '音质试用卡'
+        else:
+            link_type = 'vip'
+            gift_type = 'VIP邀请'
+
+        result = {
+            'status': 'success',
+            'short_url': link,
+            'redirect_url': redirect_url,
+            'is_vip_link': is_vip_link,
+            'is_audio_link': is_audio_link,
+            'gift_type': gift_type,
+            'gift_price': 0,
+            'sender_name': '',
+            'gift_count': '',
+        }
+
+        if expiry_result.get('error'):
+            if is_audio_link:
+                result['audio_status'] = 'expiry_check_failed'
+                result['status_text'] = f"音质有效期检查失败: {expiry_result['error']}"
+            else:
+                result['vip_status'] = 'expiry_check_failed'
+                result['status_text'] = f"VIP有效期检查失败: {expiry_result['error']}"
+            result['gift_status'] = 'unknown'
+        elif expiry_result.get('is_valid') is False:
+            expire_date = expiry_result.get('expire_date', 'Unknown')
+            if is_audio_link:
+                result['audio_status'] = 'expired'
+                result['status_text'] = '音质已过期'
+            else:
+                result['vip_status'] = 'expired'
+                result['status_text'] = 'VIP已过期'
+            result['gift_status'] = 'expired'
+            result['expire_date'] = expire_date
+            result['expire_time'] = expiry_result.get('expire_time', 0)
+        else:
+            expire_date = expiry_result.get('expire_date', 'Unknown')
+            remaining_days = expiry_result.get('remaining_days', 0)
+            if is_audio_link:
+                result['audio_status'] = 'valid'
+                result['status_text'] = f'音质有效 - 剩余{remaining_days:.1f}天'
+            else:
+                result['vip_status'] = 'valid'
+                result['status_text'] = f'VIP有效 - 剩余{remaining_days:.1f}天'
+            result['gift_status'] = 'available'
+            result['expire_date'] = expire_date
+            result['expire_time'] = expiry_result.get('expire_time', 0)
+
+        return result
+
+    def analyze_gift_stage(self, link, resolution):
+        if resolution['status_code'] is None:
+            # 解析阶段请求失败，由礼品分析器重新请求一次
+            result = self.analyzer.analyze_gift_link(link)
+        else:
+            result = self.analyzer.analyze_gift_response(link, resolution['status_code'], resolution['headers'])
+        result['is_vip_link'] = False
+
+        redirect_url = resolution['redirect_url']
+        if result.get('status') != 'success' and redirect_url:
+            result['redirect_url'] = redirect_url
+            if 'gift-receive' in redirect_url:
+                result['message'] = '检测到礼品卡链接，但分析失败'
+            else:
+                result['message'] = '未知类型的链接'
 
-                return result
+        return result
 
+    def analyze_single_link(self, link):
+        try:
+            resolution = self.resolve_link(link)
+            if self.is_expiry_link(resolution):
+                return self.analyze_expiry_link(link, resolution)
+            return self.analyze_gift_stage(link, resolution)
         except Exception as e:
-            return {
-                'status': 'error',
-                'message': f'分析失败: {str(e)}',
-                'short_url': link,
-                'is_vip_link': False
-            }
+            return self.error_result(link, f'分析失败: {str(e)}')
+
+    def error_result(self, link, message):
+        return {
+            'status': 'error',
+            'message': message,
+            'short_url': link,
+            'is_vip_link': False
+        }
 
     def run(self):
         try:
-            results = []
-            total = len(self.links)
-            completed_count = 0
-            lock = threading.Lock()
+            metrics_registry.set_source('analyzer', self)
+            self.load_known_results()
+            self.setup_clients()
+            self.stages = {name: AnalyzerStage(name, workers) for name, workers in self.stage_workers.items()}
+            try:
+                self.run_pipeline()
+            finally:
+                # 停止时取消排队中的任务，不等待已中止连接的线程退出
+                for stage in self.stages.values():
+                    stage.shutdown()
+                if self.is_running:
+                    self.session.close()
 
-            def process_link_with_callback(link):
-                nonlocal completed_count
+            if self.is_running:
+                self.flush_results()
+                self.finished.emit()
 
-                if not self.is_running:
-                    return None
+        except Exception as e:
+            pass
 
-                self.pause_event.wait()
+    def load_known_results(self):
+        import sqlite3
+        from .result_db import get_result_db
 
-                if not self.is_running:
-                    return None
+        if not self.skip_statuses or self.link_feed is not None or not self.links:
+            return
+        try:
+            known = get_result_db().latest_results(self.links, self.skip_statuses)
+        except sqlite3.Error:
+            return
+        if not known:
+            return
+        self.links = [link for link in self.links if link not in known]
+        with self.stats_lock:
+            self.total_links = len(self.links)
+        # 先于任何进度信号发出，界面据此调整进度偏移
+        self.known_results_ready.emit(list(known.values()))
+
+    def run_pipeline(self):
+        # 每个链接依次经过解析阶段和礼品接口/VIP有效期接口阶段，各阶段线程数独立；
+        # 只保持有限个链接在流水线中，随完成随补充，内存占用与链接总数无关
+        stages = self.stages
+        feed = self.link_feed
+        link_iter = iter(self.links) if feed is None else None
+        window = sum(self.stage_workers.values()) * 2
+        pending = {}
+
+        def submit(stage_name, link, stage_function, *args):
+            future = stages[stage_name].submit(self.run_stage, stage_function, *args)
+            pending[future] = (stage_name, link)
+
+        def fill_window():
+            while self.is_running and len(pending) < window:
+                link = next(link_iter, None) if feed is None else feed.get_nowait()
+                if link is None:
+                    return
+                with self.stats_lock:
+                    self.in_flight += 1
+                submit('resolve', link, self.resolve_link, link)
+
+        fill_window()
+        while (pending or (feed is not None and not feed.is_drained())) and self.is_running:
+            done, _ = wait(list(pending) + [self.stop_future],
+                           timeout=self.FLUSH_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future is self.stop_future or not self.is_running:
+                    continue
+                stage_name, link = pending.pop(future)
 
-                result = self.analyze_single_link(link)
-                self.single_result_ready.emit(result)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    self.count_error(e)
+                    outcome = self.error_result(link, f'分析失败: {str(e)}')
+                if outcome is None:
+                    continue
 
-                with lock:
-                    completed_count += 1
-                    status_text = "已暂停..." if self.is_paused else "分析中..."
-                    if result['status'] == 'success':
-                        if result.get('is_audio_link', False):
-                            audio_status = result.get('status_text', '音质状态未知')
-                            status_text = f"{audio_status}"
-                        elif result.get('is_vip_link', False):
-                            vip_status = result.get('status_text', 'VIP状态未知')
-                            status_text = f"{vip_status}"
-                        else:
-                            status_text = f"{result.get('status_text', 'Unknown')}"
+                if stage_name == 'resolve' and 'status' not in outcome:
+                    if self.is_expiry_link(outcome):
+                        submit('vip', link, self.analyze_expiry_link, link, outcome)
                     else:
-                        status_text = f"错误: {result.get('message', 'Unknown')}"
-
-                    self.progress_updated.emit(completed_count, total, status_text)
-
-                return result
-
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_link = {executor.submit(process_link_with_callback, link): link
-                                 for link in self.links}
-
-                for future in as_completed(future_to_link):
-                    if not self.is_running:
-                        for f in future_to_link:
-                            f.cancel()
-                        break
-
-                    try:
-                        result = future.result()
-                        if result is not None:
-                            results.append(result)
-                    except Exception as e:
-                        link = future_to_link[future]
-                        error_result = {
-                            'status': 'error',
-                            'message': f'处理失败: {str(e)}',
-                            'short_url': link,
-                            'is_vip_link': False
-                        }
-                        results.append(error_result)
-                        self.single_result_ready.emit(error_result)
-
-            if self.is_running:
-                self.finished.emit()
+                        submit('gift', link, self.analyze_gift_stage, link, outcome)
+                    continue
 
-        except Exception as e:
-            pass
+                with self.stats_lock:
+                    self.in_flight -= 1
+                self.count_result(outcome)
+                self.queue_result(outcome)
+            fill_window()
+            if time.monotonic() - self.last_flush >= self.FLUSH_INTERVAL:
+                self.flush_results()
+
+    def run_stage(self, stage_function, *args):
+        self.pause_event.wait()
+        if not self.is_running:
+            return None
+        return stage_function(*args)
+
+    def describe_result(self, result):
+        if result['status'] == 'success':
+            if result.get('is_audio_link', False):
+                return result.get('status_text', '音质状态未知')
+            elif result.get('is_vip_link', False):
+                return result.get('status_text', 'VIP状态未知')
+            return result.get('status_text', 'Unknown')
+        return f"错误: {result.get('message', 'Unknown')}"
+
+    def queue_result(self, result):
+        status_text = self.describe_result(result)
+        with self.batch_lock:
+            self.completed_count += 1
+            self.pending_results.append(result)
+            self.last_status = status_text
+            full = len(self.pending_results) >= self.BATCH_SIZE
+        if full:
+            self.flush_results(report_progress=False)
+
+    def flush_results(self, report_progress=True):
+        with self.batch_lock:
+            batch = self.pending_results
+            self.pending_results = []
+            completed = self.completed_count
+            status_text = "已暂停..." if self.is_paused else self.last_status
+            if report_progress:
+                self.last_flush = time.monotonic()
+        if batch:
+            with latency_stats.measure('analyze/emit'):
+                self.results_batch_ready.emit(batch)
+        if report_progress:
+            self.progress_updated.emit(completed, self.link_total(), status_text)
+
+    def link_total(self):
+        if self.link_feed is not None:
+            return self.link_feed.received
+        return self.total_links
+
+    def setup_clients(self):
+        from .http_client import HttpClient
+
+        if self.session is None:
+            self.session = HttpClient(pool_size=sum(self.stage_workers.values()))
+        if self.analyzer is None:
+            self.analyzer = OptimalGiftAnalyzer(self.session)
+        if not self.is_running:
+            self.abort_requests()
+
+    def abort_requests(self):
+        # 礼品分析器与本线程共用同一个适配器，中止一次即可关闭所有连接
+        if self.session is not None:
+            self.session.abort()
+
+    def count_result(self, result):
+        status = result.get('status', 'unknown')
+        with self.stats_lock:
+            self.result_counts[status] = self.result_counts.get(status, 0) + 1
+
+    def count_error(self, error):
+        with self.stats_lock:
+            name = type(error).__name__
+            self.error_counts[name] = self.error_counts.get(name, 0) + 1
+
+    def collect_metrics(self):
+        with self.stats_lock:
+            result_counts = dict(self.result_counts)
+            error_counts = dict(self.error_counts)
+            in_flight = self.in_flight
+            completed = self.completed_count
+
+        total_links = self.link_total()
+        yield ('wyy_analyzer_links', 'gauge', 'Links in the current analysis job', {}, total_links)
+        yield ('wyy_analyzer_completed_total', 'counter', 'Links analyzed', {}, completed)
+        for status, count in result_counts.items():
+            yield ('wyy_analyzer_results_total', 'counter', 'Analysis results by status', {'status': status}, count)
+        for error_class, count in error_counts.items():
+            yield ('wyy_analyzer_errors_total', 'counter', 'Analysis errors by exception class',
+                   {'class': error_class}, count)
+        if self.analyzer is not None:
+            for result, count in self.analyzer.gift_cache.stats().items():
+                yield ('wyy_analyzer_gift_cache_total', 'counter', 'Gift API lookups by cache outcome',
+                       {'result': result}, count)
+        yield ('wyy_analyzer_in_flight', 'gauge', 'Links being analyzed', {}, in_flight)
+        yield ('wyy_analyzer_queue_depth', 'gauge', 'Links waiting for a worker', {},
+               max(0, total_links - completed - in_flight))
+        for name, stage in list(self.stages.items()):
+            queued, active, completed = stage.snapshot()
+            yield ('wyy_analyzer_stage_workers', 'gauge', 'Thread limit per pipeline stage', {'stage': name},
+                   stage.workers)
+            yield ('wyy_analyzer_stage_queue_depth', 'gauge', 'Tasks waiting per pipeline stage', {'stage': name},
+                   queued)
+            yield ('wyy_analyzer_stage_active', 'gauge', 'Tasks running per pipeline stage', {'stage': name}, active)
+            yield ('wyy_analyzer_stage_completed_total', 'counter', 'Tasks finished per pipeline stage',
+                   {'stage': name}, completed)
+        if self.link_feed is not None:
+            yield ('wyy_analyzer_feed_depth', 'gauge', 'Scanner hits queued for analysis', {},
+                   self.link_feed.depth())
+        yield ('wyy_analyzer_running', 'gauge', 'Whether the analysis is running', {}, int(self.isRunning()))
+        yield ('wyy_analyzer_paused', 'gauge', 'Whether the analysis is paused', {}, int(self.is_paused))
 
     def pause(self):
         self.is_paused = True
@@ -664,6 +1350,151 @@ class AnalyzerWorker(QThread):
     def stop(self):
         self.is_running = False
         self.pause_event.set()
+        if not self.stop_future.done():
+            self.stop_future.set_result(None)
+        if self.link_feed is not None:
+            self.link_feed.close()
+        self.abort_requests()
+
+class RecheckScheduler(AnalyzerWorker):
+    # 只复查仍可领取/有效的链接：距过期越近复查越频繁，到期后直接标记为过期而不再请求
+    MIN_INTERVAL = 60
+    MAX_INTERVAL = 30 * 60
+    RETRY_INTERVAL = 120
+
+    def __init__(self, max_workers=2, parent=None):
+        super().__init__([], max_workers, parent=parent)
+        self.condition = threading.Condition()
+        self.heap = []
+        self.entries = {}
+        self.sequence = 0
+        self.recheck_count = 0
+        self.expired_count = 0
+
+    def is_recheckable(self, result):
+        return result.get('status') == 'success' and result.get('gift_status') == 'available'
+
+    def next_check_time(self, result, now):
+        expire_at = (result.get('expire_time') or 0) / 1000
+        if expire_at <= 0:
+            return now + self.MAX_INTERVAL
+        interval = min(self.MAX_INTERVAL, max(self.MIN_INTERVAL, (expire_at - now) / 4))
+        return min(now + interval, expire_at)
+
+    def schedule(self, result, delay=None):
+        link = result.get('short_url')
+        if not link:
+            return
+        with self.condition:
+            if not self.is_recheckable(result):
+                self.entries.pop(link, None)
+                return
+            now = time.time()
+            due = now + delay if delay is not None else self.next_check_time(result, now)
+            self.sequence += 1
+            self.entries[link] = (self.sequence, result)
+            heapq.heappush(self.heap, (due, self.sequence, link))
+            self.condition.notify()
+
+    def unschedule(self, link):
+        with self.condition:
+            self.entries.pop(link, None)
+
+    def clear(self):
+        with self.condition:
+            self.entries.clear()
+            self.heap = []
+
+    def pending_count(self):
+        with self.condition:
+            return len(self.entries)
+
+    def take_due(self):
+        # 在 condition 锁内调用；丢弃已被重新调度或取消的旧条目
+        now = time.time()
+        while self.heap:
+            due, sequence, link = self.heap[0]
+            entry = self.entries.get(link)
+            if entry is None or entry[0] != sequence:
+                heapq.heappop(self.heap)
+                continue
+            if due > now:
+                return None, due - now
+            heapq.heappop(self.heap)
+            del self.entries[link]
+            return entry[1], 0
+        return None, None
+
+    def run(self):
+        metrics_registry.set_source('recheck', self)
+        self.setup_clients()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while self.is_running:
+                result = None
+                with self.condition:
+                    while self.is_running:
+                        wait_for = None
+                        # 并发已满时等待复查完成的通知，否则等到堆顶链接到期
+                        if self.in_flight < self.max_workers:
+                            result, wait_for = self.take_due()
+                            if result is not None:
+                                break
+                        self.condition.wait(wait_for)
+                    if result is None:
+                        break
+                    self.in_flight += 1
+                executor.submit(self.recheck, result)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def recheck(self, previous):
+        try:
+            expire_at = (previous.get('expire_time') or 0) / 1000
+            if 0 < expire_at <= time.time():
+                result = dict(previous)
+                result['gift_status'] = 'expired'
+                if previous.get('is_audio_link'):
+                    result['audio_status'] = 'expired'
+                    result['status_text'] = '音质已过期'
+                elif previous.get('is_vip_link'):
+                    result['vip_status'] = 'expired'
+                    result['status_text'] = 'VIP已过期'
+                else:
+                    result['status_text'] = '已过期'
+                    result['is_expired'] = True
+                self.expired_count += 1
+            else:
+                result = self.analyze_single_link(previous['short_url'])
+                self.recheck_count += 1
+
+            if not self.is_running:
+                return
+            if result.get('status') in ('success', 'invalid'):
+                self.single_result_ready.emit(result)
+                self.schedule(result)
+            else:
+                # 网络或接口异常不覆盖已有结果，稍后重试
+                self.schedule(previous, self.RETRY_INTERVAL)
+        except Exception as e:
+            self.count_error(e)
+            self.schedule(previous, self.RETRY_INTERVAL)
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify()
+
+    def collect_metrics(self):
+        yield ('wyy_recheck_pending', 'gauge', 'Links scheduled for recheck', {}, self.pending_count())
+        yield ('wyy_recheck_in_flight', 'gauge', 'Rechecks in progress', {}, self.in_flight)
+        yield ('wyy_recheck_total', 'counter', 'Links re-verified over the network', {}, self.recheck_count)
+        yield ('wyy_recheck_expired_total', 'counter', 'Links marked expired without a request', {},
+               self.expired_count)
+
+    def stop(self):
+        super().stop()
+        with self.condition:
+            self.condition.notify_all()
 
 class FileOperationWorker(QThread):
     operation_completed = pyqtSignal(bool, str, object)
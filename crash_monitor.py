@@ -1,47 +1,92 @@
 import sys
 import os
 import time
+import select
 import subprocess
-import psutil
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
 import threading
 import json
 from datetime import datetime
+from collections import deque
+from app.rotating_log import RotatingLogFile, TailBuffer
+
+# 崩溃报告中附带的输出尾部大小
+OUTPUT_TAIL_BYTES = 64 * 1024
+# 自动重启：退避上限，以及在统计窗口内允许的最大崩溃次数
+MAX_RESTART_BACKOFF = 60
+CRASH_LOOP_WINDOW = 600
+STABLE_RUN_SECONDS = 120
 
 class CrashMonitor:
     def __init__(self):
         self.main_process = None
         self.monitoring = True
         self.crash_log_file = "crash_log.txt"
+        self.output_log_file = "main_output.log"
+        self.output_log = None
+        self.stdout_tail = TailBuffer(OUTPUT_TAIL_BYTES)
+        self.stderr_tail = TailBuffer(OUTPUT_TAIL_BYTES)
+        self.reader_threads = []
         
-    def start_main_program(self):
+    def start_main_program(self, resume=False):
         try:
             # 添加--monitored参数，告诉main.py它已经被监控了
-            self.main_process = subprocess.Popen([sys.executable, "main.py", "--monitored"],
+            args = [sys.executable, "main.py", "--monitored"]
+            if resume:
+                args.append("--resume")
+            self.main_process = subprocess.Popen(args,
                                                stdout=subprocess.PIPE,
                                                stderr=subprocess.PIPE,
                                                cwd=os.getcwd())
+            self.start_output_readers()
             return True
         except Exception as e:
             self.log_error(f"Failed to start main program: {str(e)}")
             return False
+
+    def start_output_readers(self):
+        # 持续读取子进程输出，避免管道缓冲区写满导致主程序阻塞
+        if self.output_log is None:
+            self.output_log = RotatingLogFile(self.output_log_file)
+        self.stdout_tail = TailBuffer(OUTPUT_TAIL_BYTES)
+        self.stderr_tail = TailBuffer(OUTPUT_TAIL_BYTES)
+        self.reader_threads = []
+        for stream, tail in ((self.main_process.stdout, self.stdout_tail),
+                             (self.main_process.stderr, self.stderr_tail)):
+            thread = threading.Thread(target=self.drain_stream, args=(stream, tail))
+            thread.daemon = True
+            thread.start()
+            self.reader_threads.append(thread)
+
+    def drain_stream(self, stream, tail):
+        try:
+            while True:
+                chunk = stream.read1(65536)
+                if not chunk:
+                    break
+                tail.append(chunk)
+                self.output_log.write(chunk)
+        except Exception as e:
+            self.log_error(f"Output reader error: {str(e)}")
+        finally:
+            self.output_log.flush()
+
+    def join_output_readers(self, timeout=5):
+        for thread in self.reader_threads:
+            thread.join(timeout)
     
     def monitor_process(self):
-        while self.monitoring:
-            if self.main_process is None:
-                break
-                
-            try:
-                if self.main_process.poll() is not None:
-                    return_code = self.main_process.returncode
-                    if return_code != 0:
-                        self.handle_crash(return_code)
-                    break
-                time.sleep(1)
-            except Exception as e:
-                self.log_error(f"Monitor error: {str(e)}")
-                break
+        if self.main_process is None:
+            return
+
+        try:
+            # 阻塞等待子进程退出（waitpid），空闲时不占用CPU
+            return_code = self.main_process.wait()
+            if self.monitoring and return_code != 0:
+                self.handle_crash(return_code)
+        except Exception as e:
+            self.log_error(f"Monitor error: {str(e)}")
     
     def handle_crash(self, return_code):
         try:
@@ -49,20 +94,70 @@ class CrashMonitor:
                 os.remove("normal_exit.flag")
                 return
 
-            stdout, stderr = self.main_process.communicate(timeout=5)
-            crash_info = {
-                "timestamp": datetime.now().isoformat(),
-                "return_code": return_code,
-                "stdout": stdout.decode('utf-8', errors='ignore'),
-                "stderr": stderr.decode('utf-8', errors='ignore')
-            }
-
-            with open(self.crash_log_file, 'w', encoding='utf-8') as f:
-                json.dump(crash_info, f, indent=2, ensure_ascii=False)
-
+            self.write_crash_log(return_code)
             self.show_crash_dialog()
         except Exception as e:
             self.log_error(f"Error handling crash: {str(e)}")
+
+    def write_crash_log(self, return_code, restart_count=None):
+        self.join_output_readers()
+        crash_info = {
+            "timestamp": datetime.now().isoformat(),
+            "return_code": return_code,
+            "stdout": self.stdout_tail.getvalue().decode('utf-8', errors='ignore'),
+            "stderr": self.stderr_tail.getvalue().decode('utf-8', errors='ignore'),
+            "output_log": os.path.abspath(self.output_log_file)
+        }
+        if restart_count is not None:
+            crash_info["restart_count"] = restart_count
+
+        with open(self.crash_log_file, 'w', encoding='utf-8') as f:
+            json.dump(crash_info, f, indent=2, ensure_ascii=False)
+
+    def run_with_restarts(self, max_crashes=5):
+        # 无人值守模式：崩溃后按指数退避自动重启并恢复任务，短时间内反复崩溃则放弃
+        crash_times = deque()
+        backoff = 1
+        restart_count = 0
+        resume = False
+
+        while self.monitoring:
+            if os.path.exists("normal_exit.flag"):
+                os.remove("normal_exit.flag")
+            if not self.start_main_program(resume=resume):
+                break
+
+            started_at = time.monotonic()
+            return_code = self.main_process.wait()
+            if not self.monitoring:
+                break
+            if return_code == 0 or os.path.exists("normal_exit.flag"):
+                if os.path.exists("normal_exit.flag"):
+                    os.remove("normal_exit.flag")
+                break
+
+            now = time.monotonic()
+            try:
+                self.write_crash_log(return_code, restart_count)
+            except Exception as e:
+                self.log_error(f"Error writing crash log: {str(e)}")
+
+            crash_times.append(now)
+            while crash_times and now - crash_times[0] > CRASH_LOOP_WINDOW:
+                crash_times.popleft()
+            if len(crash_times) >= max_crashes:
+                self.log_error(f"Crash loop detected: {len(crash_times)} crashes within "
+                               f"{CRASH_LOOP_WINDOW}s, giving up")
+                self.show_crash_dialog()
+                break
+
+            if now - started_at > STABLE_RUN_SECONDS:
+                backoff = 1
+            self.log_error(f"Main program exited with code {return_code}, restarting in {backoff}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+            restart_count += 1
+            resume = True
     
     def show_crash_dialog(self):
         root = tk.Tk()
@@ -80,42 +175,32 @@ class CrashMonitor:
         except:
             pass
     
-    def monitor_existing_process(self):
-        # 监控已经运行的main.py进程
+    def monitor_existing_process(self, pid_file="monitor_running.flag"):
+        # 通过 main.py 写入的 pid 文件定位进程，不再遍历系统进程列表
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    if proc.info['name'] and 'python' in proc.info['name'].lower():
-                        cmdline = proc.info['cmdline']
-                        if cmdline and any('main.py' in arg for arg in cmdline):
-                            # 找到main.py进程
-                            self.monitor_pid(proc.info['pid'])
-                            break
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-        except Exception as e:
-            self.log_error(f"Error monitoring existing process: {str(e)}")
+            with open(pid_file, 'r', encoding='utf-8') as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError) as e:
+            self.log_error(f"Error reading pid file {pid_file}: {str(e)}")
+            return
+        self.monitor_pid(pid)
 
     def monitor_pid(self, pid):
         try:
-            process = psutil.Process(pid)
-            while self.monitoring:
-                if not process.is_running():
-                    # 进程已经结束，检查是否是正常退出
-                    if not os.path.exists("normal_exit.flag"):
-                        # 非正常退出，显示崩溃对话框
-                        self.handle_pid_crash()
-                    else:
-                        # 正常退出，清理标志文件
-                        os.remove("normal_exit.flag")
-                    break
-                time.sleep(1)
-        except psutil.NoSuchProcess:
-            # 进程不存在，可能已经退出
-            if not os.path.exists("normal_exit.flag"):
-                self.handle_pid_crash()
+            wait_for_pid_exit(pid)
         except Exception as e:
             self.log_error(f"Error monitoring PID {pid}: {str(e)}")
+            return
+
+        if not self.monitoring:
+            return
+        # 进程已经结束，检查是否是正常退出
+        if not os.path.exists("normal_exit.flag"):
+            # 非正常退出，显示崩溃对话框
+            self.handle_pid_crash()
+        else:
+            # 正常退出，清理标志文件
+            os.remove("normal_exit.flag")
 
     def handle_pid_crash(self):
         try:
@@ -136,6 +221,53 @@ class CrashMonitor:
     def stop_monitoring(self):
         self.monitoring = False
 
+def wait_for_pid_exit(pid):
+    # 按平台选择事件驱动的等待方式：Linux 用 pidfd，BSD/macOS 用 kqueue，其余交给 psutil
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return
+        except OSError:
+            pidfd = None
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                poller.poll()
+            finally:
+                os.close(pidfd)
+            return
+
+    if hasattr(select, 'kqueue'):
+        kq = select.kqueue()
+        try:
+            event = select.kevent(pid, filter=select.KQ_FILTER_PROC,
+                                  flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                                  fflags=select.KQ_NOTE_EXIT)
+            try:
+                kq.control([event], 1, None)
+            except ProcessLookupError:
+                pass
+            return
+        finally:
+            kq.close()
+
+    import psutil
+    try:
+        # Windows 上 psutil 使用 WaitForSingleObject 阻塞等待
+        psutil.Process(pid).wait()
+    except psutil.NoSuchProcess:
+        pass
+
+def get_pid_argument():
+    for index, arg in enumerate(sys.argv):
+        if arg == "--pid" and index + 1 < len(sys.argv):
+            return int(sys.argv[index + 1])
+        if arg.startswith("--pid="):
+            return int(arg.split("=", 1)[1])
+    return None
+
 class CrashDialog:
     def __init__(self, parent, log_file):
         self.log_file = log_file
@@ -220,11 +352,27 @@ class CrashDialog:
         self.dialog.geometry(f"+{x}+{y}")
 
 def main():
+    pid = get_pid_argument()
+    if pid is not None:
+        # main.py 显式传入了要监控的进程
+        monitor = CrashMonitor()
+        monitor.monitor_pid(pid)
     # 检查是否已经有主程序在运行
-    if os.path.exists("monitor_running.flag"):
+    elif os.path.exists("monitor_running.flag"):
         # 如果有，就监控现有的进程
         monitor = CrashMonitor()
         monitor.monitor_existing_process()
+    elif "--auto-restart" in sys.argv:
+        # 无人值守模式：崩溃后自动重启主程序并恢复任务
+        monitor = CrashMonitor()
+        max_crashes = 5
+        for arg in sys.argv:
+            if arg.startswith("--max-crashes="):
+                max_crashes = int(arg.split("=", 1)[1])
+        try:
+            monitor.run_with_restarts(max_crashes)
+        except KeyboardInterrupt:
+            monitor.stop_monitoring()
     else:
         # 否则启动新的主程序
         monitor = CrashMonitor()
@@ -3,15 +3,21 @@ import os
 import atexit
 import subprocess
 import threading
-import time
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from app.main_window import MainWindow
+from app.latency import latency_stats
+from app.metrics import MetricsServer
+from app.crash_handler import CrashHandler
+from app.job_state import JobStateStore
+from app.stall_watchdog import StallWatchdog
 
 def create_normal_exit_flag():
     with open("normal_exit.flag", "w") as f:
         f.write("normal")
+    # 正常退出时不再需要断点续跑的任务状态
+    JobStateStore().clear_all()
 
 def remove_normal_exit_flag():
     try:
@@ -26,12 +32,12 @@ def start_crash_monitor():
         if os.path.exists("monitor_running.flag"):
             return
 
-        # 创建监控运行标志
+        # 创建监控运行标志，内容为主程序PID，供监控程序直接定位进程
         with open("monitor_running.flag", "w") as f:
-            f.write("running")
+            f.write(str(os.getpid()))
 
         # 启动监控程序
-        subprocess.Popen([sys.executable, "crash_monitor.py"],
+        subprocess.Popen([sys.executable, "crash_monitor.py", "--pid", str(os.getpid())],
                         cwd=os.getcwd(),
                         creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
     except Exception:
@@ -44,29 +50,76 @@ def cleanup_monitor_flag():
     except:
         pass
 
+def get_arg_value(name, default=None):
+    for index, arg in enumerate(sys.argv):
+        if arg == name and index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+        if arg.startswith(name + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+def start_metrics_server():
+    port = get_arg_value("--metrics-port")
+    if port is None:
+        return None
+    try:
+        server = MetricsServer(int(port))
+        server.start()
+        return server
+    except (ValueError, OSError) as e:
+        print(f"无法启动指标服务: {e}", file=sys.stderr)
+        return None
+
 def main():
     # 检查是否是被监控程序启动的
     is_monitored = "--monitored" in sys.argv
+    # 外部监控进程改为可选，默认在进程内捕获崩溃
+    use_external_monitor = is_monitored or "--crash-monitor" in sys.argv
 
-    if not is_monitored:
+    if use_external_monitor and not is_monitored:
         # 启动崩溃监控程序
         monitor_thread = threading.Thread(target=start_crash_monitor)
         monitor_thread.daemon = True
         monitor_thread.start()
-        time.sleep(0.2)  # 给监控程序一点启动时间
+
+    crash_handler = CrashHandler()
+    previous_crash = crash_handler.install(use_fault_file=not use_external_monitor)
+    atexit.register(crash_handler.uninstall)
+
+    if "--latency" in sys.argv:
+        latency_stats.enabled = True
+    metrics_server = start_metrics_server()
 
     remove_normal_exit_flag()
-    atexit.register(create_normal_exit_flag)
-    atexit.register(cleanup_monitor_flag)
+    if use_external_monitor:
+        atexit.register(cleanup_monitor_flag)
 
     app = QApplication(sys.argv)
     font = QFont("Microsoft YaHei", 9)
     app.setFont(font)
+    crash_handler.attach_to_app()
     main_win = MainWindow()
     main_win.show()
+    if "--no-stall-watchdog" not in sys.argv:
+        try:
+            threshold = float(get_arg_value("--stall-threshold", "1.0"))
+        except ValueError:
+            threshold = 1.0
+        stall_watchdog = StallWatchdog(threshold)
+        # 等事件循环开始运行后再启动，窗口构建的耗时不计为界面卡顿
+        QTimer.singleShot(0, stall_watchdog.start)
+        atexit.register(stall_watchdog.stop)
+    if previous_crash:
+        QTimer.singleShot(0, crash_handler.show_crash_dialog)
+    if "--resume" in sys.argv:
+        # 由监控程序在崩溃后自动重启，恢复上次未完成的扫描/分析任务
+        QTimer.singleShot(0, main_win.resume_jobs)
 
     try:
         result = app.exec()
+        # 只有事件循环正常结束才写退出标志并清除任务状态；异常退出时保留，供监控程序重启后续跑
+        if result == 0:
+            create_normal_exit_flag()
         sys.exit(result)
     except Exception as e:
         remove_normal_exit_flag()
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import time
+import subprocess
+
+# 首帧显示前不应加载的重量级模块
+HEAVY_MODULES = ['requests', 'urllib3', 'Crypto']
+
+CHILD_CODE = r'''
+import sys
+import time
+import json
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, QTimer
+app = QApplication(sys.argv)
+qt_ready = time.perf_counter()
+from app.main_window import MainWindow
+imported = time.perf_counter()
+window = MainWindow()
+built = time.perf_counter()
+timings = {}
+
+class PaintWatcher(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and 'first_paint' not in timings:
+            timings['first_paint'] = time.perf_counter()
+            timings['heavy_modules'] = [m for m in HEAVY_MODULES if m in sys.modules]
+            QTimer.singleShot(0, app.quit)
+        return False
+
+watcher = PaintWatcher()
+window.installEventFilter(watcher)
+window.show()
+QTimer.singleShot(10000, app.quit)
+app.exec()
+print(json.dumps({
+    'qt_init_ms': (qt_ready - start) * 1000,
+    'import_ms': (imported - qt_ready) * 1000,
+    'build_ms': (built - imported) * 1000,
+    'first_paint_ms': (timings.get('first_paint', time.perf_counter()) - start) * 1000,
+    'painted': 'first_paint' in timings,
+    'heavy_modules': timings.get('heavy_modules', []),
+}))
+'''
+
+def run_once():
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    code = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n" + CHILD_CODE
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, timeout=60)
+    wall_ms = (time.perf_counter() - started) * 1000
+    lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+    if not lines:
+        raise RuntimeError(output.stderr.strip() or "benchmark child produced no output")
+    result = json.loads(lines[-1])
+    result['process_ms'] = wall_ms
+    return result
+
+def main():
+    runs = 5
+    budget_ms = 1500.0
+    args = sys.argv[1:]
+    if "--runs" in args:
+        runs = int(args[args.index("--runs") + 1])
+    if "--budget-ms" in args:
+        budget_ms = float(args[args.index("--budget-ms") + 1])
+
+    results = [run_once() for _ in range(runs)]
+    first_paint = sorted(r['first_paint_ms'] for r in results)[len(results) // 2]
+    import_ms = sorted(r['import_ms'] for r in results)[len(results) // 2]
+    process_ms = sorted(r['process_ms'] for r in results)[len(results) // 2]
+    heavy = sorted({m for r in results for m in r['heavy_modules']})
+
+    print(f"模块导入(中位数): {import_ms:.1f} ms")
+    print(f"首帧显示(中位数): {first_paint:.1f} ms")
+    print(f"进程启动到退出(中位数): {process_ms:.1f} ms")
+
+    failures = []
+    if not all(r['painted'] for r in results):
+        failures.append("窗口未在超时前完成首帧绘制")
+    if heavy:
+        failures.append(f"首帧前加载了重量级模块: {', '.join(heavy)}")
+    if first_paint > budget_ms:
+        failures.append(f"首帧耗时 {first_paint:.1f} ms 超过预算 {budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
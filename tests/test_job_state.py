@@ -0,0 +1,32 @@
+import tempfile
+import time
+import unittest
+from app.job_state import JobStateStore
+
+class JobStateStoreTest(unittest.TestCase):
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_save_async_writes_latest_state(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = JobStateStore(directory)
+            for index in range(50):
+                store.save_async('scanner', {'index': index})
+            self.assertTrue(self.wait_for(lambda: (store.load('scanner') or {}).get('index') == 49))
+
+    def test_clear_drops_pending_state(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = JobStateStore(directory)
+            with store.write_lock:
+                # 写线程被挡住时提交的状态，在 clear 之后不应再被写回
+                store.save_async('scanner', {'index': 1})
+                time.sleep(0.05)
+            store.clear('scanner')
+            time.sleep(0.1)
+            self.assertIsNone(store.load('scanner'))
+
+if __name__ == '__main__':
+    unittest.main()
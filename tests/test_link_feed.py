@@ -0,0 +1,27 @@
+import threading
+import time
+import unittest
+from app.workers import LinkFeed
+
+class LinkFeedTest(unittest.TestCase):
+    def test_blocked_time_counts_short_waits(self):
+        feed = LinkFeed(maxsize=1)
+        self.assertTrue(feed.put('a'))
+        self.assertEqual(feed.blocked_seconds, 0.0)
+
+        # 消费者在 0.1 秒后取走一个，生产者的等待在一次 put(timeout=0.2) 之内结束
+        timer = threading.Timer(0.1, feed.get_nowait)
+        timer.start()
+        self.assertTrue(feed.put('b'))
+        timer.join()
+        self.assertGreaterEqual(feed.blocked_seconds, 0.08)
+        self.assertEqual(feed.received, 2)
+
+    def test_closed_feed_rejects_links(self):
+        feed = LinkFeed(maxsize=1)
+        feed.close()
+        self.assertFalse(feed.put('a'))
+        self.assertEqual(feed.received, 0)
+
+if __name__ == '__main__':
+    unittest.main()
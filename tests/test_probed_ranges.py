@@ -0,0 +1,26 @@
+import os
+import tempfile
+import unittest
+from app.probed_ranges import ProbedRanges, IntervalSet
+
+class ProbedRangesLoadTest(unittest.TestCase):
+    def test_truncated_file_drops_partial_prefix(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "probed_ranges.bin")
+            store = ProbedRanges(path)
+            store.update('ab', IntervalSet([(1, 5), (9, 12)]))
+            store.update('cd', IntervalSet([(3, 4), (20, 30)]))
+            store.save()
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            for cut in range(len(data) + 1):
+                with open(path, 'wb') as f:
+                    f.write(data[:cut])
+                loaded = ProbedRanges(path)
+                for prefix, interval_set in loaded.ranges.items():
+                    self.assertEqual(len(interval_set.starts), len(interval_set.ends))
+                    self.assertEqual(loaded.gaps(prefix, 0, 40), store.gaps(prefix, 0, 40))
+
+if __name__ == '__main__':
+    unittest.main()
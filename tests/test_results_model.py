@@ -0,0 +1,37 @@
+import unittest
+from PyQt6.QtCore import QCoreApplication, Qt
+from app.results_model import ResultsTableModel
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def gift_result(url, gift_status='available', price=1):
+    return {'short_url': url, 'status': 'success', 'gift_status': gift_status,
+            'status_text': gift_status, 'gift_price': price}
+
+class ResultsTableModelTest(unittest.TestCase):
+    def visible_urls(self, model):
+        return [model.results[position]['short_url'] for position in model.visible]
+
+    def test_duplicate_urls_in_one_batch(self):
+        model = ResultsTableModel()
+        result = gift_result('a')
+        model.add_results([result, dict(result)])
+        self.assertEqual(self.visible_urls(model), ['a'])
+        self.assertEqual(len(model.results), 1)
+
+    def test_duplicate_keeps_last_result(self):
+        model = ResultsTableModel()
+        model.sort(6, Qt.SortOrder.AscendingOrder)
+        model.add_results([gift_result('b', price=5)])
+        model.add_results([gift_result('a', price=3), gift_result('a', 'expired', price=9), gift_result('b', price=1)])
+        self.assertEqual(self.visible_urls(model), ['b', 'a'])
+        self.assertEqual(model.result_for('a')['gift_status'], 'expired')
+
+    def test_duplicate_filtered_out_by_category(self):
+        model = ResultsTableModel()
+        model.set_allowed_categories(['available'])
+        model.add_results([gift_result('a'), gift_result('a', 'expired'), gift_result('c')])
+        self.assertEqual(self.visible_urls(model), ['c'])
+
+if __name__ == '__main__':
+    unittest.main()